@@ -9,30 +9,46 @@
 必要に応じて --company / --company-file / --date / --config を渡してください。
  --config を省略すると input/project-config.yaml を探索し、
  --company-file を省略すると input/company-name.txt を探索します。
+
+setup-project.py は別プロセスを起動せず、同じインタプリタに読み込んで main() を呼び出します
+（起動・import のコストが1回分で済む。比較は python src/workflows/bench-startup.py）。
 """
 
 import os
 import sys
-import subprocess
+import importlib.util
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 WORKFLOW = PROJECT_ROOT / "src" / "workflows" / "setup-project.py"
 
 
-def main():
+def load_setup_module():
+    """setup-project.py（ファイル名にハイフンを含むため通常の import 不可）をモジュールとして読み込む"""
+    spec = importlib.util.spec_from_file_location("setup_project_module", WORKFLOW)
+    module = importlib.util.module_from_spec(spec)  # type: ignore
+    assert spec and spec.loader
+    spec.loader.exec_module(module)  # type: ignore
+    return module
+
+
+def main(argv=None) -> int:
     if not WORKFLOW.exists():
         print("❌ src/workflows/setup-project.py が見つかりません。")
-        sys.exit(1)
+        return 1
 
-    # 既定で outdir=output を付与
-    args = [sys.executable, str(WORKFLOW), "--outdir", "output"] + sys.argv[1:]
+    # 既定で outdir=output を付与（後ろに書いた引数が優先されるため、利用者の --outdir で上書きできる）
+    args = ["--outdir", "output"] + (sys.argv[1:] if argv is None else list(argv))
 
-    # プロジェクトルートで実行
-    subprocess.check_call(args, cwd=str(PROJECT_ROOT))
+    # 相対パスの解釈を従来（プロジェクトルートで起動）と揃える
+    cwd = os.getcwd()
+    os.chdir(PROJECT_ROOT)
+    try:
+        module = load_setup_module()
+        return module.main(args) or 0
+    finally:
+        os.chdir(cwd)
 
 
 if __name__ == "__main__":
-    main()
-
-
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+起動時間ベンチマーク（run.py の実行方式の比較）
+
+同じ引数（競合取得なし・一時ディレクトリへの出力）で次の3通りを繰り返し起動し、
+プロセス起動から終了までの wall-clock を比較する。
+
+- subprocess: 旧 run.py 相当（ラッパーのインタプリタが subprocess.check_call で setup-project.py を起動）
+- inprocess : 現行の run.py（setup-project.py を同じインタプリタに読み込んで main() を呼ぶ）
+- direct    : setup-project.py を直接起動（参考値）
+
+使い方:
+    python src/workflows/bench-startup.py --repeat 10
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "..", ".."))
+RUN_PY = os.path.join(PROJECT_ROOT, "src", "run.py")
+WORKFLOW = os.path.join(SCRIPT_DIR, "setup-project.py")
+
+
+def _commands(setup_args):
+    return {
+        # 変更前の run.py と同じく、ラッパーのインタプリタから2つ目のインタプリタを起動する
+        "subprocess": [sys.executable, "-c", "import subprocess, sys; subprocess.check_call([sys.executable] + sys.argv[1:])", WORKFLOW, "--outdir", "output"] + setup_args,
+        "inprocess": [sys.executable, RUN_PY] + setup_args,
+        "direct": [sys.executable, WORKFLOW] + setup_args,
+    }
+
+
+def _time_run(command) -> float:
+    started = time.perf_counter()
+    subprocess.run(command, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="run.py の起動方式ごとの wall-clock 比較")
+    parser.add_argument("--repeat", type=int, default=5, help="各方式の実行回数（既定: 5）")
+    args = parser.parse_args()
+
+    outdir = tempfile.mkdtemp(prefix="bench-startup-")
+    setup_args = [
+        "--quick", "--company", "ベンチマーク株式会社", "--no-competitors", "--no-user-input",
+        "--force", "--date", "20000101", "--outdir", outdir,
+    ]
+    commands = _commands(setup_args)
+    timings = {name: [] for name in commands}
+    try:
+        # ディスクキャッシュ等の初回コストを除くため1回ずつ空実行し、その後は方式を交互に実行する
+        for command in commands.values():
+            _time_run(command)
+        for _ in range(max(1, args.repeat)):
+            for name, command in commands.items():
+                timings[name].append(_time_run(command))
+    except subprocess.CalledProcessError as e:
+        print(f"[ERROR] setup-project.py の実行に失敗しました（終了コード {e.returncode}）: {' '.join(e.cmd)}")
+        return 1
+    finally:
+        shutil.rmtree(outdir, ignore_errors=True)
+
+    print(f"{'方式':<12}{'中央値(ms)':>12}{'最小(ms)':>12}")
+    for name, values in timings.items():
+        print(f"{name:<12}{statistics.median(values):>12.1f}{min(values):>12.1f}")
+    before = statistics.median(timings["subprocess"])
+    after = statistics.median(timings["inprocess"])
+    print(f"[INFO] run.py: {before:.1f}ms → {after:.1f}ms（{before - after:.1f}ms 短縮、{len(timings['inprocess'])}回の中央値）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+競合HTMLスナップショット用のコンテンツアドレス型ストア
+
+本文の SHA-256 をキーに圧縮して `<outdir>/.store/objects/` へ1度だけ保存し、
+各日付ディレクトリには本文の代わりに小さな参照ファイル（raw.ref）を置く。
+内容が変わらないページを毎日保存しても実体は1つで済む。
+
+圧縮方式は zstandard が導入されていれば zstd、無ければ gzip。
+旧形式（平文の raw.html）の出力もそのまま読める。
+
+使い方:
+    python src/workflows/blob_store.py --date 20250808 --slug example.com   # HTMLを標準出力へ
+
+    from blob_store import BlobStore, read_raw
+    html = read_raw("example.com", "20250808", outdir="output")
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import os
+import sys
+import threading
+from typing import Optional
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # オプション依存
+    zstandard = None
+
+RAW_HTML_NAME = "raw.html"
+RAW_REF_NAME = "raw.ref"
+REF_PREFIX = "sha256:"
+
+
+class BlobStore:
+    def __init__(self, root: str):
+        """
+        Args:
+            root: ストアのルート（通常は <outdir>/.store）
+        """
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+
+    def _object_base(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def exists(self, digest: str) -> bool:
+        base = self._object_base(digest)
+        return os.path.exists(base + ".zst") or os.path.exists(base + ".gz")
+
+    def open_writer(self) -> "BlobWriter":
+        """チャンク単位で書き込むライター（受信しながら圧縮・ハッシュ計算する）"""
+        return BlobWriter(self)
+
+    def put(self, data: bytes) -> str:
+        """本文を保存して SHA-256 を返す（既存なら書き込まない）"""
+        digest = hashlib.sha256(data).hexdigest()
+        if self.exists(digest):
+            return digest
+        writer = self.open_writer()
+        writer.write(data)
+        return writer.commit()
+
+    def get(self, digest: str) -> bytes:
+        """SHA-256 から本文を復元する"""
+        base = self._object_base(digest)
+        if os.path.exists(base + ".zst"):
+            if zstandard is None:
+                raise RuntimeError("zstd 圧縮のオブジェクトを読むには zstandard が必要です")
+            with open(base + ".zst", "rb") as f:
+                return zstandard.ZstdDecompressor().decompress(f.read())
+        with open(base + ".gz", "rb") as f:
+            return gzip.decompress(f.read())
+
+    def ref_text(self, data: Optional[bytes] = None, digest: Optional[str] = None) -> str:
+        """本文（または保存済みの digest）を保存し、参照ファイルの内容を返す"""
+        if digest is None:
+            digest = self.put(data or b"")
+        return f"{REF_PREFIX}{digest}\n"
+
+    def write_ref(self, ref_path: str, data: Optional[bytes] = None, digest: Optional[str] = None) -> str:
+        """本文（または保存済みの digest）を参照ファイルとして書き出す"""
+        text = self.ref_text(data, digest)
+        with open(ref_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return text[len(REF_PREFIX):].strip()
+
+    def read_ref(self, ref_path: str) -> bytes:
+        with open(ref_path, "r", encoding="utf-8") as f:
+            ref = f.read().strip()
+        if not ref.startswith(REF_PREFIX):
+            raise ValueError(f"参照ファイルの形式が不正です: {ref_path}")
+        return self.get(ref[len(REF_PREFIX):])
+
+
+class BlobWriter:
+    """一時ファイルへ圧縮しながら書き込み、commit() で SHA-256 名に確定する"""
+
+    def __init__(self, store: BlobStore):
+        self.store = store
+        self._hash = hashlib.sha256()
+        os.makedirs(store.objects_dir, exist_ok=True)
+        self._suffix = ".zst" if zstandard is not None else ".gz"
+        self._tmp_path = os.path.join(store.objects_dir, f"incoming.{os.getpid()}.{threading.get_ident()}.{id(self)}.tmp")
+        self._file = open(self._tmp_path, "wb")
+        if zstandard is not None:
+            self._stream = zstandard.ZstdCompressor(level=10).stream_writer(self._file, closefd=False)
+        else:
+            self._stream = gzip.GzipFile(fileobj=self._file, mode="wb", compresslevel=6, mtime=0)
+
+    def write(self, data: bytes) -> None:
+        self._hash.update(data)
+        self._stream.write(data)
+
+    def commit(self) -> str:
+        self._stream.close()
+        self._file.close()
+        digest = self._hash.hexdigest()
+        if self.store.exists(digest):
+            os.remove(self._tmp_path)
+            return digest
+        path = self.store._object_base(digest) + self._suffix
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(self._tmp_path, path)
+        return digest
+
+    def abort(self) -> None:
+        try:
+            self._stream.close()
+            self._file.close()
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+
+def store_root(outdir: str) -> str:
+    return os.path.join(outdir, ".store")
+
+
+def read_raw(slug: str, date: str, outdir: str = "output") -> Optional[str]:
+    """競合の取得HTMLを返す（raw.ref → ストア、旧形式の raw.html の順に探す。無ければ None）"""
+    comp_dir = os.path.join(outdir, date, "competitors", slug)
+    ref_path = os.path.join(comp_dir, RAW_REF_NAME)
+    if os.path.exists(ref_path):
+        return BlobStore(store_root(outdir)).read_ref(ref_path).decode("utf-8", errors="ignore")
+    raw_path = os.path.join(comp_dir, RAW_HTML_NAME)
+    if os.path.exists(raw_path):
+        with open(raw_path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read()
+    return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="競合HTMLスナップショットの参照")
+    parser.add_argument("--date", required=True, help="プロジェクト日付（YYYYMMDD）")
+    parser.add_argument("--slug", required=True, help="competitors/ 配下のディレクトリ名（例: example.com）")
+    parser.add_argument("--outdir", default="output", help="出力ディレクトリ（既定: output）")
+    args = parser.parse_args()
+
+    html = read_raw(args.slug, args.date, outdir=args.outdir)
+    if html is None:
+        print(f"[ERROR] 取得HTMLが見つかりません: {args.outdir}/{args.date}/competitors/{args.slug}", file=sys.stderr)
+        return 1
+    sys.stdout.write(html)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
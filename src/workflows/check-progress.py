@@ -13,11 +13,27 @@ import json
 from datetime import datetime
 from pathlib import Path
 
-def find_latest_project():
-    """最新のプロジェクトディレクトリを取得（output/ 固定）"""
+def open_project_index():
+    """更新済みのプロジェクト索引（output/.cache/projects.sqlite）を返す。使えなければ None"""
+    if not Path("output").exists():
+        return None
+    try:
+        from project_index import ProjectIndex
+
+        return ProjectIndex("output").refresh()
+    except Exception as e:
+        print(f"⚠️ プロジェクト索引を使えません（output/ を走査します）: {e}")
+        return None
+
+def find_latest_project(index=None):
+    """最新のプロジェクトディレクトリを取得（output/ 固定。index があれば索引から）"""
     outputs_dir = Path("output")
     if not outputs_dir.exists():
         return None
+
+    if index is not None:
+        latest = index.latest_project()
+        return outputs_dir / latest if latest else None
     
     project_dirs = [d for d in outputs_dir.iterdir() 
                     if d.is_dir() and d.name.isdigit() and len(d.name) == 8]
@@ -44,8 +60,16 @@ def count_todo_markers(file_path):
         print(f"⚠️ ファイル読み込みエラー: {file_path} - {e}")
         return 0, [], []
 
-def generate_progress_report(project_dir):
-    """進捗レポートを生成"""
+def _todo_counts_from_index(project_dir, index):
+    """索引に記録済みの TODO 数（ファイル名 → (件数, HTML形式, 旧形式)）"""
+    counts = {}
+    for info in index.files(project_dir.relative_to("output").as_posix(), top_level_only=True):
+        legacy_todos = ["TODO:"] * info["legacy_todos"]
+        counts[info["name"]] = (info["remaining_todos"], info["html_todos"], legacy_todos)
+    return counts
+
+def generate_progress_report(project_dir, index=None):
+    """進捗レポートを生成（index があればファイルを読まずに索引の TODO 数を使う）"""
     report = {
         "project_dir": str(project_dir),
         "check_time": datetime.now().isoformat(),
@@ -53,18 +77,18 @@ def generate_progress_report(project_dir):
         "summary": {}
     }
     
-    md_files = list(project_dir.glob("*.md"))
-    if not md_files:
+    if index is not None:
+        counts = _todo_counts_from_index(project_dir, index)
+    else:
+        counts = {file_path.name: count_todo_markers(file_path) for file_path in project_dir.glob("*.md")}
+    if not counts:
         return report
     
     total_todos = 0
     
-    for file_path in md_files:
-        filename = file_path.name
+    for filename, (todo_count, html_todos, legacy_todos) in counts.items():
         if filename == "README.md":  # プロジェクトREADMEは除外
             continue
-            
-        todo_count, html_todos, legacy_todos = count_todo_markers(file_path)
         
         file_info = {
             "remaining_todos": todo_count,
@@ -128,8 +152,9 @@ def main():
     print("🔍 プロジェクト進捗を確認しています...")
     print()
     
-    # 最新プロジェクトディレクトリを取得
-    project_dir = find_latest_project()
+    # 最新プロジェクトディレクトリを取得（プロジェクト索引を更新日時の変わったファイルだけ読み直して参照）
+    index = open_project_index()
+    project_dir = find_latest_project(index)
     
     if not project_dir:
         print("❌ エラー: output/ ディレクトリにプロジェクトが見つかりません")
@@ -140,7 +165,9 @@ def main():
     print()
     
     # 進捗レポート生成
-    report = generate_progress_report(project_dir)
+    report = generate_progress_report(project_dir, index)
+    if index is not None:
+        index.close()
     
     # レポート表示
     print_progress_report(report)
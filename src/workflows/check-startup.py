@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ワークフローCLIの起動時 import 時間チェック
+
+各CLIを新しいインタプリタで `-X importtime` 付きで読み込み（main は実行しない）、
+CLI自身が import するモジュールの合計時間が予算を超えていないか、
+起動時に読み込むべきでない重いモジュール（requests / bs4 / asyncio 等）を読み込んでいないかを確認する。
+setup-project.py は --no-competitors の実行でも requests 系を読み込まないことを確認する。
+
+予算超過・禁止モジュールの読み込みがあれば終了コード 1（CI やコミット前の確認用）。
+
+使い方:
+    python src/workflows/check-startup.py
+    python src/workflows/check-startup.py --repeat 5 --scale 2.0   # 遅いマシンでは予算を緩める
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "..", ".."))
+
+# CLIごとの import 時間の予算（ミリ秒、中央値）
+IMPORT_BUDGETS_MS = {
+    "setup-project.py": 100,
+    "check-progress.py": 15,
+    "fix-date-mismatch.py": 15,
+    "check-system-date.py": 20,
+    "config_loader.py": 40,
+}
+
+# 起動時（main 実行前）に読み込んではいけないモジュール
+HEAVY_MODULES = ("requests", "urllib3", "bs4", "lxml", "html5lib", "asyncio", "urllib.robotparser", "multiprocessing")
+
+# CLI を main を実行せずに読み込む（ハイフンを含むファイル名のため spec から読み込む）
+LOADER = (
+    "import importlib.util, sys\n"
+    "sys.stderr.write('import-check: start\\n')\n"
+    "spec = importlib.util.spec_from_file_location('cli_under_check', sys.argv[1])\n"
+    "module = importlib.util.module_from_spec(spec)\n"
+    "spec.loader.exec_module(module)\n"
+)
+START_MARKER = "import-check: start"
+
+
+def parse_importtime(stderr: str, after_marker: bool = True):
+    """-X importtime の出力から (トップレベルのモジュール名, 累積マイクロ秒) の一覧と、読み込まれた全モジュール名を返す"""
+    started = not after_marker
+    top_level = []
+    modules = set()
+    for line in stderr.splitlines():
+        if line.strip() == START_MARKER:
+            started = True
+            continue
+        if not started or not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        modules.add(name.strip())
+        # ネストした import は名前の前の空白が増える（トップレベルは1つ）
+        if len(name) - len(name.lstrip()) == 1:
+            top_level.append((name.strip(), int(parts[1])))
+    return top_level, modules
+
+
+def measure_import(cli: str):
+    """CLI を1回読み込み、(合計ミリ秒, トップレベルの内訳, 読み込まれたモジュール) を返す"""
+    path = os.path.join(SCRIPT_DIR, cli)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", LOADER, path],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, encoding="utf-8", errors="replace",
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{cli} の読み込みに失敗しました: {proc.stderr.strip().splitlines()[-1:]}")
+    top_level, modules = parse_importtime(proc.stderr)
+    return sum(us for _, us in top_level) / 1000, top_level, modules
+
+
+def check_setup_without_competitors():
+    """setup-project.py --no-competitors の実行で読み込まれた重いモジュールを返す"""
+    outdir = tempfile.mkdtemp(prefix="check-startup-")
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", os.path.join(SCRIPT_DIR, "setup-project.py"),
+             "--quick", "--company", "起動確認株式会社", "--no-competitors", "--no-user-input",
+             "--force", "--date", "20000101", "--outdir", outdir],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, encoding="utf-8", errors="replace",
+        )
+    finally:
+        shutil.rmtree(outdir, ignore_errors=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"setup-project.py --no-competitors が終了コード {proc.returncode} で失敗しました")
+    _, modules = parse_importtime(proc.stderr, after_marker=False)
+    return sorted(m for m in HEAVY_MODULES if m in modules)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="ワークフローCLIの起動時 import 時間チェック")
+    parser.add_argument("--repeat", type=int, default=3, help="CLIごとの計測回数（中央値で判定、既定: 3）")
+    parser.add_argument("--scale", type=float, default=1.0, help="予算の倍率（遅いマシン・CI 向け、既定: 1.0）")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'CLI':<24}{'import(ms)':>12}{'予算(ms)':>10}  最も重い import")
+    for cli, budget in IMPORT_BUDGETS_MS.items():
+        try:
+            samples = [measure_import(cli) for _ in range(max(1, args.repeat))]
+        except RuntimeError as e:
+            failures.append(str(e))
+            print(f"[ERROR] {e}")
+            continue
+        total = statistics.median(sample[0] for sample in samples)
+        top_level, modules = samples[-1][1], samples[-1][2]
+        heaviest = ", ".join(f"{name} {us / 1000:.1f}" for name, us in sorted(top_level, key=lambda item: -item[1])[:3])
+        limit = budget * args.scale
+        print(f"{cli:<24}{total:>12.1f}{limit:>10.0f}  {heaviest}")
+        if total > limit:
+            failures.append(f"{cli}: import {total:.1f}ms が予算 {limit:.0f}ms を超過")
+        heavy = sorted(m for m in HEAVY_MODULES if m in modules)
+        if heavy:
+            failures.append(f"{cli}: 起動時に重いモジュールを読み込んでいます: {', '.join(heavy)}")
+
+    try:
+        heavy = check_setup_without_competitors()
+        if heavy:
+            failures.append(f"setup-project.py --no-competitors: 不要なモジュールを読み込んでいます: {', '.join(heavy)}")
+    except RuntimeError as e:
+        failures.append(str(e))
+
+    print()
+    if failures:
+        print("[ERROR] 起動時間チェックに失敗しました:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("[OK] 全CLIが予算内で、起動時に重いモジュールを読み込んでいません")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,25 +14,28 @@ project-config.yamlから設定を読み込み、プロジェクトに応じた
 """
 
 import yaml
+import copy
 import os
 import sys
+import threading
 from pathlib import Path
 from datetime import datetime
 
 class ConfigLoader:
-    def __init__(self, config_path=None, allow_missing: bool = False):
+    def __init__(self, config_path=None, allow_missing: bool = False, config=None):
         """
         設定ファイルローダーの初期化
         
         Args:
             config_path: 設定ファイルのパス（デフォルト: input/project-config.yaml）
+            config: 読み込み済みの設定（指定時はファイルを読まない。load_cached 用）
         """
         if config_path is None:
             config_path = "input/project-config.yaml"
         
         self.config_path = config_path
         self.allow_missing = allow_missing
-        self.config = self._load_config()
+        self.config = config if config is not None else self._load_config()
     
     def _load_config(self):
         """設定ファイルを読み込む"""
@@ -87,6 +90,10 @@ class ConfigLoader:
         """品質管理設定を取得"""
         return self.config.get('quality_control', {})
     
+    def get_fetch_config(self):
+        """Web取得設定（ホスト単位のレート制限）を取得"""
+        return self.config.get('fetch', {}) or {}
+    
     def validate_config(self):
         """設定内容の妥当性をチェック"""
         errors = []
@@ -114,6 +121,15 @@ class ConfigLoader:
         if not seo.get('primary_keywords') or len(seo.get('primary_keywords', [])) < 3:
             warnings.append("メインキーワードは3個以上設定することを推奨します")
         
+        # Web取得設定のチェック
+        fetch = self.get_fetch_config()
+        for key in ('rate_per_host', 'burst'):
+            if key in fetch:
+                try:
+                    float(fetch[key])
+                except (TypeError, ValueError):
+                    warnings.append(f"fetch.{key} は数値で指定してください（既定値を使用します）")
+        
         return errors, warnings
     
     def generate_knowledge_base(self):
@@ -260,6 +276,32 @@ class ConfigLoader:
         if not errors and not warnings:
             print("[OK] 設定は正常です")
 
+_config_cache = {}
+_config_cache_lock = threading.Lock()
+
+def load_cached(config_path=None, allow_missing: bool = False) -> ConfigLoader:
+    """YAML の解析結果を再利用して ConfigLoader を作る（常駐モードでジョブごとの再解析を省く）
+
+    ファイルの更新日時・サイズが変われば読み直す。呼び出し側が設定を書き換えても
+    キャッシュに影響しないよう、ジョブごとに複製を渡す。
+    """
+    config_path = config_path or "input/project-config.yaml"
+    try:
+        stat = os.stat(config_path)
+    except OSError:
+        # 存在しない場合は通常の読み込み（エラー表示・許容モードの扱いを含む）
+        return ConfigLoader(config_path, allow_missing=allow_missing)
+    key = os.path.abspath(config_path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _config_cache_lock:
+        cached = _config_cache.get(key)
+    if cached is None or cached[0] != version:
+        loader = ConfigLoader(config_path, allow_missing=allow_missing)
+        with _config_cache_lock:
+            _config_cache[key] = (version, copy.deepcopy(loader.config))
+        return loader
+    return ConfigLoader(config_path, allow_missing=allow_missing, config=copy.deepcopy(cached[1]))
+
 def main():
     """設定ファイルの内容を確認"""
     config = ConfigLoader()
@@ -15,11 +15,20 @@ from datetime import datetime
 from pathlib import Path
 
 def scan_date_mismatches():
-    """日付不一致を検出（output/ 固定）"""
+    """日付不一致を検出（output/ 固定）
+
+    プロジェクト索引（output/.cache/projects.sqlite）に記録済みの実行日時を使い、
+    更新日時の変わったファイルだけを読み直す。索引を使えない場合は全ファイルを読む。
+    """
     outputs_dir = Path("output")
     if not outputs_dir.exists():
         print("❌ output/ ディレクトリが見つかりません")
         return []
+
+    try:
+        return _scan_date_mismatches_indexed(outputs_dir)
+    except Exception as e:
+        print(f"⚠️ プロジェクト索引を使えません（output/ を走査します）: {e}")
     
     mismatches = []
     
@@ -64,6 +73,39 @@ def scan_date_mismatches():
     
     return mismatches
 
+def _execution_date(execution_datetime):
+    """「YYYY年MM月DD日 HH:MM:SS」から YYYYMMDD を返す"""
+    date_only_match = re.match(r'(\d{4})年(\d{2})月(\d{2})日', execution_datetime)
+    if not date_only_match:
+        return None
+    year, month, day = date_only_match.groups()
+    return f"{year}{month}{day}"
+
+def _scan_date_mismatches_indexed(outputs_dir):
+    """索引の実行日時から日付不一致を検出（1プロジェクトにつき最初に見つかったファイル）"""
+    from project_index import ProjectIndex
+
+    mismatches = []
+    with ProjectIndex(str(outputs_dir)) as index:
+        index.refresh()
+        for project in index.projects():
+            project_dir = outputs_dir / project["path"]
+            folder_date = project["date"]
+            for info in index.files(project["path"], top_level_only=True):
+                if info["name"] == "README.md" or not info["execution_datetime"]:
+                    continue
+                execution_date = _execution_date(info["execution_datetime"])
+                if execution_date and execution_date != folder_date:
+                    mismatches.append({
+                        "project_dir": str(project_dir),
+                        "folder_date": folder_date,
+                        "execution_date": execution_date,
+                        "execution_datetime": info["execution_datetime"],
+                        "file": str(project_dir / info["name"])
+                    })
+                    break  # 1つのファイルで見つかれば十分
+    return mismatches
+
 def display_mismatches(mismatches):
     """不一致を表示"""
     if not mismatches:
@@ -25,6 +25,6 @@ assert spec and spec.loader
 spec.loader.exec_module(module)  # type: ignore
 
 if __name__ == "__main__":
-    module.main()
+    sys.exit(module.main(sys.argv[1:]))
 
 
@@ -0,0 +1,641 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+競合ページの基本要素抽出（タイトル・メタ・見出し・CTA）
+
+html.parser.HTMLParser 上の単一パス抽出器で、1回の走査ですべての要素を集める。
+見出し・CTAは上限（H1:5 / H2:8 / H3:10 / CTA:10）に達したら以降の収集を止め、
+すべての要素が確定した時点で残りのHTMLは読まずに終了する。
+
+出力Markdownは BeautifulSoup（html.parser）版と同一になるよう、
+BeautifulSoup のツリー構築規則（終了タグの対応付け、空要素、script/style 等の
+文字列種別、文字参照の変換）をなぞっている。単一パス抽出で例外が起きた場合は
+BeautifulSoup 版にフォールバックする。
+
+解析バックエンド（--bench・一致確認で比較する）:
+    builtin   上記の単一パス抽出器（標準ライブラリのみ）
+    lxml      lxml.html（libxml2）で解析し、対象タグのみ走査
+    html5lib  BeautifulSoup + html5lib（ブラウザ互換、低速）
+lxml / html5lib は閉じられていない要素の補い方（<p> 内の <h2> 等）が html.parser と異なり、
+不正なマークアップで見出し等が変わるため、`--html-parser` では選べない（比較・計測用）。
+
+使い方:
+    python src/workflows/html_facts.py --bench            # 保存済みHTMLで一致確認＋ページ/秒を計測
+    python src/workflows/html_facts.py a.html b.html      # 指定ファイルで一致確認
+
+    from html_facts import configure, extract_page_facts
+    configure("builtin")
+    markdown = extract_page_facts(html, url)
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import importlib.util
+import os
+import sys
+import time
+from html.entities import html5
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+H1_LIMIT = 5
+H2_LIMIT = 8
+H3_LIMIT = 10
+CTA_LIMIT = 10
+CTA_KEYWORDS = ["tel:", "mailto:", "contact", "inquiry", "form", "contact-us", "reserve", "booking", "資料", "問い合わせ", "予約"]
+CANONICAL_RELS = ("canonical", "Canonical")
+
+# BeautifulSoup と同じく、終了タグを待たずに閉じる空要素
+EMPTY_ELEMENT_TAGS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem", "meta", "param", "source", "track", "wbr",
+    "basefont", "bgsound", "command", "frame", "image", "isindex", "nextid", "spacer",
+])
+# 配下の文字列が get_text() の対象外になる要素（Script/Stylesheet/TemplateString/Ruby）
+STRING_CONTAINER_TAGS = frozenset(["rt", "rp", "style", "script", "template"])
+HEADING_LIMITS = {"h1": H1_LIMIT, "h2": H2_LIMIT, "h3": H3_LIMIT}
+
+# 入力を分割して渡し、要素がすべて確定したら残りを読まない
+FEED_CHUNK_SIZE = 16 * 1024
+# 抽出結果の版（HTTPキャッシュに保存した要約の無効化に使う）。抽出規則や出力形式を変えたら上げる
+FACTS_VERSION = 1
+
+
+def _build_entity_table() -> Dict[str, str]:
+    """名前付き文字参照の表（BeautifulSoup と同じく末尾の ; を除いた名前で最初の定義を採用）"""
+    table: Dict[str, str] = {}
+    for name_with_semicolon, character in sorted(html5.items()):
+        name = name_with_semicolon[:-1] if name_with_semicolon.endswith(";") else name_with_semicolon
+        table.setdefault(name, character)
+    return table
+
+
+ENTITY_TO_CHARACTER = _build_entity_table()
+
+
+def _is_cta_href(href: str) -> bool:
+    lowered = href.lower()
+    return any(k in lowered for k in CTA_KEYWORDS)
+
+
+def format_page_facts(url: str, title: str, og_title: str, meta_desc: str, canonical: str,
+                      h1_list: List[str], h2_list: List[str], h3_list: List[str], cta_links: List[str]) -> str:
+    """抽出結果を summary.md 用のMarkdownに整形"""
+    lines = [
+        "## ページ概要",
+        f"- URL: {url}",
+        f"- タイトル: {title or '-'}",
+        f"- og:title: {og_title or '-'}",
+        f"- メタディスクリプション: {meta_desc or '-'}",
+        f"- カノニカル: {canonical or '-'}",
+        "",
+        "## 見出し",
+        "### H1",
+    ]
+    lines += [f"- {t}" for t in h1_list] or ["- -"]
+    lines += ["", "### H2"]
+    lines += [f"- {t}" for t in h2_list] or ["- -"]
+    lines += ["", "### H3"]
+    lines += [f"- {t}" for t in h3_list] or ["- -"]
+
+    if cta_links:
+        lines += ["", "## 主要CTA（推定）"]
+        lines += cta_links
+
+    return "\n".join(lines)
+
+
+def extract_page_facts_bs4(html: str, url: str, links: Optional[List[str]] = None, features: str = "html.parser") -> str:
+    """BeautifulSoup 版の抽出（フォールバック・比較用。features で html5lib 等のツリービルダーを指定）
+
+    links にリストを渡すと、全リンク（a[href] の値）を文書順に追加する。
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, features)
+
+    def _text(el):
+        return (el.get_text(separator=" ", strip=True) if el else "").strip()
+
+    title = _text(soup.title)
+    meta_desc = ""
+    md = soup.find("meta", attrs={"name": "description"})
+    if md and md.get("content"):
+        meta_desc = md["content"].strip()
+    else:
+        ogd = soup.find("meta", attrs={"property": "og:description"})
+        meta_desc = (ogd.get("content") or "").strip() if ogd else ""
+
+    og_title = ""
+    ogt = soup.find("meta", attrs={"property": "og:title"})
+    if ogt and ogt.get("content"):
+        og_title = ogt["content"].strip()
+
+    canonical = ""
+    link_c = soup.find("link", attrs={"rel": list(CANONICAL_RELS)})
+    if link_c and link_c.get("href"):
+        canonical = link_c["href"].strip()
+
+    h1_list = [_text(h) for h in soup.find_all("h1")][:H1_LIMIT]
+    h2_list = [_text(h) for h in soup.find_all("h2")][:H2_LIMIT]
+    h3_list = [_text(h) for h in soup.find_all("h3")][:H3_LIMIT]
+
+    # 簡易CTA検知（tel/mailto/cta-like anchors）
+    cta_links = []
+    for a in soup.find_all("a", href=True):
+        href = a["href"].strip()
+        text = _text(a)[:60]
+        if _is_cta_href(href):
+            cta_links.append(f"- [{text}]({href})")
+        if len(cta_links) >= CTA_LIMIT:
+            break
+
+    if links is not None:
+        links.extend(a["href"] for a in soup.find_all("a", href=True))
+
+    return format_page_facts(url, title, og_title, meta_desc, canonical, h1_list, h2_list, h3_list, cta_links)
+
+
+class _TextCollector:
+    """要素配下の文字列（get_text(separator=" ", strip=True) 相当）を集める"""
+
+    __slots__ = ("parts",)
+
+    def __init__(self):
+        self.parts: List[str] = []
+
+    def text(self) -> str:
+        return " ".join(self.parts).strip()
+
+
+class SinglePassFactsParser(HTMLParser):
+    """BeautifulSoup(html, "html.parser") と同じ要素対応で、必要な要素だけを1回の走査で集める"""
+
+    def __init__(self, links: Optional[List[str]] = None):
+        super().__init__(convert_charrefs=False)
+        # 開いている要素: [タグ名, 収集器 or None]
+        self._stack: List[list] = []
+        self._open_counts: Dict[str, int] = {}
+        self._container_depth = 0
+        self._already_closed_empty: List[str] = []
+        self._current_data: List[str] = []
+        self._open_collectors: List[_TextCollector] = []
+
+        self.title: Optional[_TextCollector] = None
+        self.meta_description: Optional[str] = None
+        self.og_description: Optional[str] = None
+        self.og_title: Optional[str] = None
+        self.canonical: Optional[str] = None
+        self._seen_meta_description = False
+        self._seen_og_description = False
+        self._seen_og_title = False
+        self._seen_canonical = False
+        self.headings: Dict[str, List[_TextCollector]] = {"h1": [], "h2": [], "h3": []}
+        self.ctas: List[tuple] = []
+        # クロール用: 全リンクを集める場合は途中で打ち切らない
+        self.links = links
+        self.done = False
+
+    # --- BeautifulSoup のツリー構築に相当する処理 ---
+
+    def _end_data(self, included: bool = True) -> None:
+        if not self._current_data:
+            return
+        data = "".join(self._current_data)
+        self._current_data = []
+        # script/style/template/rt/rp 配下の文字列は get_text() の対象外
+        if included and self._container_depth == 0 and self._open_collectors:
+            stripped = data.strip()
+            if stripped:
+                for collector in self._open_collectors:
+                    collector.parts.append(stripped)
+
+    def _push(self, name: str, collector: Optional[_TextCollector]) -> None:
+        self._stack.append([name, collector])
+        self._open_counts[name] = self._open_counts.get(name, 0) + 1
+        if name in STRING_CONTAINER_TAGS:
+            self._container_depth += 1
+        if collector is not None:
+            self._open_collectors.append(collector)
+
+    def _pop(self) -> str:
+        name, collector = self._stack.pop()
+        self._open_counts[name] -= 1
+        if name in STRING_CONTAINER_TAGS:
+            self._container_depth -= 1
+        if collector is not None:
+            self._open_collectors.remove(collector)
+        return name
+
+    def _pop_to_tag(self, name: str) -> None:
+        if not self._open_counts.get(name):
+            return
+        while self._stack:
+            if self._pop() == name:
+                break
+
+    def _check_done(self) -> None:
+        if self.links is not None or self._open_collectors or self.title is None:
+            return
+        if not (self._seen_og_title and self._seen_canonical):
+            return
+        if not self._seen_meta_description or (not self.meta_description and not self._seen_og_description):
+            return
+        if any(len(self.headings[tag]) < limit for tag, limit in HEADING_LIMITS.items()):
+            return
+        if len(self.ctas) < CTA_LIMIT:
+            return
+        self.done = True
+
+    def _collector_for(self, name: str, attrs: Dict[str, str]) -> Optional[_TextCollector]:
+        if name == "title":
+            if self.title is None:
+                self.title = _TextCollector()
+                return self.title
+        elif name in HEADING_LIMITS:
+            collected = self.headings[name]
+            if len(collected) < HEADING_LIMITS[name]:
+                collector = _TextCollector()
+                collected.append(collector)
+                return collector
+        elif name == "a":
+            if self.links is not None and "href" in attrs:
+                self.links.append(attrs["href"])
+            if "href" in attrs and len(self.ctas) < CTA_LIMIT:
+                href = attrs["href"].strip()
+                if _is_cta_href(href):
+                    collector = _TextCollector()
+                    self.ctas.append((collector, href))
+                    return collector
+        elif name == "meta":
+            if not self._seen_meta_description and attrs.get("name") == "description":
+                self._seen_meta_description = True
+                self.meta_description = attrs.get("content")
+            if not self._seen_og_description and attrs.get("property") == "og:description":
+                self._seen_og_description = True
+                self.og_description = attrs.get("content")
+            if not self._seen_og_title and attrs.get("property") == "og:title":
+                self._seen_og_title = True
+                self.og_title = attrs.get("content")
+        elif name == "link":
+            if not self._seen_canonical and "rel" in attrs and any(r in CANONICAL_RELS for r in attrs["rel"].split()):
+                self._seen_canonical = True
+                self.canonical = attrs.get("href")
+        return None
+
+    # --- HTMLParser のイベント ---
+
+    def handle_starttag(self, name, attrs, handle_empty_element=True):
+        attr_dict: Dict[str, str] = {}
+        for key, value in attrs:
+            # 重複属性は後勝ち、値なし属性は空文字（BeautifulSoup と同じ）
+            attr_dict[key] = "" if value is None else value
+        self._end_data()
+        self._push(name, self._collector_for(name, attr_dict))
+        if name in EMPTY_ELEMENT_TAGS and handle_empty_element:
+            self.handle_endtag(name, check_already_closed=False)
+            self._already_closed_empty.append(name)
+        elif name in ("meta", "link"):
+            self._check_done()
+
+    def handle_startendtag(self, name, attrs):
+        self.handle_starttag(name, attrs, handle_empty_element=False)
+        self.handle_endtag(name)
+
+    def handle_endtag(self, name, check_already_closed=True):
+        if check_already_closed and name in self._already_closed_empty:
+            self._already_closed_empty.remove(name)
+            return
+        self._end_data()
+        self._pop_to_tag(name)
+        self._check_done()
+
+    def handle_data(self, data):
+        self._current_data.append(data)
+
+    def handle_charref(self, name):
+        if name.startswith("x"):
+            code = int(name.lstrip("x"), 16)
+        elif name.startswith("X"):
+            code = int(name.lstrip("X"), 16)
+        else:
+            code = int(name)
+        data = None
+        if code < 256:
+            # Windows-1252 の符号位置で書かれた参照を補正（BeautifulSoup と同じ）
+            try:
+                data = bytearray([code]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(code)
+            except (ValueError, OverflowError):
+                pass
+        self.handle_data(data or "\N{REPLACEMENT CHARACTER}")
+
+    def handle_entityref(self, name):
+        character = ENTITY_TO_CHARACTER.get(name)
+        self.handle_data(character if character is not None else f"&{name}")
+
+    def handle_comment(self, data):
+        self._end_data()
+
+    def handle_decl(self, data):
+        self._end_data()
+
+    def handle_pi(self, data):
+        self._end_data()
+
+    def unknown_decl(self, data):
+        self._end_data()
+        if data.upper().startswith("CDATA["):
+            # CDATA は get_text() の対象（script 等の配下でも含まれる）
+            stripped = data[len("CDATA["):].strip()
+            if stripped:
+                for collector in self._open_collectors:
+                    collector.parts.append(stripped)
+
+    def finish(self) -> None:
+        """入力終端: 残りの文字列を確定し、開いている要素をすべて閉じる"""
+        self._end_data()
+        while self._stack:
+            self._pop()
+
+
+def extract_page_facts_fast(html: str, url: str, links: Optional[List[str]] = None) -> str:
+    """単一パス抽出器で要素を集めてMarkdownに整形"""
+    parser = SinglePassFactsParser(links)
+    for start in range(0, len(html), FEED_CHUNK_SIZE):
+        parser.feed(html[start:start + FEED_CHUNK_SIZE])
+        if parser.done:
+            break
+    else:
+        parser.close()
+        parser.finish()
+
+    meta_desc = (parser.meta_description or "").strip()
+    if not parser.meta_description:
+        meta_desc = (parser.og_description or "").strip()
+
+    return format_page_facts(
+        url,
+        parser.title.text() if parser.title else "",
+        (parser.og_title or "").strip(),
+        meta_desc,
+        (parser.canonical or "").strip(),
+        [c.text() for c in parser.headings["h1"]],
+        [c.text() for c in parser.headings["h2"]],
+        [c.text() for c in parser.headings["h3"]],
+        [f"- [{c.text()[:60]}]({href})" for c, href in parser.ctas],
+    )
+
+
+def _lxml_text(element) -> str:
+    """lxml 要素の get_text(separator=" ", strip=True) 相当（コメントと script/style 等の中身は除く）"""
+    parts: List[str] = []
+    # template 等の配下にある要素は、要素自体は数えるが文字列は対象外（html.parser 版と同じ）
+    if any(isinstance(ancestor.tag, str) and ancestor.tag in STRING_CONTAINER_TAGS for ancestor in element.iterancestors()):
+        return ""
+
+    def _walk(node, excluded: bool) -> None:
+        if isinstance(node.tag, str):
+            excluded = excluded or node.tag in STRING_CONTAINER_TAGS
+            if node.text and not excluded:
+                parts.append(node.text)
+        for child in node:
+            _walk(child, excluded)
+            if child.tail and not excluded:
+                parts.append(child.tail)
+
+    _walk(element, False)
+    return " ".join(p.strip() for p in parts if p.strip()).strip()
+
+
+def extract_page_facts_lxml(html: str, url: str, links: Optional[List[str]] = None) -> str:
+    """lxml.html（libxml2）で解析し、対象タグだけを1回の走査で集める"""
+    import lxml.html
+
+    if not html.strip():
+        return format_page_facts(url, "", "", "", "", [], [], [], [])
+
+    try:
+        root = lxml.html.document_fromstring(html)
+    except lxml.etree.ParserError:
+        # コメントや空白だけの文書は "Document is empty" になるため、要素の無いページとして扱う
+        return format_page_facts(url, "", "", "", "", [], [], [], [])
+    title = None
+    meta_desc = og_desc = og_title = canonical = None
+    seen_meta_desc = seen_og_desc = seen_og_title = seen_canonical = False
+    headings: Dict[str, List[str]] = {"h1": [], "h2": [], "h3": []}
+    cta_links: List[str] = []
+
+    for el in root.iter("title", "meta", "link", "h1", "h2", "h3", "a"):
+        tag = el.tag
+        if tag == "title":
+            if title is None:
+                title = _lxml_text(el)
+        elif tag in HEADING_LIMITS:
+            if len(headings[tag]) < HEADING_LIMITS[tag]:
+                headings[tag].append(_lxml_text(el))
+        elif tag == "a":
+            href = el.get("href")
+            if links is not None and href is not None:
+                links.append(href)
+            if href is not None and len(cta_links) < CTA_LIMIT:
+                href = href.strip()
+                if _is_cta_href(href):
+                    cta_links.append(f"- [{_lxml_text(el)[:60]}]({href})")
+        elif tag == "meta":
+            if not seen_meta_desc and el.get("name") == "description":
+                seen_meta_desc, meta_desc = True, el.get("content")
+            if not seen_og_desc and el.get("property") == "og:description":
+                seen_og_desc, og_desc = True, el.get("content")
+            if not seen_og_title and el.get("property") == "og:title":
+                seen_og_title, og_title = True, el.get("content")
+        elif tag == "link":
+            rel = el.get("rel")
+            if not seen_canonical and rel is not None and any(r in CANONICAL_RELS for r in rel.split()):
+                seen_canonical, canonical = True, el.get("href")
+
+    return format_page_facts(
+        url,
+        title or "",
+        (og_title or "").strip(),
+        (meta_desc if meta_desc else og_desc or "").strip(),
+        (canonical or "").strip(),
+        headings["h1"],
+        headings["h2"],
+        headings["h3"],
+        cta_links,
+    )
+
+
+def extract_page_facts_html5lib(html: str, url: str, links: Optional[List[str]] = None) -> str:
+    """html5lib（ブラウザ互換のツリー構築）で解析する BeautifulSoup 版"""
+    return extract_page_facts_bs4(html, url, links, features="html5lib")
+
+
+# --html-parser の選択肢（builtin と同じ抽出結果になるバックエンドのみ）
+HTML_PARSER_CHOICES = ("builtin",)
+DEFAULT_HTML_PARSER = "builtin"
+# 比較・計測用を含む全バックエンド
+_EXTRACTORS = {
+    "builtin": extract_page_facts_fast,
+    "lxml": extract_page_facts_lxml,
+    "html5lib": extract_page_facts_html5lib,
+}
+# バックエンドごとに必要なモジュール（builtin は標準ライブラリのみ）
+_BACKEND_MODULES = {"lxml": "lxml.html", "html5lib": "html5lib"}
+
+_html_parser = "builtin"
+
+
+def is_available(parser: str) -> bool:
+    """バックエンドが利用可能か（import はせず、導入有無のみ確認）"""
+    module = _BACKEND_MODULES.get(parser)
+    if module is None:
+        return parser in _EXTRACTORS
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def resolve_html_parser(parser: str = DEFAULT_HTML_PARSER) -> str:
+    """指定名を実際に使うバックエンド名に解決する（未導入なら builtin）"""
+    if parser not in HTML_PARSER_CHOICES:
+        if parser in _EXTRACTORS:
+            raise ValueError(f"{parser} は抽出結果が builtin と一致しないため選べません（比較は html_facts.py --parsers）")
+        raise ValueError(f"未知のHTMLパーサーです: {parser}（{', '.join(HTML_PARSER_CHOICES)}）")
+    if not is_available(parser):
+        print(f"[WARN] {parser} が未導入のため builtin で解析します（pip install {parser}）")
+        return "builtin"
+    return parser
+
+
+def configure(parser: str = DEFAULT_HTML_PARSER) -> str:
+    """プロセス内で使うバックエンドを設定し、解決後の名前を返す"""
+    global _html_parser
+    _html_parser = resolve_html_parser(parser)
+    return _html_parser
+
+
+def get_html_parser() -> str:
+    return _html_parser
+
+
+def facts_extractor_key(parser: Optional[str] = None) -> str:
+    """抽出済み要約をキャッシュするときの抽出器の識別子（バックエンド名と FACTS_VERSION）"""
+    return f"{parser or _html_parser}@v{FACTS_VERSION}"
+
+
+def extract_page_facts(html: str, url: str, parser: Optional[str] = None) -> str:
+    """HTML から基本的な要素を抽出してMarkdownに整形（設定済みバックエンド、失敗時は BeautifulSoup）"""
+    try:
+        return _EXTRACTORS[parser or _html_parser](html, url)
+    except Exception:
+        return extract_page_facts_bs4(html, url)
+
+
+def extract_page_facts_and_links(html: str, url: str, parser: Optional[str] = None) -> Tuple[str, List[str]]:
+    """要素抽出と同じ走査でページ内の全リンク（a[href] の値、文書順）も集める（クロール用）"""
+    links: List[str] = []
+    try:
+        facts = _EXTRACTORS[parser or _html_parser](html, url, links)
+    except Exception:
+        links = []
+        facts = extract_page_facts_bs4(html, url, links)
+    return facts, links
+
+
+def _load_corpus(paths: List[str], outdir: str) -> List[tuple]:
+    """比較用のHTMLを集める（指定なしは <outdir>/*/competitors/*/ の取得HTML）"""
+    corpus = []
+    if paths:
+        for path in paths:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                corpus.append((path, f.read()))
+        return corpus
+
+    from blob_store import read_raw
+
+    for comp_dir in sorted(glob.glob(os.path.join(outdir, "*", "competitors", "*", ""))):
+        comp_dir = comp_dir.rstrip(os.sep)
+        slug = os.path.basename(comp_dir)
+        date = os.path.basename(os.path.dirname(os.path.dirname(comp_dir)))
+        html = read_raw(slug, date, outdir=outdir)
+        if html is not None:
+            corpus.append((comp_dir, html))
+    return corpus
+
+
+def _first_difference(expected: str, actual: str) -> str:
+    for want, got in zip(expected.splitlines(), actual.splitlines()):
+        if want != got:
+            return f"期待: {want} / 実際: {got}"
+    return "行数が異なります"
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description="競合ページ要素抽出のバックエンド比較（一致確認・ベンチマーク）")
+    arg_parser.add_argument("files", nargs="*", help="比較するHTMLファイル（省略時は <outdir>/*/competitors/*/ の取得HTML）")
+    arg_parser.add_argument("--outdir", default="output", help="出力ディレクトリ（既定: output）")
+    arg_parser.add_argument("--parsers", default="builtin,lxml,html5lib", help="比較するバックエンド（カンマ区切り）")
+    arg_parser.add_argument("--bench", action="store_true", help="バックエンドごとの処理速度（ページ/秒）も計測する")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="ベンチマークの繰り返し回数（既定: 3）")
+    args = arg_parser.parse_args()
+
+    corpus = _load_corpus(args.files, args.outdir)
+    if not corpus:
+        print(f"[ERROR] 比較対象のHTMLがありません: {args.outdir}/*/competitors/*/")
+        return 1
+    print(f"[INFO] 対象ページ: {len(corpus)}件")
+
+    parsers = []
+    for name in [p.strip() for p in args.parsers.split(",") if p.strip()]:
+        if name not in _EXTRACTORS:
+            print(f"[ERROR] 未知のHTMLパーサーです: {name}")
+            return 1
+        if is_available(name):
+            parsers.append(name)
+        else:
+            print(f"[INFO] {name}: 未導入のためスキップ")
+
+    # 基準は従来の BeautifulSoup(html.parser) の出力
+    expected = [extract_page_facts_bs4(html, path) for path, html in corpus]
+    failed = False
+    for name in parsers:
+        mismatches = []
+        for (path, html), want in zip(corpus, expected):
+            try:
+                got = _EXTRACTORS[name](html, path)
+            except Exception as e:
+                got = f"例外: {e}"
+            if got != want:
+                mismatches.append((path, _first_difference(want, got)))
+        if mismatches:
+            failed = True
+            print(f"[WARN] {name}: 不一致 {len(mismatches)}/{len(corpus)}件")
+            for path, diff in mismatches[:5]:
+                print(f"    - {path}: {diff}")
+        else:
+            print(f"[OK] {name}: {len(corpus)}件すべて一致")
+
+    if args.bench:
+        candidates = [("bs4(html.parser)", extract_page_facts_bs4)] + [(name, _EXTRACTORS[name]) for name in parsers]
+        for label, extractor in candidates:
+            start = time.perf_counter()
+            for _ in range(max(1, args.repeat)):
+                for path, html in corpus:
+                    extractor(html, path)
+            elapsed = time.perf_counter() - start
+            pages = len(corpus) * max(1, args.repeat)
+            print(f"[INFO] {label}: {pages / elapsed if elapsed else float('inf'):.1f} ページ/秒")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+競合ページ用 HTTP レスポンスキャッシュ
+
+URL ごとに本文と ETag / Last-Modified を保存し、次回取得時は
+If-None-Match / If-Modified-Since を付けた条件付きリクエストを送る。
+304 が返れば保存済みの本文（と抽出済みの要約）をそのまま再利用する。
+Cache-Control の max-age 内であればリクエスト自体を省略する。
+
+保存形式:
+    <cache_dir>/<sha256(url)>.json   メタ情報（ETag, Last-Modified, 有効期限, 抽出済み要約とその抽出器）
+    <cache_dir>/<sha256(url)>.body   本文（UTF-8）
+
+使い方:
+    from http_cache import HttpCache
+    cache = HttpCache("output/.cache/http")
+    resp = cache.get(url, headers={"User-Agent": ua}, timeout=20)
+    print(resp.cache_state)  # "hit" / "revalidated" / "miss"
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from http_client import DEFAULT_MAX_PAGE_BYTES, cache_lifetime, fetch_html
+
+
+class CachedResponse:
+    """キャッシュから組み立てたレスポンス（requests.Response の必要部分のみ）"""
+
+    def __init__(self, url: str, status_code: int, text: str, cache_state: str):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.cache_state = cache_state
+        self.truncated = False
+
+    def raise_for_status(self) -> None:
+        # 2xx の本文のみ保存しているため常に成功
+        return None
+
+
+class HttpCache:
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self.stats = {"hit": 0, "revalidated": 0, "miss": 0}
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.body"
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    @staticmethod
+    def _write_atomic(path: str, text: str) -> None:
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def _load(self, url: str):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "r", encoding="utf-8") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        if meta.get("url") != url:
+            return None, None
+        return meta, body
+
+    def _save(self, url: str, meta: Dict, body: Optional[str]) -> None:
+        meta_path, body_path = self._paths(url)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if body is not None:
+                self._write_atomic(body_path, body)
+            self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False))
+        except OSError as e:
+            print(f"[WARN] HTTPキャッシュ保存失敗: {url} - {e}")
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: int = 20, max_bytes: int = DEFAULT_MAX_PAGE_BYTES, sink=None):
+        """条件付き GET。戻り値は cache_state 属性（hit/revalidated/miss）を持つレスポンス
+
+        ミス時は http_client.fetch_html でストリーミング取得する（max_bytes/sink はそのまま渡す）。
+        """
+        meta, body = self._load(url)
+        request_headers = dict(headers or {})
+
+        if meta is not None:
+            if meta.get("expires_at", 0) > time.time():
+                self._count("hit")
+                return CachedResponse(url, meta.get("status", 200), body, "hit")
+            if meta.get("etag"):
+                request_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request_headers["If-Modified-Since"] = meta["last_modified"]
+
+        resp = fetch_html(url, headers=request_headers, timeout=timeout, max_bytes=max_bytes, sink=sink)
+
+        if resp.status_code == 304 and meta is not None:
+            self._count("revalidated")
+            lifetime = cache_lifetime(resp.headers)
+            meta["etag"] = resp.headers.get("ETag") or meta.get("etag")
+            meta["last_modified"] = resp.headers.get("Last-Modified") or meta.get("last_modified")
+            meta["expires_at"] = time.time() + lifetime if lifetime else 0
+            self._save(url, meta, None)
+            return CachedResponse(url, meta.get("status", 200), body, "revalidated")
+
+        self._count("miss")
+        resp.cache_state = "miss"
+        lifetime = cache_lifetime(resp.headers)
+        no_store = "no-store" in (resp.headers.get("Cache-Control") or "").lower()
+        # 打ち切った本文は保存しない（次回は改めて取得する）
+        if resp.status_code == 200 and not no_store and not resp.truncated:
+            self._save(url, {
+                "url": url,
+                "status": resp.status_code,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+                "expires_at": time.time() + lifetime if lifetime else 0,
+                "facts": None,
+                "facts_extractor": None,
+            }, resp.text)
+        return resp
+
+    def get_facts(self, url: str, extractor: str) -> Optional[str]:
+        """保存済みの本文に対応する抽出済み要約（未保存、または別の抽出器・版で抽出したものなら None）"""
+        meta, _ = self._load(url)
+        if not meta or meta.get("facts_extractor") != extractor:
+            return None
+        return meta.get("facts")
+
+    def put_facts(self, url: str, facts: str, extractor: str) -> None:
+        """抽出済み要約を抽出器（html_facts.facts_extractor_key()）とともに保存し、本文が変わらない限り再解析を省略できるようにする"""
+        meta, _ = self._load(url)
+        if meta is None:
+            return
+        meta["facts"] = facts
+        meta["facts_extractor"] = extractor
+        self._save(url, meta, None)
+
+    def summary(self) -> str:
+        return f"HTTPキャッシュ: ヒット {self.stats['hit']}件 / 再検証(304) {self.stats['revalidated']}件 / ミス {self.stats['miss']}件"
+
+
+_http_cache: Optional[HttpCache] = None
+
+
+def configure(cache_dir: Optional[str]) -> Optional[HttpCache]:
+    """共有キャッシュを設定する（None で無効化）"""
+    global _http_cache
+    _http_cache = HttpCache(cache_dir) if cache_dir else None
+    return _http_cache
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """共有キャッシュを返す（無効時は None）"""
+    return _http_cache
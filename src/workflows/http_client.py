@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共有HTTPクライアント
+
+各ワークフローから使う requests.Session を1つに集約し、
+接続プール（keep-alive）・リトライ/バックオフ・圧縮転送・ホスト単位のレート制限を共通化する。
+同一ホストへの robots.txt とページ取得、SerpAPI の連続呼び出しで
+TCP/TLS 接続が再利用されるため、ハンドシェイクの回数を減らせる。
+
+使い方:
+    from http_client import get_session, connection_stats
+    resp = get_session().get(url, timeout=20)
+    print(connection_stats())
+"""
+
+from __future__ import annotations
+
+import codecs
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rate_limiter import get_rate_limiter
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+DEFAULT_MAX_PAGE_BYTES = 5 * 1024 * 1024
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+CHUNK_SIZE = 64 * 1024
+# 文字コード推定のために先読みするバイト数（HTML仕様の prescan に合わせる）
+SNIFF_BYTES = 1024
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_settings = {
+    "pool_size": DEFAULT_POOL_SIZE,
+    "retries": DEFAULT_RETRIES,
+    "backoff": DEFAULT_BACKOFF,
+}
+
+
+def _accept_encoding() -> str:
+    """デコード可能な圧縮方式のみを Accept-Encoding に載せる（br は brotli 導入時のみ）"""
+    encodings = ["gzip", "deflate"]
+    try:
+        import brotli  # noqa: F401
+        encodings.append("br")
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encodings.append("br")
+        except ImportError:
+            pass
+    return ", ".join(encodings)
+
+
+def cache_lifetime(headers) -> Optional[float]:
+    """Cache-Control / Expires から有効秒数を求める（no-store/no-cache は 0、指定なしは None）"""
+    cache_control = (headers.get("Cache-Control") or "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    m = re.search(r"max-age\s*=\s*(\d+)", cache_control)
+    if m:
+        return float(m.group(1))
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            return max(0.0, parsedate_to_datetime(expires).timestamp() - time.time())
+        except Exception:
+            return 0
+    return None
+
+
+class NonHtmlContentError(Exception):
+    """Content-Type が HTML 以外だったため本文の取得を中止した"""
+
+
+class HtmlResponse:
+    """fetch_html の戻り値（requests.Response の必要部分＋打ち切り情報）"""
+
+    def __init__(self, url: str, status_code: int, headers, text: str, encoding: Optional[str], truncated: bool, num_bytes: int):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.encoding = encoding
+        self.truncated = truncated
+        self.num_bytes = num_bytes
+
+    def raise_for_status(self) -> None:
+        if 400 <= self.status_code:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+def _valid_encoding(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.strip().strip("\"'")).name
+    except LookupError:
+        return None
+
+
+def _charset_from_content_type(content_type: str) -> Optional[str]:
+    m = re.search(r"charset\s*=\s*[\"']?([\w.:-]+)", content_type or "", re.IGNORECASE)
+    return _valid_encoding(m.group(1)) if m else None
+
+
+def _sniff_encoding(head: bytes) -> Optional[str]:
+    """BOM と <meta charset> から文字コードを推定する"""
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith(codecs.BOM_UTF16_LE) or head.startswith(codecs.BOM_UTF16_BE):
+        return "utf-16"
+    m = re.search(rb"<meta[^>]+charset\s*=\s*[\"']?([\w.:-]+)", head, re.IGNORECASE)
+    return _valid_encoding(m.group(1).decode("ascii", errors="ignore")) if m else None
+
+
+def fetch_html(url: str, headers: Optional[Dict[str, str]] = None, timeout: int = 20, max_bytes: int = DEFAULT_MAX_PAGE_BYTES, sink=None, session: Optional[requests.Session] = None) -> HtmlResponse:
+    """HTML をストリーミング取得する
+
+    - Content-Type が HTML 以外なら本文を読まずに NonHtmlContentError
+    - max_bytes を超えた時点で受信を打ち切る（truncated=True）
+    - 文字コードはヘッダ → BOM/<meta charset> の順に推定し、チャンク単位でデコード
+    - sink を渡すと、デコード済み本文を UTF-8 でチャンクごとに書き込む
+    """
+    session = session or get_session()
+    resp = session.get(url, headers=headers, timeout=timeout, stream=True)
+    try:
+        if not 200 <= resp.status_code < 300:
+            return HtmlResponse(url, resp.status_code, resp.headers, "", None, False, 0)
+
+        content_type = resp.headers.get("Content-Type", "")
+        mime = content_type.split(";")[0].strip().lower()
+        if mime and mime not in HTML_CONTENT_TYPES:
+            raise NonHtmlContentError(f"HTML以外のContent-Type: {mime}")
+
+        encoding = _charset_from_content_type(content_type)
+        decoder = None
+        pending = b""
+        parts = []
+        total = 0
+        truncated = False
+
+        def _emit(text: str) -> None:
+            if text:
+                parts.append(text)
+                if sink is not None:
+                    sink.write(text.encode("utf-8"))
+
+        for chunk in resp.iter_content(CHUNK_SIZE):
+            if not chunk:
+                continue
+            if total + len(chunk) > max_bytes:
+                chunk = chunk[: max_bytes - total]
+                truncated = True
+            total += len(chunk)
+            if decoder is None:
+                pending += chunk
+                if len(pending) < SNIFF_BYTES and not truncated:
+                    continue
+                encoding = encoding or _sniff_encoding(pending[:SNIFF_BYTES]) or "utf-8"
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                chunk, pending = pending, b""
+            _emit(decoder.decode(chunk))
+            if truncated:
+                break
+
+        if decoder is None:
+            encoding = encoding or _sniff_encoding(pending[:SNIFF_BYTES]) or "utf-8"
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            _emit(decoder.decode(pending))
+        _emit(decoder.decode(b"", final=True))
+        return HtmlResponse(url, resp.status_code, resp.headers, "".join(parts), encoding, truncated, total)
+    finally:
+        resp.close()
+
+
+# RateLimitedAdapter.send の中で送信中のURL（urllib3 のリトライは同じスレッドの send 内で行われる）
+_sending = threading.local()
+
+
+class RateLimitedRetry(Retry):
+    """リトライ前の待機（バックオフ・Retry-After）の後、送信先ホストのレート制限でも待つ Retry
+
+    urllib3 は 429/5xx・接続エラーの再送を HTTPAdapter.send の内側で行うため、
+    アダプタでの待機だけでは再送がホスト単位の間隔・Crawl-delay を守らない。
+    """
+
+    def sleep(self, response=None) -> None:
+        super().sleep(response)
+        url = getattr(_sending, "url", None)
+        if url is not None:
+            get_rate_limiter().wait(url)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """送信前（とリトライの再送前）にホスト単位のレート制限（rate_limiter）で待つアダプタ"""
+
+    def send(self, request, **kwargs):
+        get_rate_limiter().wait(request.url)
+        _sending.url = request.url
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            _sending.url = None
+
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE, retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF) -> requests.Session:
+    """接続プールとリトライ方針を設定した Session を生成する"""
+    pool_size = max(1, int(pool_size))
+    retry = RateLimitedRetry(
+        total=max(0, int(retries)),
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # pool_connections: 保持するホスト数 / pool_maxsize: ホストごとの同時接続数
+    adapter = RateLimitedAdapter(pool_connections=max(pool_size, 32), pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Accept-Encoding"] = _accept_encoding()
+    return session
+
+
+def configure(pool_size: Optional[int] = None, retries: Optional[int] = None, backoff: Optional[float] = None) -> None:
+    """共有 Session の設定を変更する（作成済みの Session は破棄して作り直す）"""
+    global _session
+    with _session_lock:
+        if pool_size is not None:
+            _settings["pool_size"] = pool_size
+        if retries is not None:
+            _settings["retries"] = retries
+        if backoff is not None:
+            _settings["backoff"] = backoff
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_session() -> requests.Session:
+    """プロセス内で共有する Session を返す（初回呼び出し時に生成）"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session(**_settings)
+    return _session
+
+
+def has_session() -> bool:
+    """共有 Session が既に生成されているか"""
+    return _session is not None
+
+
+def connection_stats(session: Optional[requests.Session] = None) -> Dict[str, int]:
+    """接続プールの統計（リクエスト数・新規接続数・再利用数）を返す"""
+    session = session or _session
+    stats = {"requests": 0, "connections": 0, "reused": 0}
+    if session is None:
+        return stats
+
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen or not isinstance(adapter, HTTPAdapter):
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats["requests"] += getattr(pool, "num_requests", 0)
+            stats["connections"] += getattr(pool, "num_connections", 0)
+    stats["reused"] = max(0, stats["requests"] - stats["connections"])
+    return stats
+
+
+def format_connection_stats(session: Optional[requests.Session] = None) -> str:
+    """実行サマリー向けの1行表示"""
+    stats = connection_stats(session)
+    return f"HTTPリクエスト: {stats['requests']}件 / 新規接続: {stats['connections']}件 / 接続再利用: {stats['reused']}件"
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ジョブ単位の標準出力の振り分け
+
+複数企業のセットアップを同一プロセス内で並列に実行すると print が混ざるため、
+sys.stdout を差し替え、contextvars で現在のジョブに紐づくバッファへ書き込む。
+ジョブに属さない出力（メインスレッドの進捗表示など）はそのまま元の stdout へ流れる。
+
+ThreadPoolExecutor / run_in_executor は contextvars を引き継がないため、
+ジョブ内でスレッドに処理を渡す箇所は propagate() で包む。
+
+print は本文と改行を別々に書き込むため、複数スレッドから呼ぶと行が混ざる。
+ワーカースレッドからの出力は write_line() で1行を1回の write にまとめる。
+
+使い方:
+    from job_output import install, capture, propagate, write_line
+    install()
+    with capture() as buffer:
+        executor.submit(propagate(func), arg)
+        ...
+    print(buffer.getvalue())
+"""
+
+from __future__ import annotations
+
+import contextvars
+import io
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional, TextIO
+
+_current_buffer: contextvars.ContextVar[Optional[TextIO]] = contextvars.ContextVar("job_output_buffer", default=None)
+
+
+class JobAwareStdout:
+    """現在のジョブのバッファがあればそこへ、無ければ元の stdout へ書き込む"""
+
+    def __init__(self, default):
+        self.default = default
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        buffer = _current_buffer.get()
+        with self._lock:
+            return (self.default if buffer is None else buffer).write(text)
+
+    def flush(self) -> None:
+        if _current_buffer.get() is None:
+            self.default.flush()
+
+    def __getattr__(self, name):
+        # encoding / isatty など、write 以外は元の stdout に委ねる
+        return getattr(self.default, name)
+
+
+def install() -> JobAwareStdout:
+    """sys.stdout を JobAwareStdout に差し替える（導入済みならそのまま返す）"""
+    if not isinstance(sys.stdout, JobAwareStdout):
+        sys.stdout = JobAwareStdout(sys.stdout)
+    return sys.stdout
+
+
+@contextmanager
+def capture(buffer: Optional[TextIO] = None):
+    """with 内（と propagate したスレッド）の print を buffer（省略時は StringIO）に集める
+
+    write を持つオブジェクトなら何でもよい（常駐モードではログを逐次配信するバッファを渡す）。
+    """
+    buffer = buffer if buffer is not None else io.StringIO()
+    token = _current_buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _current_buffer.reset(token)
+
+
+def write_line(text: str) -> None:
+    """1行を改行込みの1回の write で出力する（スレッドから print すると他の行と混ざるため）"""
+    sys.stdout.write(f"{text}\n")
+
+
+def propagate(func: Callable) -> Callable:
+    """呼び出し元のコンテキスト（出力先）を引き継いで func を実行する関数を返す"""
+    context = contextvars.copy_context()
+
+    def _run(*args, **kwargs):
+        # 同じ Context は複数スレッドで同時に run できないため、呼び出しごとに複製する
+        return context.copy().run(func, *args, **kwargs)
+
+    return _run
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常駐モード（setup-project.py --serve）のジョブ管理とローカル HTTP JSON API
+
+ジョブはワーカープール（同時実行数の上限付き）で実行し、各ジョブの print は
+job_output でジョブごとのログに振り分ける。ログは実行中でも読み出し・逐次配信できる。
+
+API（既定では 127.0.0.1 のみで待ち受ける。認証は無いため外部公開しないこと）:
+    ブラウザ経由のクロスサイト送信・DNS リバインディング対策として、Host ヘッダが待ち受けアドレス
+    （ループバックなら localhost も可）と一致しない要求は 403、POST は Content-Type: application/json 以外を 415 で拒否する
+    GET  /health              稼働状況（ワーカー数、状態別のジョブ数）
+    POST /jobs                ジョブ投入（JSON。内容は呼び出し側の prepare が解釈）→ 202 とジョブ情報
+    GET  /jobs                ジョブ一覧（新しい順）
+    GET  /jobs/<id>           ジョブの状態（queued / running / succeeded / failed）と終了コード
+    GET  /jobs/<id>/log       ログ（text/plain）。?follow=1 で終了まで逐次配信
+
+使い方:
+    from job_server import serve
+    serve(prepare=lambda request: ..., run=lambda prepared: 0, port=8787, workers=2)
+"""
+
+from __future__ import annotations
+
+import json
+import signal
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from job_output import capture, install
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+DEFAULT_WORKERS = 2
+# 保持するジョブ数の上限（超えた分は終了済みの古いものから破棄）
+MAX_JOBS_KEPT = 200
+MAX_REQUEST_BYTES = 1024 * 1024
+
+
+class JobLog:
+    """追記専用のログ。書き込みを待っている読み手（follow 配信）に通知する"""
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._cond = threading.Condition()
+        self.closed = False
+
+    def write(self, text: str) -> int:
+        with self._cond:
+            self._chunks.append(text)
+            self._cond.notify_all()
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def read(self, offset: int = 0):
+        """offset（チャンク番号）以降の内容と次の offset を返す"""
+        with self._cond:
+            return "".join(self._chunks[offset:]), len(self._chunks)
+
+    def wait(self, offset: int, timeout: float = 1.0) -> bool:
+        """offset 以降に書き込みがあるか閉じられるまで待つ（新しい内容があれば True）"""
+        with self._cond:
+            if len(self._chunks) <= offset and not self.closed:
+                self._cond.wait(timeout)
+            return len(self._chunks) > offset
+
+    def getvalue(self) -> str:
+        return self.read()[0]
+
+
+class Job:
+    def __init__(self, request: Dict, prepared):
+        self.id = uuid.uuid4().hex[:12]
+        self.request = request
+        self.prepared = prepared
+        self.status = "queued"
+        self.exit_code: Optional[int] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.log = JobLog()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict:
+        seconds = None
+        if self.started is not None:
+            seconds = round((self.finished or time.time()) - self.started, 3)
+        return {
+            "id": self.id,
+            "status": self.status,
+            "exit_code": self.exit_code,
+            "error": self.error,
+            "request": self.request,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "seconds": seconds,
+        }
+
+
+class JobManager:
+    def __init__(self, prepare: Callable[[Dict], object], run: Callable[[object], int], workers: int = DEFAULT_WORKERS):
+        """
+        Args:
+            prepare: 投入内容を検証して実行用の値に変換する（不正なら ValueError）
+            run: 実行用の値を受け取りジョブを実行して終了コードを返す（print はジョブのログに入る）
+            workers: 同時に実行するジョブ数の上限
+        """
+        self.prepare = prepare
+        self.run = run
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="setup-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        install()
+
+    def submit(self, request: Dict) -> Job:
+        job = Job(request, self.prepare(request))
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        self._executor.submit(self._run_job, job)
+        return job
+
+    def _evict(self) -> None:
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][: max(0, len(self._jobs) - MAX_JOBS_KEPT)]:
+            del self._jobs[job_id]
+
+    def _run_job(self, job: Job) -> None:
+        job.status = "running"
+        job.started = time.time()
+        code = 1
+        with capture(job.log):
+            try:
+                code = self.run(job.prepared) or 0
+            except SystemExit as e:
+                # sys.exit による致命的エラー（メッセージはログに出力済み）
+                code = e.code if isinstance(e.code, int) else 1
+            except Exception as e:
+                job.error = str(e)
+                print(f"[ERROR] ジョブ実行中に例外: {e}")
+                print(traceback.format_exc(), end="")
+        job.exit_code = code
+        job.finished = time.time()
+        job.status = "succeeded" if code == 0 else "failed"
+        job.log.close()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def counts(self) -> Dict[str, int]:
+        counts = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+        for job in self.list():
+            counts[job.status] += 1
+        return counts
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    server_version = "marketing-agent-setup/1.0"
+
+    @property
+    def manager(self) -> JobManager:
+        return self.server.manager  # type: ignore[attr-defined]
+
+    def log_message(self, format, *args):
+        # アクセスログは出さない（ジョブのログと混ざるため）
+        pass
+
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _check_host(self) -> bool:
+        """Host ヘッダが待ち受けアドレスと一致するか（不一致なら 403 を返して False）"""
+        allowed = self.server.allowed_hosts  # type: ignore[attr-defined]
+        if allowed is None or (self.headers.get("Host") or "").strip().lower() in allowed:
+            return True
+        self._send_json(403, {"error": "Host ヘッダが待ち受けアドレスと一致しません"})
+        return False
+
+    def _route(self):
+        parts = [part for part in urlsplit(self.path).path.split("/") if part]
+        job = self.manager.get(parts[1]) if len(parts) >= 2 and parts[0] == "jobs" else None
+        return parts, job
+
+    def do_GET(self):
+        if not self._check_host():
+            return
+        parts, job = self._route()
+        if parts == ["health"]:
+            self._send_json(200, {"status": "ok", "workers": self.manager.workers, "jobs": self.manager.counts()})
+        elif parts == ["jobs"]:
+            self._send_json(200, {"jobs": [job.to_dict() for job in self.manager.list()]})
+        elif job is not None and len(parts) == 2:
+            self._send_json(200, job.to_dict())
+        elif job is not None and parts[2:] == ["log"]:
+            follow = parse_qs(urlsplit(self.path).query).get("follow", ["0"])[0] not in ("0", "", "false")
+            self._send_log(job, follow)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self._check_host():
+            return
+        parts, _ = self._route()
+        if parts != ["jobs"]:
+            self._send_json(404, {"error": "not found"})
+            return
+        # フォームや text/plain はブラウザが事前確認なしで他サイトから送れるため受け付けない
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if content_type != "application/json":
+            self._send_json(415, {"error": "Content-Type: application/json で送信してください"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_REQUEST_BYTES:
+                raise ValueError("リクエストが大きすぎます")
+            request = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+            if not isinstance(request, dict):
+                raise ValueError("JSON オブジェクトで指定してください")
+            job = self.manager.submit(request)
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        self._send_json(202, job.to_dict())
+
+    def _send_log(self, job: Job, follow: bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        if not follow:
+            body = job.log.getvalue().encode("utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        # 長さ未定のまま送り、ジョブ終了で接続を閉じる（HTTP/1.0 のストリーミング）
+        self.send_header("Connection", "close")
+        self.end_headers()
+        offset = 0
+        try:
+            while True:
+                text, offset = job.log.read(offset)
+                if text:
+                    self.wfile.write(text.encode("utf-8"))
+                    self.wfile.flush()
+                elif job.log.closed:
+                    break
+                else:
+                    job.log.wait(offset)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def allowed_hosts(host: str, port: int):
+    """受け付ける Host ヘッダの集合（全アドレスで待ち受ける場合は None = 確認しない）"""
+    if host in ("", "0.0.0.0", "::"):
+        return None
+    names = {f"[{host}]" if ":" in host else host}
+    if host in ("127.0.0.1", "::1", "localhost"):
+        names |= {"localhost", "127.0.0.1", "[::1]"}
+    return {name.lower() for name in names} | {f"{name}:{port}".lower() for name in names}
+
+
+def serve(prepare: Callable[[Dict], object], run: Callable[[object], int], host: str = DEFAULT_HOST,
+          port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS) -> int:
+    """ジョブ API を起動し、Ctrl+C で停止するまで待ち受ける（終了コードを返す）"""
+    manager = JobManager(prepare, run, workers=workers)
+    try:
+        server = ThreadingHTTPServer((host, port), JobRequestHandler)
+    except OSError as e:
+        print(f"[ERROR] {host}:{port} で待ち受けできません: {e}")
+        manager.shutdown(wait=False)
+        return 1
+    server.daemon_threads = True
+    server.manager = manager  # type: ignore[attr-defined]
+    server.allowed_hosts = allowed_hosts(host, server.server_port)  # type: ignore[attr-defined]
+    print(f"[OK] ジョブAPIを起動: http://{host}:{server.server_port}（同時実行 {manager.workers}、Ctrl+C で停止）")
+
+    def _stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # サービスとして動かす場合の停止（SIGTERM）も Ctrl+C と同様に扱う
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+        print("[INFO] 停止します（実行中のジョブの完了を待ちます）")
+    finally:
+        server.server_close()
+        manager.shutdown()
+    return 0
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+プロジェクトディレクトリ（output/YYYYMMDD/）への出力を一括で確定するライター
+
+セットアップ中の書き込み（テンプレート・競合要約・知識ベース・README など）はメモリ上に集め、
+commit() で同じ親ディレクトリ内の一時ディレクトリへスレッドプールで並列に書き出し、
+書き終えてから os.sync() を1回だけ呼んでまとめてディスクに反映し、最後に名前の変更で配置する。
+途中で失敗・中断しても書きかけのファイルは残らない。
+（ファイルごとの fsync はファイル数だけ同期を待つため使わない。os.sync() の無い Windows のみファイルごとに fsync する）
+
+- 新規ディレクトリ: 一時ディレクトリごと名前を変えるため、完成した状態でのみ現れる
+- 既存ディレクトリ（--force）: ファイル単位で os.replace するため、各ファイルは旧版か新版のどちらか
+  （今回書かないファイルはそのまま残す。remove() で指定したものだけ削除する）。
+  ディレクトリ全体としては原子的ではなく、配置の途中で中断すると旧版と新版のファイルが混在する。
+  remove() の対象は削除せずに隣の一時ディレクトリ（.<名前>.staging-*-removed）へ移し、配置が終わってから消すため、
+  中断・失敗した場合もそこから戻せる
+
+同じパスへの書き込みは後のものが優先（テンプレートの README.md を生成版で上書きする等も1回の書き込みで済む）。
+上書きで stat_source を省略した場合は、open(..., "w") で既存ファイルを書き換えるのと同じく先の予約の権限を引き継ぐ。
+
+使い方:
+    from output_writer import OutputWriter
+    with OutputWriter(project_dir) as output:
+        output.write_text("README.md", content)
+        output.commit()
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+DEFAULT_WRITE_WORKERS = 8
+# os.sync() で書き出し後に1回だけ同期する（無い環境ではファイルごとに fsync）
+_SYNC_ONCE = hasattr(os, "sync")
+
+
+class _Entry:
+    __slots__ = ("data", "stat_source", "keep_times")
+
+    def __init__(self, data: bytes, stat_source: Optional[str], keep_times: bool):
+        self.data = data
+        self.stat_source = stat_source
+        self.keep_times = keep_times
+
+
+class OutputWriter:
+    def __init__(self, project_dir: str, workers: int = DEFAULT_WRITE_WORKERS):
+        """
+        Args:
+            project_dir: 最終的な出力先（存在しなければ commit() で作成）
+            workers: commit() で並列に書き込むスレッド数
+        """
+        self.project_dir = project_dir
+        self.workers = max(1, workers)
+        self._entries: Dict[str, _Entry] = {}
+        self._dirs: Set[str] = set()
+        self._removals: List[str] = []
+        self._lock = threading.Lock()
+        self._staging_dir: Optional[str] = None
+        self._removed_dir: Optional[str] = None
+
+    def __enter__(self) -> "OutputWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # commit() 前の例外・中断では何も配置せず、一時ディレクトリも残さない
+        self.discard()
+
+    @staticmethod
+    def _key(relpath: str) -> str:
+        key = os.path.normpath(relpath).replace("\\", "/")
+        if key.startswith("../") or key == ".." or os.path.isabs(key):
+            raise ValueError(f"プロジェクトディレクトリ外のパスです: {relpath}")
+        return key
+
+    def path(self, relpath: str) -> str:
+        """確定後のパス（表示や相対パスの計算用）"""
+        return os.path.join(self.project_dir, *self._key(relpath).split("/"))
+
+    def write_bytes(self, relpath: str, data: bytes, stat_source: Optional[str] = None, keep_times: bool = False) -> None:
+        """書き込みを予約する
+
+        stat_source を指定すると確定時に権限をそのファイルに揃える（keep_times なら更新日時も。shutil.copy2 相当）。
+        """
+        key = self._key(relpath)
+        with self._lock:
+            previous = self._entries.get(key)
+            if stat_source is None and previous is not None:
+                # テンプレートを生成版で上書きする場合も権限はテンプレートに揃える（内容が変わるため更新日時は揃えない）
+                stat_source = previous.stat_source
+            self._entries[key] = _Entry(data, stat_source, keep_times)
+
+    def write_text(self, relpath: str, text: str, encoding: str = "utf-8", errors: str = "strict",
+                   stat_source: Optional[str] = None) -> None:
+        """テキストの書き込みを予約する（open(..., "w") と同じく改行は OS の既定に変換）"""
+        if os.linesep != "\n":
+            text = text.replace("\n", os.linesep)
+        self.write_bytes(relpath, text.encode(encoding, errors), stat_source=stat_source)
+
+    def makedirs(self, relpath: str) -> None:
+        """空でもよいディレクトリの作成を予約する"""
+        with self._lock:
+            self._dirs.add(self._key(relpath))
+
+    def remove(self, relpath: str) -> None:
+        """既存ディレクトリにある古いファイル・ディレクトリの削除を予約する（今回書くファイルより先に削除）"""
+        with self._lock:
+            self._removals.append(self._key(relpath))
+
+    def read_text(self, relpath: str, encoding: str = "utf-8") -> Optional[str]:
+        """予約済みの内容（無ければ既存ディレクトリのファイル）を返す。どちらにも無ければ None"""
+        key = self._key(relpath)
+        with self._lock:
+            entry = self._entries.get(key)
+            removed = any(key == r or key.startswith(r + "/") for r in self._removals)
+        if entry is not None:
+            return entry.data.decode(encoding).replace("\r\n", "\n")
+        path = self.path(key)
+        if removed or not os.path.isfile(path):
+            return None
+        with open(path, "r", encoding=encoding) as f:
+            return f.read()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def commit(self) -> None:
+        """予約した内容を一時ディレクトリへ並列に書き出してディスクに反映し、出力先へ配置する"""
+        parent = os.path.dirname(os.path.abspath(self.project_dir))
+        os.makedirs(parent, exist_ok=True)
+        # 名前の変更で配置するため、一時ディレクトリは出力先と同じファイルシステム（同じ親）に作る
+        # （tempfile.mkdtemp は権限が 0700 になり、そのまま出力先になるため umask に従う os.mkdir を使う）
+        self._staging_dir = os.path.join(parent, f".{os.path.basename(self.project_dir)}.staging-{uuid.uuid4().hex[:12]}")
+        os.mkdir(self._staging_dir)
+        with self._lock:
+            entries = sorted(self._entries.items())
+            dirs = sorted(self._dirs | {os.path.dirname(key) for key, _ in entries} - {""})
+            removals = list(self._removals)
+
+        for key in dirs:
+            os.makedirs(os.path.join(self._staging_dir, *key.split("/")), exist_ok=True)
+        with ThreadPoolExecutor(max_workers=min(self.workers, max(1, len(entries))), thread_name_prefix="output-writer") as executor:
+            # 例外は list() で取り出した時点で送出される
+            list(executor.map(self._write_staged, entries))
+        if _SYNC_ONCE:
+            # 名前の変更より前に、書き出した全ファイルの内容をまとめて反映する
+            os.sync()
+
+        if os.path.isdir(self.project_dir):
+            self._publish_into_existing(removals)
+        else:
+            try:
+                os.rename(self._staging_dir, self.project_dir)
+                self._staging_dir = None
+            except OSError:
+                # 並行して同じディレクトリが作られた場合はファイル単位の配置に切り替える
+                if not os.path.isdir(self.project_dir):
+                    raise
+                self._publish_into_existing(removals)
+        _fsync_dir(parent)
+        self.discard()
+
+    def _write_staged(self, item: Tuple[str, _Entry]) -> None:
+        key, entry = item
+        path = os.path.join(self._staging_dir, *key.split("/"))
+        with open(path, "wb") as f:
+            f.write(entry.data)
+            if not _SYNC_ONCE:
+                f.flush()
+                os.fsync(f.fileno())
+        if entry.stat_source is not None:
+            if entry.keep_times:
+                shutil.copystat(entry.stat_source, path)
+            else:
+                shutil.copymode(entry.stat_source, path)
+
+    def _publish_into_existing(self, removals: List[str]) -> None:
+        # 削除対象は名前の変更で退避し（rmtree より短時間で済む）、配置が終わってから消す
+        for key in removals:
+            path = self.path(key)
+            if not os.path.lexists(path):
+                continue
+            if self._removed_dir is None:
+                self._removed_dir = f"{self._staging_dir}-removed"
+                os.mkdir(self._removed_dir)
+            target = os.path.join(self._removed_dir, *key.split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.rename(path, target)
+        for root, dirnames, filenames in os.walk(self._staging_dir):
+            relative = os.path.relpath(root, self._staging_dir)
+            target_root = self.project_dir if relative == "." else os.path.join(self.project_dir, relative)
+            os.makedirs(target_root, exist_ok=True)
+            for filename in filenames:
+                os.replace(os.path.join(root, filename), os.path.join(target_root, filename))
+        _fsync_dir(self.project_dir)
+        # 配置の途中で失敗した場合は退避先を残す（旧版を戻せるように）
+        if self._removed_dir is not None:
+            shutil.rmtree(self._removed_dir, ignore_errors=True)
+            self._removed_dir = None
+
+    def discard(self) -> None:
+        """一時ディレクトリを削除する（確定済み・未作成なら何もしない）"""
+        if self._staging_dir is not None:
+            shutil.rmtree(self._staging_dir, ignore_errors=True)
+            self._staging_dir = None
+
+
+def _fsync_dir(path: str) -> None:
+    """名前の変更をディスクに反映させる（ディレクトリを開けない Windows では省略）"""
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+output/ 配下のプロジェクト索引（SQLite）
+
+check-progress.py・fix-date-mismatch.py は起動のたびに output/ を走査して全 Markdown を読んでいた。
+プロジェクト（output/YYYYMMDD/ とバッチ実行の output/<企業>/YYYYMMDD/）ごとに
+企業名・業界・ファイル一覧・TODO 残数・実行日時・競合取得の状況を <outdir>/.cache/projects.sqlite に記録し、
+更新日時とサイズが変わったファイルだけを読み直す。
+
+- setup-project.py は出力を確定した後にそのプロジェクトだけを索引に反映する
+- refresh() はディレクトリの一覧と stat だけで変更を検出する（消えたプロジェクトは索引からも削除）
+- 対象ファイル: 直下の *.md、knowledge/*.md、competitors/summary.md と competitors/*/summary.md
+
+使い方:
+    from project_index import ProjectIndex
+    with ProjectIndex("output") as index:
+        index.refresh()
+        latest = index.latest_project()
+
+    python src/workflows/project_index.py                 # 索引を更新して一覧を表示
+    python src/workflows/project_index.py --rebuild       # 索引を作り直す
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+INDEX_FILE_NAME = "projects.sqlite"
+DATE_DIR_PATTERN = re.compile(r"^\d{8}$")
+
+HTML_TODO_PATTERN = re.compile(r"<!-- TODO_\w+ -->")
+LEGACY_TODO_PATTERN = re.compile(r"TODO:")
+EXECUTION_DATE_PATTERN = re.compile(
+    r"<!-- TODO_EXECUTION_DATE -->\s*(\d{4}年\d{2}月\d{2}日 \d{2}:\d{2}:\d{2})\s*<!-- /TODO_EXECUTION_DATE -->"
+)
+COMPANY_PATTERN = re.compile(r"\*\*企業名\*\*:\s*(.+)")
+INDUSTRY_PATTERN = re.compile(r"\*\*業界\*\*:\s*(.+)")
+COMPETITOR_SECTION_PATTERN = re.compile(r"^## (.+)\n- URL: (.*)\n- レポート: (.+)$", re.MULTILINE)
+FETCH_STATUS_PATTERN = re.compile(r"^- 取得結果: (.+)$", re.MULTILINE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    path TEXT PRIMARY KEY,
+    client TEXT NOT NULL,
+    date TEXT NOT NULL,
+    company TEXT,
+    industry TEXT,
+    competitors TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS projects_date ON projects (client, date);
+CREATE TABLE IF NOT EXISTS files (
+    project TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    html_todos TEXT NOT NULL,
+    legacy_todos INTEGER NOT NULL,
+    execution_datetime TEXT,
+    PRIMARY KEY (project, name)
+);
+"""
+
+
+def index_path(outdir: str) -> str:
+    return os.path.join(outdir, ".cache", INDEX_FILE_NAME)
+
+
+def count_todos(content: str) -> Tuple[List[str], int]:
+    """(HTMLコメント形式の TODO マーカー, 旧形式「TODO:」の数)"""
+    return HTML_TODO_PATTERN.findall(content), len(LEGACY_TODO_PATTERN.findall(content))
+
+
+def _stat_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def tracked_files(project_dir: str) -> Dict[str, Tuple[int, int]]:
+    """索引の対象ファイル → (mtime_ns, size)。名前はプロジェクトからの相対パス（/ 区切り）"""
+    files: Dict[str, Tuple[int, int]] = {}
+    for sub in ("", "knowledge"):
+        directory = os.path.join(project_dir, sub) if sub else project_dir
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.endswith(".md") and entry.is_file():
+                stat = entry.stat()
+                files[f"{sub}/{entry.name}" if sub else entry.name] = (stat.st_mtime_ns, stat.st_size)
+    competitors_dir = os.path.join(project_dir, "competitors")
+    signature = _stat_signature(os.path.join(competitors_dir, "summary.md"))
+    if signature is not None:
+        files["competitors/summary.md"] = signature
+        try:
+            entries = list(os.scandir(competitors_dir))
+        except OSError:
+            entries = []
+        for entry in entries:
+            if entry.is_dir():
+                signature = _stat_signature(os.path.join(entry.path, "summary.md"))
+                if signature is not None:
+                    files[f"competitors/{entry.name}/summary.md"] = signature
+    return files
+
+
+class ProjectIndex:
+    def __init__(self, outdir: str = "output", path: Optional[str] = None):
+        """
+        Args:
+            outdir: プロジェクトの基底ディレクトリ
+            path: SQLite ファイルのパス（既定: <outdir>/.cache/projects.sqlite）
+        """
+        self.outdir = outdir
+        self.path = path or index_path(outdir)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.stats = {"projects": 0, "read": 0, "removed": 0}
+
+    def __enter__(self) -> "ProjectIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        # 呼び出し側は self._lock を保持していること
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- 更新 ---
+
+    def project_dirs(self) -> Dict[str, str]:
+        """outdir 配下のプロジェクト（相対パス → クライアント名。単社実行は ""）"""
+        projects: Dict[str, str] = {}
+        try:
+            entries = list(os.scandir(self.outdir))
+        except OSError:
+            return projects
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            if DATE_DIR_PATTERN.match(entry.name):
+                projects[entry.name] = ""
+                continue
+            # バッチ実行（output/<企業>/YYYYMMDD/）
+            try:
+                children = list(os.scandir(entry.path))
+            except OSError:
+                continue
+            for child in children:
+                if DATE_DIR_PATTERN.match(child.name) and child.is_dir():
+                    projects[f"{entry.name}/{child.name}"] = entry.name
+        return projects
+
+    def refresh(self) -> "ProjectIndex":
+        """更新日時・サイズが変わったファイルだけを読み直し、消えたプロジェクトを削除する"""
+        projects = self.project_dirs()
+        with self._lock:
+            conn = self._connection()
+            known = {path for (path,) in conn.execute("SELECT path FROM projects")}
+            for path in known - set(projects):
+                conn.execute("DELETE FROM projects WHERE path=?", (path,))
+                conn.execute("DELETE FROM files WHERE project=?", (path,))
+                self.stats["removed"] += 1
+            for path, client in sorted(projects.items()):
+                self._update_locked(conn, path, client)
+            conn.commit()
+        return self
+
+    def update_project(self, project_dir: str) -> None:
+        """1プロジェクトだけを索引に反映する（setup-project.py の出力確定後）"""
+        path = os.path.relpath(project_dir, self.outdir).replace(os.sep, "/")
+        parts = path.split("/")
+        if path.startswith("..") or not DATE_DIR_PATTERN.match(parts[-1]) or len(parts) > 2:
+            raise ValueError(f"{self.outdir} 配下のプロジェクトではありません: {project_dir}")
+        with self._lock:
+            conn = self._connection()
+            self._update_locked(conn, path, parts[0] if len(parts) == 2 else "")
+            conn.commit()
+
+    def _update_locked(self, conn: sqlite3.Connection, path: str, client: str) -> None:
+        project_dir = os.path.join(self.outdir, *path.split("/"))
+        current = tracked_files(project_dir)
+        stored = {
+            name: (mtime_ns, size)
+            for name, mtime_ns, size in conn.execute("SELECT name, mtime_ns, size FROM files WHERE project=?", (path,))
+        }
+        has_project = conn.execute("SELECT 1 FROM projects WHERE path=?", (path,)).fetchone() is not None
+        self.stats["projects"] += 1
+        if has_project and stored == current:
+            return
+
+        for name in set(stored) - set(current):
+            conn.execute("DELETE FROM files WHERE project=? AND name=?", (path, name))
+        contents: Dict[str, str] = {}
+        for name, (mtime_ns, size) in current.items():
+            if stored.get(name) == (mtime_ns, size):
+                continue
+            content = self._read(project_dir, name)
+            contents[name] = content
+            html_todos, legacy_todos = count_todos(content)
+            match = EXECUTION_DATE_PATTERN.search(content)
+            conn.execute(
+                "INSERT OR REPLACE INTO files (project, name, mtime_ns, size, html_todos, legacy_todos, execution_datetime)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, name, mtime_ns, size, json.dumps(html_todos), legacy_todos, match.group(1) if match else None),
+            )
+
+        # 企業名・競合の状況は該当ファイルが変わった場合のみ読み直す
+        row = conn.execute("SELECT company, industry, competitors FROM projects WHERE path=?", (path,)).fetchone()
+        company, industry, competitors = row if row else (None, None, "[]")
+        if "project-summary.md" in contents or "project-summary.md" not in current:
+            summary = contents.get("project-summary.md", "")
+            company = _first_group(COMPANY_PATTERN, summary)
+            industry = _first_group(INDUSTRY_PATTERN, summary)
+        if any(name.startswith("competitors/") for name in contents) or set(stored) != set(current):
+            competitors = json.dumps(self._competitor_status(project_dir, contents), ensure_ascii=False)
+        conn.execute(
+            "INSERT OR REPLACE INTO projects (path, client, date, company, industry, competitors, indexed_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, client, path.split("/")[-1], company, industry, competitors, time.time()),
+        )
+
+    def _read(self, project_dir: str, name: str) -> str:
+        try:
+            with open(os.path.join(project_dir, *name.split("/")), "r", encoding="utf-8") as f:
+                self.stats["read"] += 1
+                return f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"[WARN] 索引の作成で読み込みに失敗: {os.path.join(project_dir, name)} - {e}")
+            return ""
+
+    def _competitor_status(self, project_dir: str, contents: Dict[str, str]) -> List[Dict[str, str]]:
+        """competitors/summary.md の各社と、各社 summary.md の取得結果"""
+        summary = contents.get("competitors/summary.md")
+        if summary is None:
+            summary = self._read(project_dir, "competitors/summary.md") if os.path.exists(os.path.join(project_dir, "competitors", "summary.md")) else ""
+        competitors = []
+        for name, url, report in COMPETITOR_SECTION_PATTERN.findall(summary):
+            report = report.strip()
+            content = contents.get(report)
+            if content is None:
+                content = self._read(project_dir, report) if os.path.exists(os.path.join(project_dir, *report.split("/"))) else ""
+            competitors.append({"name": name.strip(), "url": url.strip(), "status": _first_group(FETCH_STATUS_PATTERN, content) or "不明"})
+        return competitors
+
+    # --- 参照 ---
+
+    def latest_project(self, client: str = "") -> Optional[str]:
+        """最新（日付が最大）のプロジェクトの相対パス"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT path FROM projects WHERE client=? ORDER BY date DESC LIMIT 1", (client,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def projects(self, client: Optional[str] = "") -> List[Dict]:
+        """プロジェクトの一覧（日付順。client=None なら全クライアント）"""
+        query = "SELECT path, client, date, company, industry, competitors FROM projects"
+        params: Tuple = ()
+        if client is not None:
+            query += " WHERE client=?"
+            params = (client,)
+        with self._lock:
+            rows = self._connection().execute(query + " ORDER BY client, date", params).fetchall()
+        return [
+            {"path": path, "client": client_name, "date": date, "company": company, "industry": industry,
+             "competitors": json.loads(competitors)}
+            for path, client_name, date, company, industry, competitors in rows
+        ]
+
+    def files(self, project: str, top_level_only: bool = False) -> List[Dict]:
+        """プロジェクトの対象ファイル（名前順）。TODO の内訳と実行日時を含む"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT name, html_todos, legacy_todos, execution_datetime FROM files WHERE project=? ORDER BY name", (project,)
+            ).fetchall()
+        return [
+            {"name": name, "html_todos": json.loads(html_todos), "legacy_todos": legacy_todos,
+             "remaining_todos": len(json.loads(html_todos)) + legacy_todos, "execution_datetime": execution_datetime}
+            for name, html_todos, legacy_todos, execution_datetime in rows
+            if not top_level_only or "/" not in name
+        ]
+
+    def summary(self) -> str:
+        return f"プロジェクト索引: {self.stats['projects']}件を確認（読み込み {self.stats['read']}ファイル、削除 {self.stats['removed']}件）"
+
+
+def _first_group(pattern, text: str) -> Optional[str]:
+    match = pattern.search(text)
+    return match.group(1).strip() if match else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="output/ 配下のプロジェクト索引")
+    parser.add_argument("--outdir", default="output", help="プロジェクトの基底ディレクトリ（既定: output）")
+    parser.add_argument("--rebuild", action="store_true", help="索引を削除して作り直す")
+    args = parser.parse_args()
+
+    path = index_path(args.outdir)
+    if args.rebuild:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    started = time.perf_counter()
+    with ProjectIndex(args.outdir) as index:
+        index.refresh()
+        elapsed = time.perf_counter() - started
+        print(f"{'プロジェクト':<24}{'企業名':<20}{'残りTODO':>8}{'競合(取得/全体)':>16}")
+        for project in index.projects(client=None):
+            todos = sum(f["remaining_todos"] for f in index.files(project["path"], top_level_only=True) if f["name"] != "README.md")
+            competitors = project["competitors"]
+            fetched = sum(1 for c in competitors if c["status"].startswith("HTTP 2"))
+            print(f"{project['path']:<24}{project['company'] or '-':<20}{todos:>8}{f'{fetched}/{len(competitors)}':>16}")
+        print(f"[INFO] {index.summary()}（{elapsed * 1000:.1f}ms）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
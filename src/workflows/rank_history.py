@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+検索順位の時系列ストア（列指向・追記専用）
+
+output/YYYYMMDD/ の実行はそれぞれ独立しているため、順位の推移を見るには各日の Markdown/JSON を
+読み直す必要があった。rank_tracker.py の取得結果（SerpAPI）を (日付, キーワード, ドメイン, 順位, 広告数) の
+行としてクライアント（自社ドメイン）ごとのストアに追記し、期間を指定して高速に取り出す。
+
+保存先は <outdir>/.history/ranks/<自社ドメイン>/:
+    date.i32 / keyword.i32 / domain.i32 / rank.i16 / ads.u8   列ごとの固定長配列（追記のみ）
+    keywords.txt / domains.txt                               キーワード・ドメインの辞書（行番号 = ID）
+    meta.json                                                確定済みの行数と日付順かどうか
+
+- 順位 0 は圏外（上位 num 件に無し）。広告の有無は ads > 0
+- 追記は列ファイルへの書き込みと fsync の後に meta.json を置き換えて確定する。
+  途中で中断した分（meta.json の行数を超える部分）は読み込み時に無視し、次の追記で切り詰める
+- 日付は通常増える順に追記されるため、期間の絞り込みは日付列の二分探索で行う
+  （古い日付を後から追記した場合のみ全件を走査する）
+- 同じ (日付, キーワード, ドメイン) が複数あれば後に追記したものを採用する（同じ日の再実行）
+  （rank_tracker.py は skip_recorded で追記するため、同じ日の再実行では行が増えず、その日最初の記録が残る）
+
+使い方:
+    python src/workflows/rank_history.py --date 20250808 --days 90          # seo/rank-trend.md を生成（setup-project.py の実行後）
+    python src/workflows/rank_history.py --keyword "葬儀 横浜" --domain example.com --days 90
+    python src/workflows/rank_history.py --backfill                         # 既存の seo/rank-tracking.json を取り込む
+    python src/workflows/rank_history.py --bench --years 3                  # 合成データで追記・期間検索を計測
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:  # POSIX のみ（別プロセスからの同時追記を直列化する）
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+DEFAULT_HISTORY_DIR = os.path.join("output", ".history", "ranks")
+DEFAULT_TREND_DAYS = 90
+OUTPUT_TREND_MARKDOWN = "seo/rank-trend.md"
+SPARK_POINTS = 30
+
+# (ファイル名, array の型コード)
+COLUMNS = (
+    ("date.i32", "i"),
+    ("keyword.i32", "i"),
+    ("domain.i32", "i"),
+    ("rank.i16", "h"),
+    ("ads.u8", "B"),
+)
+
+# (キーワード, ドメイン, 順位または None, 広告数)
+RankRow = Tuple[str, str, Optional[int], int]
+
+
+def date_key(value) -> int:
+    """YYYYMMDD（文字列・整数・datetime）を整数の日付キーにする"""
+    if isinstance(value, datetime):
+        return int(value.strftime("%Y%m%d"))
+    text = str(value).strip()
+    if not re.fullmatch(r"\d{8}", text):
+        raise ValueError(f"日付は YYYYMMDD で指定してください: {value}")
+    datetime.strptime(text, "%Y%m%d")
+    return int(text)
+
+
+def days_before(end: int, days: int) -> int:
+    """end（YYYYMMDD）の days 日前の日付キー"""
+    return int((datetime.strptime(str(end), "%Y%m%d") - timedelta(days=days)).strftime("%Y%m%d"))
+
+
+def _normalize(value: str) -> str:
+    # 辞書は1行1件のため改行等の空白をまとめる
+    return " ".join(str(value).split())
+
+
+def partition_name(domain: str) -> str:
+    """ドメイン・企業名をストアのディレクトリ名にする"""
+    name = re.sub(r"[^\w.-]+", "_", domain.strip().lower()).strip("._")
+    return name or "default"
+
+
+class RankHistory:
+    """1クライアント分の順位の時系列（スレッドセーフ。別プロセスとは追記時にファイルロック）"""
+
+    def __init__(self, root: str, partition: str):
+        self.path = os.path.join(root, partition_name(partition))
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._rows = 0
+        self._sorted = True
+        self._columns: Dict[str, array] = {}
+        self._keywords: List[str] = []
+        self._domains: List[str] = []
+        self._keyword_ids: Dict[str, int] = {}
+        self._domain_ids: Dict[str, int] = {}
+
+    # --- 読み込み ---
+
+    def _read_meta(self) -> Dict:
+        try:
+            with open(os.path.join(self.path, "meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"rows": 0, "sorted": True, "keywords": 0, "domains": 0}
+
+    def _read_dictionary(self, filename: str, count: int) -> List[str]:
+        path = os.path.join(self.path, filename)
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().split("\n")[:count]
+
+    def _load(self) -> None:
+        # 呼び出し側は self._lock を保持していること
+        meta = self._read_meta()
+        rows = int(meta.get("rows", 0))
+        self._columns = {}
+        for filename, typecode in COLUMNS:
+            column = array(typecode)
+            path = os.path.join(self.path, filename)
+            if rows:
+                with open(path, "rb") as f:
+                    column.fromfile(f, rows)
+            self._columns[filename] = column
+        self._rows = rows
+        self._sorted = bool(meta.get("sorted", True))
+        self._keywords = self._read_dictionary("keywords.txt", int(meta.get("keywords", 0)))
+        self._domains = self._read_dictionary("domains.txt", int(meta.get("domains", 0)))
+        self._keyword_ids = {keyword: index for index, keyword in enumerate(self._keywords)}
+        self._domain_ids = {domain: index for index, domain in enumerate(self._domains)}
+        self._loaded = True
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+
+    def reload(self) -> None:
+        """別プロセスが追記した分を読み直す"""
+        with self._lock:
+            self._load()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return self._rows
+
+    # --- 追記 ---
+
+    def append(self, date, rows: Iterable[RankRow], skip_recorded: bool = False) -> int:
+        """date の行を追記して確定し、追記した行数を返す
+
+        skip_recorded なら date に記録済みの (キーワード, ドメイン) は追記しない（同じ日の再実行で行を増やさない）。
+        """
+        day = date_key(date)
+        rows = list(rows)
+        if not rows:
+            return 0
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock, _FileLock(os.path.join(self.path, ".lock")):
+            # 別プロセスの追記を取り込んでから書く
+            self._load()
+            if skip_recorded:
+                rows = self._unrecorded(day, rows)
+                if not rows:
+                    return 0
+            try:
+                self._append_locked(day, rows)
+            except BaseException:
+                # 確定前の失敗はメモリ上の状態も捨て、次の参照で meta.json から読み直す
+                self._loaded = False
+                raise
+        return len(rows)
+
+    def _unrecorded(self, day: int, rows: List[RankRow]) -> List[RankRow]:
+        """rows のうち day に未記録の (キーワード, ドメイン) の行（rows 内の重複は先のものを残す）"""
+        lo, hi, check = self._row_range(day, day)
+        recorded = {
+            (keyword_id, domain_id)
+            for row_day, keyword_id, domain_id in zip(
+                self._columns["date.i32"][lo:hi], self._columns["keyword.i32"][lo:hi], self._columns["domain.i32"][lo:hi])
+            if not check or row_day == day
+        }
+        unrecorded = []
+        seen = set()
+        for row in rows:
+            keyword, domain = _normalize(row[0]), _normalize(row[1])
+            if (self._keyword_ids.get(keyword), self._domain_ids.get(domain)) in recorded or (keyword, domain) in seen:
+                continue
+            seen.add((keyword, domain))
+            unrecorded.append(row)
+        return unrecorded
+
+    def _append_locked(self, day: int, rows: List[RankRow]) -> None:
+        new_keywords: List[str] = []
+        new_domains: List[str] = []
+        batch = {filename: array(typecode) for filename, typecode in COLUMNS}
+        for keyword, domain, rank, ads in rows:
+            batch["date.i32"].append(day)
+            batch["keyword.i32"].append(self._intern(keyword, self._keywords, self._keyword_ids, new_keywords))
+            batch["domain.i32"].append(self._intern(domain, self._domains, self._domain_ids, new_domains))
+            batch["rank.i16"].append(max(0, min(int(rank or 0), 32767)))
+            batch["ads.u8"].append(max(0, min(int(ads or 0), 255)))
+
+        self._append_dictionary("keywords.txt", new_keywords)
+        self._append_dictionary("domains.txt", new_domains)
+        for filename, typecode in COLUMNS:
+            path = os.path.join(self.path, filename)
+            item_size = array(typecode).itemsize
+            with open(path, "ab") as f:
+                # 前回中断した書きかけの分を切り詰める
+                if f.tell() != self._rows * item_size:
+                    f.truncate(self._rows * item_size)
+                    f.seek(self._rows * item_size)
+                batch[filename].tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+            self._columns[filename].extend(batch[filename])
+
+        dates = self._columns["date.i32"]
+        self._sorted = self._sorted and (self._rows == 0 or dates[self._rows - 1] <= day)
+        self._rows += len(rows)
+        self._write_meta()
+
+    @staticmethod
+    def _intern(value: str, values: List[str], ids: Dict[str, int], added: List[str]) -> int:
+        value = _normalize(value)
+        index = ids.get(value)
+        if index is None:
+            index = len(values)
+            values.append(value)
+            ids[value] = index
+            added.append(value)
+        return index
+
+    def _append_dictionary(self, filename: str, added: List[str]) -> None:
+        if not added:
+            return
+        values = self._keywords if filename == "keywords.txt" else self._domains
+        # 確定前に中断しても meta.json の件数までしか読まないため、全体を置き換えてよい
+        path = os.path.join(self.path, filename)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(values))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def _write_meta(self) -> None:
+        meta = {"rows": self._rows, "sorted": self._sorted, "keywords": len(self._keywords), "domains": len(self._domains)}
+        path = os.path.join(self.path, "meta.json")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    # --- 検索 ---
+
+    def _row_range(self, start: Optional[int], end: Optional[int]) -> Tuple[int, int, bool]:
+        """期間に該当する行の範囲 [lo, hi) と、範囲内の日付の確認が必要か"""
+        dates = self._columns["date.i32"]
+        if not self._sorted:
+            return 0, self._rows, start is not None or end is not None
+        lo = 0 if start is None else bisect_left(dates, start, 0, self._rows)
+        hi = self._rows if end is None else bisect_right(dates, end, lo, self._rows)
+        return lo, hi, False
+
+    def dates(self, start=None, end=None) -> List[int]:
+        """期間内で記録のある日付（昇順）"""
+        start_key = None if start is None else date_key(start)
+        end_key = None if end is None else date_key(end)
+        with self._lock:
+            self._ensure_loaded()
+            lo, hi, check = self._row_range(start_key, end_key)
+            values = set(self._columns["date.i32"][lo:hi])
+        if check:
+            values = {day for day in values if (start_key is None or day >= start_key) and (end_key is None or day <= end_key)}
+        return sorted(values)
+
+    def series(self, keyword: str, domain: str, start=None, end=None) -> List[Tuple[int, Optional[int], int]]:
+        """keyword での domain の (日付, 順位または None, 広告数) を日付順に返す"""
+        return self.window(start, end, keywords=[keyword], domains=[domain]).get((_normalize(keyword), _normalize(domain)), [])
+
+    def window(self, start=None, end=None, keywords: Optional[Sequence[str]] = None,
+               domains: Optional[Sequence[str]] = None) -> Dict[Tuple[str, str], List[Tuple[int, Optional[int], int]]]:
+        """期間内の (キーワード, ドメイン) → [(日付, 順位または None, 広告数)]（日付順）を1回の走査で返す"""
+        start_key = None if start is None else date_key(start)
+        end_key = None if end is None else date_key(end)
+        with self._lock:
+            self._ensure_loaded()
+            keyword_filter = None if keywords is None else {self._keyword_ids.get(_normalize(k)) for k in keywords} - {None}
+            domain_filter = None if domains is None else {self._domain_ids.get(_normalize(d)) for d in domains} - {None}
+            if keyword_filter == set() or domain_filter == set():
+                return {}
+            lo, hi, check = self._row_range(start_key, end_key)
+            columns = [self._columns[filename][lo:hi] for filename, _ in COLUMNS]
+            keyword_names, domain_names = list(self._keywords), list(self._domains)
+
+        grouped: Dict[Tuple[int, int], Dict[int, Tuple[int, int]]] = {}
+        for day, keyword_id, domain_id, rank, ads in zip(*columns):
+            if keyword_filter is not None and keyword_id not in keyword_filter:
+                continue
+            if domain_filter is not None and domain_id not in domain_filter:
+                continue
+            if check and ((start_key is not None and day < start_key) or (end_key is not None and day > end_key)):
+                continue
+            # 同じ日の再実行は後に追記したものが優先
+            grouped.setdefault((keyword_id, domain_id), {})[day] = (rank, ads)
+        return {
+            (keyword_names[keyword_id], domain_names[domain_id]): [
+                (day, rank or None, ads) for day, (rank, ads) in sorted(values.items())
+            ]
+            for (keyword_id, domain_id), values in grouped.items()
+        }
+
+
+class _FileLock:
+    """追記中の排他（fcntl が無い環境ではプロセス内のロックのみ）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> "_FileLock":
+        if fcntl is not None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+# --- 推移レポート ---
+
+_SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(ranks: Sequence[Optional[int]], num: int) -> str:
+    """順位の推移を文字で表す（上位ほど高いブロック、圏外は「・」）"""
+    cells = []
+    for rank in ranks:
+        if rank is None:
+            cells.append("・")
+        else:
+            level = (num - min(rank, num)) * (len(_SPARK_BLOCKS) - 1) // max(1, num - 1)
+            cells.append(_SPARK_BLOCKS[level])
+    return "".join(cells)
+
+
+def format_change(previous: Optional[int], latest: Optional[int]) -> str:
+    """前回からの変化（順位が上がれば ↑）"""
+    if previous is None and latest is None:
+        return "→"
+    if previous is None:
+        return "新規"
+    if latest is None:
+        return "圏外へ"
+    if latest < previous:
+        return f"↑{previous - latest}"
+    if latest > previous:
+        return f"↓{latest - previous}"
+    return "→"
+
+
+def build_trend_report(history: RankHistory, keywords: Sequence[str], sites: Sequence[Tuple[str, str]],
+                       start: int, end: int, num: int) -> str:
+    """期間内の順位推移（Markdown）。sites は (表示名, ドメイン)"""
+    series = history.window(start, end, keywords=keywords, domains=[domain for _, domain in sites])
+    observed = history.dates(start, end)
+    lines = [
+        "# 検索順位の推移（SerpAPI）",
+        "",
+        f"- 期間: {start} 〜 {end}（記録のある日 {len(observed)}日）",
+        f"- キーワード: {len(keywords)}件 / 対象サイト: {len(sites)}件",
+        "",
+    ]
+    if not observed:
+        lines += ["期間内の記録がありません（`rank_tracker.py` を実行すると記録されます）", ""]
+        return "\n".join(lines)
+
+    for keyword in keywords:
+        lines += [f"## {keyword}", "", "| サイト | 最新 | 前回比 | 期間初日比 | 最高 | 推移 |", "|---|---|---|---|---|---|"]
+        for name, domain in sites:
+            points = series.get((keyword, domain), [])
+            if not points:
+                lines.append(f"| {name} | - | - | - | - | |")
+                continue
+            ranks = [rank for _, rank, _ in points]
+            ranked = [rank for rank in ranks if rank is not None]
+            latest = ranks[-1]
+            cells = [
+                name,
+                "圏外" if latest is None else str(latest),
+                format_change(ranks[-2], latest) if len(ranks) > 1 else "-",
+                format_change(ranks[0], latest) if len(ranks) > 1 else "-",
+                str(min(ranked)) if ranked else "圏外",
+                sparkline(ranks[-SPARK_POINTS:], num),
+            ]
+            lines.append("| " + " | ".join(cell.replace("|", "\\|") for cell in cells) + " |")
+        ads_days = sum(1 for _, _, ads in (series.get((keyword, sites[0][1])) or []) if ads) if sites else 0
+        lines += ["", f"広告の表示: {ads_days}日 / 推移は直近{SPARK_POINTS}回（上位ほど高い、・: 圏外）", ""]
+    lines.append(f"順位は上位{num}件のオーガニック結果での最上位（圏外: {num}位以内に無し / -: 記録なし）")
+    lines.append("")
+    return "\n".join(lines)
+
+
+# --- 既存の実行結果の取り込み ---
+
+def backfill(outdir: str, history_root: str) -> Dict[str, int]:
+    """<outdir>/YYYYMMDD/seo/rank-tracking.json を取り込む（ストアに記録のある日付は飛ばす）。パーティション → 行数"""
+    added: Dict[str, int] = {}
+    stores: Dict[str, RankHistory] = {}
+    for path in sorted(glob.glob(os.path.join(outdir, "[0-9]" * 8, "seo", "rank-tracking.json"))):
+        day = os.path.basename(os.path.dirname(os.path.dirname(path)))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            rows, partition = rows_from_payload(payload)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[WARN] 取り込めません: {path} - {e}")
+            continue
+        if not rows:
+            continue
+        history = stores.setdefault(partition, RankHistory(history_root, partition))
+        if date_key(day) in history.dates(day, day):
+            continue
+        added[partition] = added.get(partition, 0) + history.append(day, rows)
+    return added
+
+
+def rows_from_payload(payload: Dict) -> Tuple[List[RankRow], str]:
+    """rank-tracking.json の内容から (行, 自社ドメイン) を返す（取得できたキーワードのみ）"""
+    sites = payload.get("sites") or []
+    domains = {site["name"]: site["domain"] for site in sites}
+    client = next((site["domain"] for site in sites if site.get("client")), sites[0]["domain"] if sites else "default")
+    rows = []
+    for entry in payload.get("keywords") or []:
+        if entry.get("status") != "OK":
+            continue
+        for name, rank in (entry.get("ranks") or {}).items():
+            if name in domains:
+                rows.append((entry["keyword"], domains[name], rank, entry.get("ads") or 0))
+    return rows, client
+
+
+# --- ベンチマーク ---
+
+def run_bench(years: int, keywords: int, domains: int, days: int) -> int:
+    """合成データ（毎日 keywords × domains 行）で追記と期間検索を計測する"""
+    workdir = tempfile.mkdtemp(prefix="rank-history-bench-")
+    rng = random.Random(0)
+    try:
+        history = RankHistory(workdir, "bench.example.jp")
+        keyword_names = [f"キーワード{index}" for index in range(keywords)]
+        domain_names = [f"site{index}.example.jp" for index in range(domains)]
+        first = datetime(2020, 1, 1)
+        total_days = years * 365
+        started = time.perf_counter()
+        for offset in range(total_days):
+            day = first + timedelta(days=offset)
+            history.append(day, [(k, d, rng.choice([None] + list(range(1, 101))), rng.randint(0, 3))
+                                 for k in keyword_names for d in domain_names])
+        append_seconds = time.perf_counter() - started
+        print(f"[INFO] 追記: {len(history)}行（{total_days}日 × {keywords * domains}行）{append_seconds:.2f}秒")
+
+        end = date_key(first + timedelta(days=total_days - 1))
+        start = days_before(end, days)
+        reopened = RankHistory(workdir, "bench.example.jp")
+        started = time.perf_counter()
+        length = len(reopened)
+        load_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        points = reopened.series(keyword_names[0], domain_names[0], start, end)
+        series_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        table = reopened.window(start, end)
+        window_seconds = time.perf_counter() - started
+        size = sum(os.path.getsize(os.path.join(reopened.path, filename)) for filename, _ in COLUMNS)
+        print(f"[INFO] 読み込み: {length}行 {load_seconds * 1000:.1f}ms（列ファイル {size / 1024 / 1024:.1f}MB）")
+        print(f"[INFO] 1系列（{days}日）: {len(points)}点 {series_seconds * 1000:.1f}ms")
+        print(f"[INFO] 全系列（{days}日）: {len(table)}系列 {window_seconds * 1000:.1f}ms")
+        if len(points) != days + 1 or len(table) != keywords * domains:
+            print("[ERROR] 検索結果の件数が想定と異なります")
+            return 1
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print("[OK] ベンチマーク完了")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="検索順位の時系列ストアと推移レポート")
+    parser.add_argument("--config", default="input/project-config.yaml", help="設定ファイル（既定: input/project-config.yaml）")
+    parser.add_argument("--outdir", default="output", help="出力先の基底ディレクトリ（既定: output）")
+    parser.add_argument("--date", help="レポートの日付・期間の終わり（YYYYMMDD、既定: 今日）")
+    parser.add_argument("--project-dir", help="レポートの出力先（--outdir/--date より優先）")
+    parser.add_argument("--history-dir", help="ストアの保存先（既定: <outdir>/.history/ranks）")
+    parser.add_argument("--days", type=int, default=DEFAULT_TREND_DAYS, help=f"期間の日数（既定: {DEFAULT_TREND_DAYS}）")
+    parser.add_argument("--num", type=int, default=100, help="順位を調べた件数（推移の表示用、既定: 100）")
+    parser.add_argument("--keyword", help="この1キーワードの推移を表示（--domain と併用）")
+    parser.add_argument("--domain", help="この1ドメインの推移を表示（--keyword と併用）")
+    parser.add_argument("--backfill", action="store_true", help="<outdir>/YYYYMMDD/seo/rank-tracking.json を取り込む")
+    parser.add_argument("--bench", action="store_true", help="合成データで追記・期間検索を計測")
+    parser.add_argument("--years", type=int, default=3, help="--bench の年数（既定: 3）")
+    parser.add_argument("--keywords", type=int, default=30, help="--bench のキーワード数（既定: 30）")
+    parser.add_argument("--domains", type=int, default=6, help="--bench のドメイン数（既定: 6）")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        return run_bench(args.years, args.keywords, args.domains, args.days)
+
+    history_root = args.history_dir or os.path.join(args.outdir, ".history", "ranks")
+    if args.backfill:
+        added = backfill(args.outdir, history_root)
+        for partition, count in sorted(added.items()):
+            print(f"[OK] {partition}: {count}行を取り込みました")
+        if not added:
+            print("[INFO] 取り込む結果はありませんでした")
+
+    from config_loader import ConfigLoader
+    from rank_tracker import PROJECT_SUMMARY_NAME, collect_keywords, collect_sites
+
+    config_loader = ConfigLoader(args.config)
+    tracked = collect_sites(config_loader)
+    if not tracked:
+        print("[ERROR] 自社・競合の website が設定されていません")
+        return 1
+    client = next((site for site in tracked if site.is_client), tracked[0])
+    history = RankHistory(history_root, client.domain)
+    end = date_key(args.date or datetime.now())
+    start = days_before(end, args.days)
+
+    if args.keyword or args.domain:
+        if not (args.keyword and args.domain):
+            print("[ERROR] --keyword と --domain は両方指定してください")
+            return 1
+        points = history.series(args.keyword, args.domain, start, end)
+        print(f"[INFO] {args.keyword} / {args.domain}（{start} 〜 {end}）: {len(points)}日")
+        for day, rank, ads in points:
+            print(f"  {day}  {'圏外' if rank is None else rank:>4}  広告 {ads}")
+        return 0
+
+    project_dir = args.project_dir or os.path.join(args.outdir, str(end))
+    if not os.path.isfile(os.path.join(project_dir, PROJECT_SUMMARY_NAME)):
+        print(f"[ERROR] {project_dir} に {PROJECT_SUMMARY_NAME} がありません（先に setup-project.py --date {end} を実行してください）")
+        return 1
+    keywords = [keyword for keyword, _ in collect_keywords(config_loader.get_seo_config())]
+    sites = [(f"{site.name}（自社）" if site.is_client else site.name, site.domain) for site in tracked]
+    report = build_trend_report(history, keywords, sites, start, end, args.num)
+    from output_writer import OutputWriter
+
+    with OutputWriter(project_dir) as output:
+        output.write_text(OUTPUT_TREND_MARKDOWN, report)
+        output.commit()
+    print(f"[OK] 順位の推移を保存: {os.path.join(project_dir, OUTPUT_TREND_MARKDOWN)}（{len(history.dates(start, end))}日分）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SerpAPI による検索順位トラッキング（STEP2 SEO分析の入力）
+
+project-config.yaml の seo.primary_keywords / secondary_keywords / local_keywords を
+クレジット予算の範囲で SerpAPI に並列に問い合わせ、キーワードごとに自社（company.contact.website）と
+各競合（competitors.target_companies[].website）の順位を求める。
+結果はプロジェクトディレクトリの seo/rank-tracking.md（表）と seo/rank-tracking.json に書き出す。
+プロジェクトディレクトリは setup-project.py で先に作成しておく（project-summary.md が無ければ問い合わせずに終了する。
+先に seo/ だけを作ると、setup-project.py が既存プロジェクトとみなして上書き確認を求めるため）。
+
+- 予算（--budget）は問い合わせ1回 = 1クレジットで数え、キーワードの並び順に割り当てる
+  （超えた分は問い合わせずに「未取得」とする。HTTP エラーで失敗した分は予算に戻す）
+- 同時実行数は --workers。SerpAPI への送信間隔は共有 HTTP Session のホスト単位のレート制限に従う
+  （fetch.hosts.serpapi.com で調整）
+- --endpoint（または環境変数 SERPAPI_ENDPOINT）でローカルの代替サーバー（serpapi-stub.py）に向けられる
+- 応答は使う項目だけのレコード（serp_record）に射影して SERP キャッシュ（serp_cache、<outdir>/.cache/serp.sqlite）に
+  保存し、同じ日の鮮度内（--cache-hours）の再実行ではクレジットを使わずに再利用する
+  （--archive-raw で元の応答も <outdir>/.store に圧縮保存）
+- 取得できた順位は時系列ストア（rank_history、<outdir>/.history/ranks/）に日付ごとに追記する
+  （推移は rank_history.py で seo/rank-trend.md に出力）
+
+使い方:
+    python src/workflows/rank_tracker.py --date 20250808 --budget 20 --workers 4
+    python src/workflows/rank_tracker.py --date 20250808 --dry-run            # 問い合わせ内容と必要クレジットのみ表示
+    python src/workflows/serpapi-stub.py --port 8766 &
+    python src/workflows/rank_tracker.py --date 20250808 --endpoint http://127.0.0.1:8766/search --api-key dummy
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from rank_history import RankHistory
+from serp_cache import DEFAULT_MAX_AGE, SerpCache
+from serp_record import OrganicResult, SerpRecord, project
+
+SERPAPI_ENDPOINT = "https://serpapi.com/search"
+DEFAULT_CREDIT_BUDGET = 10
+DEFAULT_WORKERS = 4
+DEFAULT_NUM_RESULTS = 100
+DEFAULT_TIMEOUT = 30
+
+# (設定のキー, 表示名)。この順に問い合わせ、予算もこの順に割り当てる
+KEYWORD_GROUPS = (
+    ("primary_keywords", "メイン"),
+    ("secondary_keywords", "サブ"),
+    ("local_keywords", "地域"),
+)
+
+OUTPUT_MARKDOWN = "seo/rank-tracking.md"
+# setup-project.py が作成したプロジェクトディレクトリの目印
+PROJECT_SUMMARY_NAME = "project-summary.md"
+OUTPUT_JSON = "seo/rank-tracking.json"
+
+
+@dataclass
+class TrackedSite:
+    name: str
+    domain: str
+    is_client: bool = False
+
+
+@dataclass
+class KeywordRank:
+    keyword: str
+    group: str
+    status: str = "未取得"
+    # サイト名 → 順位（上位 num 件に無ければ None）
+    ranks: Dict[str, Optional[int]] = field(default_factory=dict)
+    ads: int = 0
+    seconds: float = 0.0
+    cached: bool = False
+
+    @property
+    def fetched(self) -> bool:
+        return self.status == "OK"
+
+    @property
+    def status_label(self) -> str:
+        return "OK（キャッシュ）" if self.fetched and self.cached else self.status
+
+
+class CreditBudget:
+    """問い合わせ1回 = 1クレジットの予算（スレッドセーフ）"""
+
+    def __init__(self, limit: int):
+        self.limit = max(0, limit)
+        self.spent = 0
+        self.refunded = 0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> bool:
+        with self._lock:
+            if self.spent >= self.limit:
+                return False
+            self.spent += 1
+            return True
+
+    def refund(self) -> None:
+        """課金されなかった問い合わせ（HTTP エラー等）の分を戻す"""
+        with self._lock:
+            self.spent -= 1
+            self.refunded += 1
+
+
+def site_domain(url: str) -> str:
+    """URL からホスト名（小文字、先頭の www. を除く）を返す"""
+    if "//" not in url:
+        url = f"//{url}"
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def domain_matches(link: str, domain: str) -> bool:
+    """link が domain 自身またはそのサブドメインのページか"""
+    host = site_domain(link)
+    return bool(domain) and (host == domain or host.endswith("." + domain))
+
+
+def collect_keywords(seo_config: Dict) -> List[Tuple[str, str]]:
+    """seo 設定から (キーワード, 区分) を重複を除いて並び順どおりに返す"""
+    keywords = []
+    seen = set()
+    for key, label in KEYWORD_GROUPS:
+        for keyword in seo_config.get(key) or []:
+            keyword = str(keyword).strip()
+            if keyword and keyword not in seen:
+                seen.add(keyword)
+                keywords.append((keyword, label))
+    return keywords
+
+
+def collect_sites(config_loader) -> List[TrackedSite]:
+    """自社と競合（URL の無いものは除く）"""
+    company = config_loader.get_company_info()
+    sites = []
+    client_url = (company.get("contact") or {}).get("website") or ""
+    if client_url:
+        sites.append(TrackedSite(name=company.get("name") or "自社", domain=site_domain(client_url), is_client=True))
+    competitors = config_loader.get_competitors_info().get("target_companies") or []
+    for index, competitor in enumerate(competitors, start=1):
+        url = competitor.get("website") or ""
+        if url:
+            sites.append(TrackedSite(name=competitor.get("name") or f"競合{index}", domain=site_domain(url)))
+    return sites
+
+
+# 絶対 URL と requests の「with url: /search?...」のような相対パスの両方
+_URL_QUERY_PATTERN = re.compile(r"((?:https?://|/)[^\s?'\"()<>]*)\?[^\s'\"()<>]*")
+
+
+def redact_secrets(text: str, api_key: str = "") -> str:
+    """エラーの文言から URL のクエリ文字列（api_key=...）と APIキーそのものを取り除く"""
+    text = _URL_QUERY_PATTERN.sub(r"\1?…", text)
+    text = re.sub(r"api_key=[^\s&'\"]+", "api_key=***", text)
+    if api_key:
+        text = text.replace(api_key, "***")
+    return text
+
+
+def rank_in_results(organic: Sequence[OrganicResult], domain: str) -> Optional[int]:
+    """オーガニック結果での domain の最上位の順位"""
+    for result in organic:
+        if domain_matches(result.link, domain):
+            return result.position
+    return None
+
+
+class RankTracker:
+    def __init__(self, api_key: str, endpoint: str = SERPAPI_ENDPOINT, location: Optional[str] = None,
+                 num: int = DEFAULT_NUM_RESULTS, timeout: int = DEFAULT_TIMEOUT, budget: int = DEFAULT_CREDIT_BUDGET,
+                 workers: int = DEFAULT_WORKERS, cache=None):
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.location = location
+        self.num = num
+        self.timeout = timeout
+        self.budget = CreditBudget(budget)
+        self.workers = max(1, workers)
+        self.credits_left: Optional[int] = None
+        # serp_cache.SerpCache（None ならキャッシュしない）
+        self.cache = cache
+
+    def params(self, keyword: str) -> Dict[str, str]:
+        params = {"engine": "google", "q": keyword, "hl": "ja", "gl": "jp", "num": str(self.num)}
+        if self.location:
+            params["location"] = self.location
+        return params
+
+    def search(self, keyword: str) -> Dict:
+        """SerpAPI に1回問い合わせて JSON を返す（HTTP エラー・接続失敗は予算に戻して例外）"""
+        from http_client import get_session
+
+        try:
+            response = get_session().get(self.endpoint, params=dict(self.params(keyword), api_key=self.api_key), timeout=self.timeout)
+        except Exception as e:
+            # サーバーに届いていない（課金されていない）ため予算に戻す
+            self.budget.refund()
+            raise RuntimeError(f"接続失敗: {type(e).__name__}: {e}") from None
+        if response.status_code != 200:
+            self.budget.refund()
+            try:
+                message = response.json().get("error") or ""
+            except ValueError:
+                message = response.text[:200]
+            raise RuntimeError(f"HTTP {response.status_code} {message}".strip())
+        return response.json()
+
+    @staticmethod
+    def _apply(row: KeywordRank, record: SerpRecord, sites: Sequence[TrackedSite]) -> None:
+        row.ranks = {site.name: rank_in_results(record.organic, site.domain) for site in sites}
+        row.ads = record.ads
+        row.status = "OK"
+
+    def _track_one(self, row: KeywordRank, sites: Sequence[TrackedSite]) -> KeywordRank:
+        started = time.perf_counter()
+        try:
+            data = self.search(row.keyword)
+            if data.get("error"):
+                raise RuntimeError(data["error"])
+            if self.cache is not None:
+                record = self.cache.put(self.params(row.keyword), data, seconds=time.perf_counter() - started)
+            else:
+                record = project(data)
+            self._apply(row, record, sites)
+            credits = record.credits_left
+            if credits is not None:
+                self.credits_left = credits if self.credits_left is None else min(self.credits_left, credits)
+        except Exception as e:
+            # 例外の文言には api_key を含む URL が入りうるため、レポートに書く前に取り除く
+            row.status = f"失敗: {redact_secrets(str(e), self.api_key)}"
+        row.seconds = time.perf_counter() - started
+        return row
+
+    def track(self, keywords: Sequence[Tuple[str, str]], sites: Sequence[TrackedSite]) -> List[KeywordRank]:
+        """キャッシュに無く予算の範囲のキーワードを並列に問い合わせ、入力順の結果を返す"""
+        rows = [KeywordRank(keyword=keyword, group=group) for keyword, group in keywords]
+        pending = []
+        for row in rows:
+            record = self.cache.get(self.params(row.keyword)) if self.cache is not None else None
+            if record is None:
+                pending.append(row)
+            else:
+                self._apply(row, record, sites)
+                row.cached = True
+        # 予算はキーワードの並び順に割り当てる（並列実行の順序に左右されない）
+        scheduled = [row for row in pending if self.budget.reserve()]
+        for row in pending[len(scheduled):]:
+            row.status = "未取得（予算超過）"
+        with ThreadPoolExecutor(max_workers=min(self.workers, max(1, len(scheduled))), thread_name_prefix="serpapi") as executor:
+            list(executor.map(lambda row: self._track_one(row, sites), scheduled))
+        return rows
+
+
+def _format_rank(row: KeywordRank, site: TrackedSite) -> str:
+    if not row.fetched:
+        return "-"
+    rank = row.ranks.get(site.name)
+    return "圏外" if rank is None else str(rank)
+
+
+def format_rank_table(rows: Sequence[KeywordRank], sites: Sequence[TrackedSite], num: int) -> str:
+    """キーワード × サイトの順位表（Markdown）"""
+    header = ["キーワード", "区分"] + [f"{site.name}（自社）" if site.is_client else site.name for site in sites] + ["広告", "状態"]
+    lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+    for row in rows:
+        cells = [row.keyword, row.group] + [_format_rank(row, site) for site in sites]
+        cells += [str(row.ads) if row.fetched else "-", row.status_label]
+        lines.append("| " + " | ".join(cell.replace("|", "\\|") for cell in cells) + " |")
+    lines.append("")
+    lines.append(f"順位は上位{num}件のオーガニック結果での最上位（圏外: {num}位以内に無し / -: 未取得）")
+    return "\n".join(lines)
+
+
+def build_report(rows: Sequence[KeywordRank], sites: Sequence[TrackedSite], tracker: RankTracker, executed_at: str) -> str:
+    fetched = sum(1 for row in rows if row.fetched)
+    lines = [
+        "# 検索順位トラッキング（SerpAPI）",
+        "",
+        f"- 取得日時: {executed_at}",
+        f"- 地域: {tracker.location or '指定なし（gl=jp）'}",
+        f"- キーワード: {len(rows)}件（取得 {fetched}件）",
+        f"- 使用クレジット: {tracker.budget.spent} / 予算 {tracker.budget.limit}",
+    ]
+    if tracker.credits_left is not None:
+        lines.append(f"- 残りクレジット: {tracker.credits_left}")
+    if tracker.cache is not None:
+        lines.append(f"- {tracker.cache.summary()}")
+    lines += ["", format_rank_table(rows, sites, tracker.num), ""]
+    return "\n".join(lines)
+
+
+def build_json(rows: Sequence[KeywordRank], sites: Sequence[TrackedSite], tracker: RankTracker, executed_at: str) -> str:
+    payload = {
+        "executed_at": executed_at,
+        "location": tracker.location,
+        "num": tracker.num,
+        "credits": {"spent": tracker.budget.spent, "budget": tracker.budget.limit, "left": tracker.credits_left},
+        "sites": [{"name": site.name, "domain": site.domain, "client": site.is_client} for site in sites],
+        "keywords": [
+            {"keyword": row.keyword, "group": row.group, "status": row.status, "cached": row.cached, "ranks": row.ranks, "ads": row.ads}
+            for row in rows
+        ],
+    }
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def history_rows(rows: Sequence[KeywordRank], sites: Sequence[TrackedSite]):
+    """時系列ストアに追記する (キーワード, ドメイン, 順位, 広告数)（取得できたキーワードのみ）"""
+    return [
+        (row.keyword, site.domain, row.ranks.get(site.name), row.ads)
+        for row in rows if row.fetched
+        for site in sites
+    ]
+
+
+def _load_api_key(cli_api_key: Optional[str]) -> str:
+    if not cli_api_key and not os.getenv("SERPAPI_KEY"):
+        try:
+            from dotenv import load_dotenv  # オプション依存（.env から SERPAPI_KEY を読む）
+
+            load_dotenv()
+        except ImportError:
+            pass
+    return (cli_api_key or os.getenv("SERPAPI_KEY") or "").strip()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="SerpAPI による検索順位トラッキング")
+    parser.add_argument("--config", default="input/project-config.yaml", help="設定ファイル（既定: input/project-config.yaml）")
+    parser.add_argument("--outdir", default="output", help="出力先の基底ディレクトリ（既定: output）")
+    parser.add_argument("--date", help="プロジェクトの日付（YYYYMMDD、既定: 今日）")
+    parser.add_argument("--project-dir", help="出力先のプロジェクトディレクトリ（--outdir/--date より優先）")
+    parser.add_argument("--budget", type=int, default=DEFAULT_CREDIT_BUDGET, help=f"使用するクレジットの上限（既定: {DEFAULT_CREDIT_BUDGET}）")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"同時に問い合わせる数（既定: {DEFAULT_WORKERS}）")
+    parser.add_argument("--num", type=int, default=DEFAULT_NUM_RESULTS, help=f"順位を調べる件数（既定: {DEFAULT_NUM_RESULTS}）")
+    parser.add_argument("--location", default=os.getenv("TARGET_LOCATION"), help="SerpAPI の location（既定: 環境変数 TARGET_LOCATION）")
+    parser.add_argument("--endpoint", default=os.getenv("SERPAPI_ENDPOINT", SERPAPI_ENDPOINT), help="SerpAPI のエンドポイント（代替サーバーを使う場合。環境変数 SERPAPI_ENDPOINT）")
+    parser.add_argument("--api-key", dest="api_key", help="SerpAPI の APIキー（既定: 環境変数 SERPAPI_KEY）")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT, help=f"1回の問い合わせのタイムアウト秒（既定: {DEFAULT_TIMEOUT}）")
+    parser.add_argument("--cache-dir", help="SERPキャッシュの保存先（既定: <outdir>/.cache）")
+    parser.add_argument("--cache-hours", type=float, default=DEFAULT_MAX_AGE / 3600, help="同じ日の結果を再利用する鮮度（時間、既定: 24）")
+    parser.add_argument("--archive-raw", action="store_true", help="元の応答も圧縮して <outdir>/.store に保存（監査用）")
+    parser.add_argument("--no-serp-cache", action="store_true", help="SERPキャッシュを使わない（毎回クレジットを使う）")
+    parser.add_argument("--history-dir", help="順位の時系列ストアの保存先（既定: <outdir>/.history/ranks）")
+    parser.add_argument("--no-history", action="store_true", help="順位を時系列ストアに記録しない")
+    parser.add_argument("--dry-run", action="store_true", help="問い合わせずにキーワードと必要クレジットを表示")
+    args = parser.parse_args(argv)
+
+    from config_loader import ConfigLoader
+
+    config_loader = ConfigLoader(args.config)
+    keywords = collect_keywords(config_loader.get_seo_config())
+    sites = collect_sites(config_loader)
+    if not keywords:
+        print("[ERROR] seo.primary_keywords / secondary_keywords / local_keywords が設定されていません")
+        return 1
+    if not sites:
+        print("[ERROR] 自社・競合の website が設定されていません")
+        return 1
+
+    cache = None
+    if not args.no_serp_cache:
+        cache = SerpCache(os.path.join(args.cache_dir or os.path.join(args.outdir, ".cache"), "serp.sqlite"), max_age=args.cache_hours * 3600,
+                          archive_dir=os.path.join(args.outdir, ".store") if args.archive_raw else None)
+    print(f"[INFO] キーワード: {len(keywords)}件 / 対象サイト: {', '.join(f'{s.name}({s.domain})' for s in sites)}")
+    if args.dry_run:
+        probe = RankTracker("", location=args.location, num=args.num)
+        cached = {keyword for keyword, _ in keywords if cache is not None and cache.get(probe.params(keyword)) is not None}
+        needed = [(keyword, group) for keyword, group in keywords if keyword not in cached]
+        print(f"[INFO] 必要クレジット: {len(needed)}（キャッシュ済み {len(cached)}件、予算 {args.budget}）")
+        for keyword, group in needed[:max(0, args.budget)]:
+            print(f"  - [{group}] {keyword}")
+        if len(needed) > args.budget:
+            print(f"[WARN] 予算超過のため {len(needed) - args.budget}件は問い合わせません")
+        return 0
+
+    project_date = args.date or datetime.now().strftime("%Y%m%d")
+    project_dir = args.project_dir or os.path.join(args.outdir, project_date)
+    if not os.path.isfile(os.path.join(project_dir, PROJECT_SUMMARY_NAME)):
+        print(f"[ERROR] {project_dir} に {PROJECT_SUMMARY_NAME} がありません（先に setup-project.py --date {project_date} を実行してください）")
+        return 1
+
+    api_key = _load_api_key(args.api_key)
+    if not api_key:
+        print("[ERROR] SerpAPI の APIキーがありません（--api-key または環境変数 SERPAPI_KEY）")
+        return 1
+
+    from rate_limiter import configure as configure_rate_limiter
+
+    configure_rate_limiter(config_loader.get_fetch_config())
+    tracker = RankTracker(api_key, endpoint=args.endpoint, location=args.location, num=args.num,
+                          timeout=args.timeout, budget=args.budget, workers=args.workers, cache=cache)
+    started = time.perf_counter()
+    rows = tracker.track(keywords, sites)
+    elapsed = time.perf_counter() - started
+    for row in rows:
+        if row.status != "OK":
+            print(f"[WARN] {row.keyword}: {row.status}")
+
+    executed_at = datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")
+    from output_writer import OutputWriter
+
+    with OutputWriter(project_dir) as output:
+        output.write_text(OUTPUT_MARKDOWN, build_report(rows, sites, tracker, executed_at))
+        output.write_text(OUTPUT_JSON, build_json(rows, sites, tracker, executed_at))
+        output.commit()
+    if not args.no_history:
+        client = next((site for site in sites if site.is_client), sites[0])
+        history = RankHistory(args.history_dir or os.path.join(args.outdir, ".history", "ranks"), client.domain)
+        # 同じ日の再実行（キャッシュ・再取得とも）では記録済みのキーワード・ドメインを追記しない
+        recorded = history.append(project_date, history_rows(rows, sites), skip_recorded=True)
+        if recorded:
+            print(f"[INFO] 順位の履歴に記録: {history.path}（{recorded}行、{project_date}）")
+    print()
+    print(format_rank_table(rows, sites, tracker.num))
+    print()
+    fetched = sum(1 for row in rows if row.fetched)
+    if cache is not None:
+        print(cache.summary())
+        cache.close()
+    print(f"[OK] 順位表を保存: {os.path.join(project_dir, OUTPUT_MARKDOWN)}（取得 {fetched}/{len(rows)}件、{elapsed:.1f}秒、使用クレジット {tracker.budget.spent}）")
+    return 0 if fetched == sum(1 for row in rows if not row.status.startswith("未取得")) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ホスト単位のレート制限（トークンバケット）と取得順のスケジューラ
+
+- 共有 HTTP Session の全リクエスト（ページ・robots.txt・サイトマップ・SerpAPI）に
+  ホストごとのトークンバケットを適用し、同一ホストへの間隔を空ける
+- robots.txt の Crawl-delay が読み込み済みなら、その間隔より速くは送らない
+- urllib3 のリトライによる再送（429/5xx 等）も、再送前にこの制限で待つ（http_client.RateLimitedRetry）
+- PolitenessScheduler は「今すぐ送れるホスト」のジョブから順に渡し、
+  待ちが必要なホストでワーカーを塞がずに全体の処理量を保つ
+
+設定は project-config.yaml の fetch セクション:
+    fetch:
+      rate_per_host: 2.0        # 同一ホストへの毎秒リクエスト数
+      burst: 2                  # 連続して送れる最大数（バケット容量）
+      respect_crawl_delay: true # robots.txt の Crawl-delay を守る
+      hosts:                    # ホスト別の上書き
+        serpapi.com: {rate_per_host: 1.0, burst: 1}
+
+使い方:
+    from rate_limiter import configure, get_rate_limiter
+    configure(config_loader.get_fetch_config())
+    get_rate_limiter().wait(url)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_RATE_PER_HOST = 2.0
+DEFAULT_BURST = 2
+
+
+def host_key(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+class TokenBucket:
+    """rate 個/秒で補充され、最大 burst 個まで貯まるバケット（予約方式でスレッドセーフ）"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = max(rate, 1e-6)
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def limit_to(self, rate: float, burst: float) -> None:
+        """より厳しい制限に変更する（緩める変更は無視）"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.rate, max(rate, 1e-6))
+            self.burst = min(self.burst, max(burst, 1.0))
+            self.tokens = min(self.tokens, self.burst)
+
+    def time_until_ready(self) -> float:
+        """トークンを消費せずに、次の1件を送れるまでの秒数を返す"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (1.0 - self.tokens) / self.rate)
+
+    def reserve(self) -> float:
+        """1件分を予約し、送信前に待つべき秒数を返す"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1.0
+            return max(0.0, -self.tokens / self.rate)
+
+
+class HostRateLimiter:
+    def __init__(self, rate_per_host: float = DEFAULT_RATE_PER_HOST, burst: float = DEFAULT_BURST,
+                 hosts: Optional[Dict[str, Dict]] = None, crawl_delay: Optional[Callable[[str], Optional[float]]] = None):
+        """
+        Args:
+            rate_per_host: 同一ホストへの毎秒リクエスト数（0 以下で無制限）
+            burst: バケット容量
+            hosts: ホスト別の上書き（{"serpapi.com": {"rate_per_host": 1.0, "burst": 1}}）
+            crawl_delay: URL → Crawl-delay 秒（未取得・指定なしは None）
+        """
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.hosts = {k.lower(): v or {} for k, v in (hosts or {}).items()}
+        self.crawl_delay = crawl_delay
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._delays: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "waits": 0, "waited": 0.0}
+
+    def _bucket(self, url: str) -> Optional[TokenBucket]:
+        host = host_key(url)
+        with self._lock:
+            if host not in self._buckets:
+                override = self.hosts.get(host) or self.hosts.get(urlsplit(url).hostname or "") or {}
+                rate = _number(override.get("rate_per_host"), self.rate_per_host)
+                burst = _number(override.get("burst"), self.burst)
+                self._buckets[host] = TokenBucket(rate, burst) if rate > 0 else None
+            if self.crawl_delay is None or host in self._delays:
+                return self._buckets[host]
+
+        # Crawl-delay は robots.txt の読み込み後に判明するため、都度反映する（取得はロックの外で行う）
+        delay = self.crawl_delay(url)
+        with self._lock:
+            bucket = self._buckets[host]
+            if delay and host not in self._delays:
+                self._delays[host] = delay
+                if bucket is None:
+                    bucket = self._buckets[host] = TokenBucket(1.0 / delay, 1)
+                else:
+                    bucket.limit_to(1.0 / delay, 1)
+            return bucket
+
+    def time_until_ready(self, url: str) -> float:
+        """消費せずに、url のホストへ次に送れるまでの秒数"""
+        bucket = self._bucket(url)
+        return bucket.time_until_ready() if bucket is not None else 0.0
+
+    def reserve(self, url: str) -> float:
+        """1件分を予約して待つべき秒数を返す（asyncio 側では asyncio.sleep で待つ）"""
+        bucket = self._bucket(url)
+        wait = bucket.reserve() if bucket is not None else 0.0
+        with self._lock:
+            self.stats["requests"] += 1
+            if wait > 0:
+                self.stats["waits"] += 1
+                self.stats["waited"] += wait
+        return wait
+
+    def record_wait(self, seconds: float) -> None:
+        """スケジューラ側で待った時間を集計に加える"""
+        with self._lock:
+            self.stats["waited"] += seconds
+
+    def wait(self, url: str) -> None:
+        """url のホストの制限内に収まるまで待つ"""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def summary(self) -> str:
+        return f"レート制限: 延べ待機 {self.stats['waited']:.1f}秒 / 送信直前の待機 {self.stats['waits']}回（{len(self._buckets)}ホスト）"
+
+
+class PolitenessScheduler:
+    """ホストごとのキューから、すぐ送れるホストのジョブを優先して渡すスケジューラ
+
+    同一ホストのジョブは投入順・同時1件。どのホストも待ちが必要な場合は、
+    最も早く送れるホストの待ち時間だけ眠ってから渡す。
+    """
+
+    def __init__(self, jobs, host_of: Callable[[dict], str], limiter: Optional[HostRateLimiter] = None):
+        self._queues: Dict[str, deque] = {}
+        for job in jobs:
+            self._queues.setdefault(host_of(job), deque()).append(job)
+        self._host_of = host_of
+        self._limiter = limiter
+        self._busy = set()
+        self._cond = threading.Condition()
+
+    def _ready_in(self, host: str) -> float:
+        if self._limiter is None:
+            return 0.0
+        return self._limiter.time_until_ready(self._queues[host][0]["url"])
+
+    def next_job(self) -> Optional[dict]:
+        """次のジョブ（全ジョブを渡し終えたら None）"""
+        with self._cond:
+            while True:
+                idle = [host for host, queue in self._queues.items() if queue and host not in self._busy]
+                if not idle:
+                    if not any(self._queues.values()):
+                        return None
+                    # 残りは処理中のホストのみ。完了を待つ
+                    self._cond.wait()
+                    continue
+                # 登録順（入力順）で最初に送れるホストを選ぶ
+                waits = [(self._ready_in(host), index, host) for index, host in enumerate(idle)]
+                wait, _, host = min(waits)
+                if wait > 0:
+                    started = time.monotonic()
+                    self._cond.wait(timeout=wait)
+                    if self._limiter is not None:
+                        self._limiter.record_wait(time.monotonic() - started)
+                    continue
+                self._busy.add(host)
+                return self._queues[host].popleft()
+
+    def done(self, job: dict) -> None:
+        with self._cond:
+            self._busy.discard(self._host_of(job))
+            self._cond.notify_all()
+
+
+_rate_limiter: Optional[HostRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def _robots_crawl_delay(url: str) -> Optional[float]:
+    # 循環 import を避けるため遅延 import（robots_cache は http_client に依存する）
+    from robots_cache import get_robots_cache
+
+    return get_robots_cache().cached_crawl_delay(url)
+
+
+def _number(value, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def configure(fetch_config: Optional[Dict] = None) -> HostRateLimiter:
+    """project-config.yaml の fetch セクションから共有リミッターを作り直す"""
+    global _rate_limiter
+    fetch_config = fetch_config or {}
+    limiter = HostRateLimiter(
+        rate_per_host=_number(fetch_config.get("rate_per_host"), DEFAULT_RATE_PER_HOST),
+        burst=_number(fetch_config.get("burst"), DEFAULT_BURST),
+        hosts=fetch_config.get("hosts") or {},
+        crawl_delay=_robots_crawl_delay if fetch_config.get("respect_crawl_delay", True) else None,
+    )
+    with _rate_limiter_lock:
+        _rate_limiter = limiter
+    return limiter
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """プロセス内で共有するリミッター（未設定なら既定値で作成）"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = HostRateLimiter(crawl_delay=_robots_crawl_delay)
+    return _rate_limiter
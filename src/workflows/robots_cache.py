@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+robots.txt キャッシュ
+
+scheme+host 単位で robots.txt を保持し、同一ホストの競合URLや
+日次の再実行で robots.txt を取り直さないようにする。
+
+- プロセス内: 解析済み RobotFileParser をメモリに保持
+- ディスク: 本文と有効期限を JSON で保存（TTL と Cache-Control/Expires を反映）
+
+使い方:
+    from robots_cache import configure, get_robots_cache
+    configure(cache_dir="output/.cache/robots", ttl=86400)
+    allowed = get_robots_cache().can_fetch(url, user_agent, timeout=20)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+from urllib import robotparser
+from urllib.parse import urlparse
+
+from http_client import cache_lifetime, get_session
+
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+
+def _cache_filename(origin: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9._-]", "_", origin.replace("://", "_")) + ".json"
+
+
+class RobotsCache:
+    def __init__(self, cache_dir: Optional[str] = None, ttl: float = DEFAULT_TTL):
+        """
+        Args:
+            cache_dir: ディスクキャッシュの保存先（None ならメモリのみ）
+            ttl: キャッシュヘッダが無い場合の有効秒数
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._parsers: Dict[str, Optional[robotparser.RobotFileParser]] = {}
+        self._host_locks: Dict[str, threading.Lock] = {}
+        # can_fetch 時に判明した送信間隔（Crawl-delay / Request-rate、秒）
+        self._crawl_delays: Dict[str, Optional[float]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"memory": 0, "disk": 0, "fetched": 0}
+
+    def _host_lock(self, origin: str) -> threading.Lock:
+        with self._lock:
+            return self._host_locks.setdefault(origin, threading.Lock())
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    @staticmethod
+    def _build_parser(status: int, body: str) -> Optional[robotparser.RobotFileParser]:
+        # robots.txt が無い/エラーの場合は許可とみなす（None = 全許可）
+        if status >= 400:
+            return None
+        rp = robotparser.RobotFileParser()
+        rp.parse(body.splitlines())
+        return rp
+
+    def _load_from_disk(self, origin: str):
+        if not self.cache_dir:
+            return None
+        path = os.path.join(self.cache_dir, _cache_filename(origin))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) <= time.time():
+            return None
+        return entry
+
+    def _save_to_disk(self, origin: str, entry: dict) -> None:
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = os.path.join(self.cache_dir, _cache_filename(origin))
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARN] robots.txt キャッシュ保存失敗: {origin} - {e}")
+
+    def get_parser(self, url: str, timeout: int) -> Optional[robotparser.RobotFileParser]:
+        """URL のホストに対応する RobotFileParser を返す（None は全許可）"""
+        origin = _origin(url)
+        if origin in self._parsers:
+            self._count("memory")
+            return self._parsers[origin]
+
+        # 同一ホストへの同時取得を1回にまとめる
+        with self._host_lock(origin):
+            if origin in self._parsers:
+                self._count("memory")
+                return self._parsers[origin]
+
+            entry = self._load_from_disk(origin)
+            if entry is not None:
+                self._count("disk")
+            else:
+                # 取得失敗時の例外は呼び出し側に任せる（キャッシュしない）
+                resp = get_session().get(f"{origin}/robots.txt", timeout=timeout)
+                self._count("fetched")
+                lifetime = cache_lifetime(resp.headers)
+                entry = {
+                    "url": f"{origin}/robots.txt",
+                    "status": resp.status_code,
+                    "body": resp.text if resp.status_code < 400 else "",
+                    "fetched_at": time.time(),
+                    "expires_at": time.time() + (self.ttl if lifetime is None else lifetime),
+                }
+                if lifetime != 0:
+                    self._save_to_disk(origin, entry)
+
+            parser = self._build_parser(entry["status"], entry["body"])
+            self._parsers[origin] = parser
+            return parser
+
+    def can_fetch(self, url: str, user_agent: str, timeout: int) -> bool:
+        parser = self.get_parser(url, timeout)
+        origin = _origin(url)
+        if origin not in self._crawl_delays:
+            self._crawl_delays[origin] = self._min_interval(parser, user_agent)
+        return True if parser is None else parser.can_fetch(user_agent, url)
+
+    @staticmethod
+    def _min_interval(parser: Optional[robotparser.RobotFileParser], user_agent: str) -> Optional[float]:
+        """Crawl-delay と Request-rate から同一ホストへの最小送信間隔（秒）を求める"""
+        if parser is None:
+            return None
+        intervals = []
+        delay = parser.crawl_delay(user_agent)
+        if delay:
+            intervals.append(float(delay))
+        rate = parser.request_rate(user_agent)
+        if rate and rate.requests:
+            intervals.append(rate.seconds / rate.requests)
+        return max(intervals) if intervals else None
+
+    def cached_crawl_delay(self, url: str) -> Optional[float]:
+        """can_fetch で読み込み済みのホストの最小送信間隔（未読み込み・指定なしは None、取得はしない）"""
+        return self._crawl_delays.get(_origin(url))
+
+    def summary(self) -> str:
+        return f"robots.txt: 取得 {self.stats['fetched']}件 / ディスクキャッシュ {self.stats['disk']}件 / メモリキャッシュ {self.stats['memory']}件"
+
+
+_robots_cache: Optional[RobotsCache] = None
+
+
+def configure(cache_dir: Optional[str] = None, ttl: float = DEFAULT_TTL) -> RobotsCache:
+    """共有キャッシュを作り直す（CLI 引数の反映用）"""
+    global _robots_cache
+    _robots_cache = RobotsCache(cache_dir=cache_dir, ttl=ttl)
+    return _robots_cache
+
+
+def get_robots_cache() -> RobotsCache:
+    """プロセス内で共有する robots.txt キャッシュを返す"""
+    global _robots_cache
+    if _robots_cache is None:
+        _robots_cache = RobotsCache()
+    return _robots_cache
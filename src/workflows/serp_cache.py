@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SerpAPI 検索結果の永続キャッシュ（SQLite）
+
+(engine, q, location, hl, gl, num, 日付) をキーに SerpAPI の応答を保存し、
+同じ日のうちに鮮度（max_age）内で同じ条件を問い合わせた場合はクレジットも待ち時間も使わずに返す。
+日付が変われば必ず取得し直す（順位は日ごとに記録するため）。
+
+応答は全文ではなく serp_record.SerpRecord（順位・リンク・タイトル、広告数、関連キーワード、残りクレジット）に
+射影して1行で保存する。archive_dir を指定すると元の応答を圧縮して blob_store に保存し、レコードから参照する（監査用）。
+
+保存先は <outdir>/.cache/serp.sqlite（WAL モード。バッチ・常駐実行の複数プロセスから共有できる）。
+ヒット数・ミス数と、ヒットで節約したクレジット・待ち時間（保存時の応答時間の合計）を集計する。
+
+使い方:
+    from serp_cache import SerpCache
+    cache = SerpCache("output/.cache/serp.sqlite", max_age=6 * 3600)
+    record = cache.get(params)              # params は api_key を除く SerpAPI のクエリ
+    if record is None:
+        data = ...; record = cache.put(params, data, seconds=1.2)
+    print(cache.summary())
+    records = cache.records("20250701", "20250731")   # 1か月分の分析用
+
+    python src/workflows/serp_cache.py --stats                 # 日付ごとの件数
+    python src/workflows/serp_cache.py --show "葬儀 横浜" --raw  # 今日のレコード（と保存した元の応答）
+    python src/workflows/serp_cache.py --purge-days 30         # 30日より前の結果を削除
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from serp_record import SerpRecord, archive_raw, load_raw, project
+
+DEFAULT_CACHE_PATH = os.path.join("output", ".cache", "serp.sqlite")
+# 既定の鮮度（同じ日のうちは再取得しない）
+DEFAULT_MAX_AGE = 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS serp_results (
+    engine TEXT NOT NULL,
+    q TEXT NOT NULL,
+    location TEXT NOT NULL,
+    hl TEXT NOT NULL,
+    gl TEXT NOT NULL,
+    num TEXT NOT NULL,
+    day TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    seconds REAL NOT NULL,
+    -- SerpRecord.to_row()（旧版の全文 JSON も読める）
+    payload TEXT NOT NULL,
+    PRIMARY KEY (engine, q, location, hl, gl, num, day)
+)
+"""
+
+
+def cache_key(params: Dict[str, str], day: Optional[str] = None) -> Tuple[str, ...]:
+    """SerpAPI のクエリからキャッシュのキーを作る（day 省略時は今日）"""
+    return (
+        str(params.get("engine") or "google"),
+        str(params.get("q") or ""),
+        str(params.get("location") or ""),
+        str(params.get("hl") or ""),
+        str(params.get("gl") or ""),
+        str(params.get("num") or ""),
+        day or datetime.now().strftime("%Y%m%d"),
+    )
+
+
+class SerpCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_age: float = DEFAULT_MAX_AGE,
+                 archive_dir: Optional[str] = None):
+        """
+        Args:
+            path: SQLite ファイルのパス
+            max_age: 鮮度（秒）。同じ日の結果でもこれより古ければ取得し直す
+            archive_dir: 元の応答を圧縮保存する blob_store のルート（通常は <outdir>/.store。None なら保存しない）
+        """
+        self.path = path
+        self.max_age = max_age
+        self.archive_dir = archive_dir
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.stats = {"hit": 0, "stale": 0, "miss": 0, "saved_seconds": 0.0}
+
+    def _connection(self) -> sqlite3.Connection:
+        # 呼び出し側は self._lock を保持していること
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, params: Dict[str, str]) -> Optional[SerpRecord]:
+        """鮮度内の保存済みレコードを返す（無ければ None）"""
+        key = cache_key(params)
+        with self._lock:
+            try:
+                row = self._connection().execute(
+                    "SELECT fetched_at, seconds, payload FROM serp_results"
+                    " WHERE engine=? AND q=? AND location=? AND hl=? AND gl=? AND num=? AND day=?", key,
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"[WARN] SERPキャッシュ読み込み失敗: {e}")
+                row = None
+            if row is None:
+                self.stats["miss"] += 1
+                return None
+            fetched_at, seconds, payload = row
+            if time.time() - fetched_at > self.max_age:
+                self.stats["stale"] += 1
+                return None
+            self.stats["hit"] += 1
+            self.stats["saved_seconds"] += seconds
+        return _decode(payload)
+
+    def put(self, params: Dict[str, str], data: Dict, seconds: float = 0.0) -> SerpRecord:
+        """応答をレコードに射影して保存し（同じキーは上書き）、レコードを返す"""
+        key = cache_key(params)
+        raw_ref = None
+        if self.archive_dir:
+            try:
+                raw_ref = archive_raw(data, self.archive_dir)
+            except OSError as e:
+                print(f"[WARN] SerpAPI 応答の保存失敗: {params.get('q')} - {e}")
+        record = project(data, raw_ref=raw_ref)
+        if not record.query:
+            record.query = str(params.get("q") or "")
+        payload = record.to_row()
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO serp_results (engine, q, location, hl, gl, num, day, fetched_at, seconds, payload)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", key + (time.time(), seconds, payload),
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"[WARN] SERPキャッシュ保存失敗: {params.get('q')} - {e}")
+        return record
+
+    def records(self, start_day: str, end_day: str) -> List[Tuple[str, SerpRecord]]:
+        """start_day〜end_day（YYYYMMDD）の (日付, レコード) を日付順に返す（鮮度は問わない）"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT day, payload FROM serp_results WHERE day BETWEEN ? AND ? ORDER BY day, q", (start_day, end_day),
+            ).fetchall()
+        return [(day, _decode(payload)) for day, payload in rows]
+
+    def purge(self, keep_days: int) -> int:
+        """keep_days 日より前の結果を削除し、削除件数を返す"""
+        cutoff = (datetime.now() - timedelta(days=keep_days)).strftime("%Y%m%d")
+        with self._lock:
+            conn = self._connection()
+            deleted = conn.execute("DELETE FROM serp_results WHERE day < ?", (cutoff,)).rowcount
+            conn.commit()
+        return deleted
+
+    def day_counts(self):
+        with self._lock:
+            return self._connection().execute(
+                "SELECT day, COUNT(*), SUM(LENGTH(payload)) FROM serp_results GROUP BY day ORDER BY day"
+            ).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def summary(self) -> str:
+        lookups = self.stats["hit"] + self.stats["stale"] + self.stats["miss"]
+        rate = self.stats["hit"] / lookups * 100 if lookups else 0.0
+        return (
+            f"SERPキャッシュ: ヒット {self.stats['hit']}件 / 期限切れ {self.stats['stale']}件 / ミス {self.stats['miss']}件"
+            f"（ヒット率 {rate:.0f}%、節約 {self.stats['hit']}クレジット・約{self.stats['saved_seconds']:.1f}秒）"
+        )
+
+
+def _decode(payload: str) -> SerpRecord:
+    # 旧版（射影前）は応答の全文 JSON を保存していた
+    if payload.startswith("{"):
+        return project(json.loads(payload))
+    return SerpRecord.from_row(payload)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SerpAPI 検索結果キャッシュの確認・整理")
+    parser.add_argument("--path", default=DEFAULT_CACHE_PATH, help=f"キャッシュのパス（既定: {DEFAULT_CACHE_PATH}）")
+    parser.add_argument("--stats", action="store_true", help="日付ごとの件数とサイズを表示")
+    parser.add_argument("--purge-days", type=int, help="この日数より前の結果を削除")
+    parser.add_argument("--show", metavar="KEYWORD", help="このキーワードの今日のレコードを表示")
+    parser.add_argument("--raw", action="store_true", help="--show で保存した元の応答（JSON）も表示")
+    parser.add_argument("--store-dir", help="元の応答の保存先（既定: キャッシュと同じ基底ディレクトリの .store）")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"[INFO] キャッシュがありません: {args.path}")
+        return 0
+    cache = SerpCache(args.path)
+    if args.show:
+        today = datetime.now().strftime("%Y%m%d")
+        found = [record for _, record in cache.records(today, today) if record.query == args.show]
+        if not found:
+            print(f"[INFO] 今日のレコードがありません: {args.show}")
+        for record in found:
+            print(f"[INFO] {record.query}: オーガニック {len(record.organic)}件 / 広告 {record.ads}件 / 残りクレジット {record.credits_left}")
+            for result in record.organic[:10]:
+                print(f"  {result.position:>3}. {result.title} - {result.link}")
+            if record.related:
+                print(f"  関連: {', '.join(record.related)}")
+            if args.raw:
+                if record.raw_ref is None:
+                    print("[INFO] 元の応答は保存されていません（--archive-raw で保存）")
+                else:
+                    store_dir = args.store_dir or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(args.path))), ".store")
+                    print(json.dumps(load_raw(record.raw_ref, store_dir), ensure_ascii=False, indent=2))
+        cache.close()
+        return 0
+    if args.purge_days is not None:
+        print(f"[OK] {cache.purge(args.purge_days)}件を削除しました")
+    if args.stats or args.purge_days is None:
+        rows = cache.day_counts()
+        print(f"{'日付':<10}{'件数':>8}{'サイズ(KB)':>12}")
+        for day, count, size in rows:
+            print(f"{day:<10}{count:>8}{(size or 0) / 1024:>12.1f}")
+        print(f"[INFO] 合計 {sum(row[1] for row in rows)}件")
+    cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
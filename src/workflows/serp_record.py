@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SerpAPI 応答の射影（使う項目だけのコンパクトなレコード）
+
+SerpAPI の応答 JSON は1件で数十〜数百KB あるが、順位トラッキング・分析で使うのは
+オーガニック結果の順位・リンク・タイトル、広告数、関連キーワード、残りクレジットだけである。
+応答を SerpRecord（__slots__ のクラス）に射影し、キー名を持たない JSON 配列の1行として保存・読み込みする。
+
+監査用に元の応答が必要な場合は、圧縮してコンテンツアドレス型ストア（blob_store、<outdir>/.store）に保存し、
+レコードには SHA-256 の参照（raw_ref）だけを持たせる。
+
+使い方:
+    from serp_record import project, SerpRecord
+    record = project(data)                   # SerpAPI の応答 JSON（dict）から
+    row = record.to_row()                    # 保存用の文字列
+    record = SerpRecord.from_row(row)
+
+    python src/workflows/serp_record.py --bench --days 30 --keywords 30   # 全文 JSON との保存・読み込み比較
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+# 保存形式の版（to_row の先頭要素）。項目を増やしたら上げる
+RECORD_VERSION = 1
+
+
+class OrganicResult(NamedTuple):
+    position: int
+    link: str
+    title: str
+
+
+class SerpRecord:
+    """順位トラッキング・分析に使う項目だけの SerpAPI 応答"""
+
+    __slots__ = ("query", "organic", "ads", "related", "credits_left", "raw_ref")
+
+    def __init__(self, query: str, organic: Sequence[OrganicResult], ads: int = 0, related: Sequence[str] = (),
+                 credits_left: Optional[int] = None, raw_ref: Optional[str] = None):
+        self.query = query
+        self.organic = tuple(organic)
+        self.ads = ads
+        self.related = tuple(related)
+        self.credits_left = credits_left
+        # 元の応答を blob_store に保存した場合の SHA-256
+        self.raw_ref = raw_ref
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SerpRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"SerpRecord(query={self.query!r}, organic={len(self.organic)}件, ads={self.ads}, credits_left={self.credits_left})"
+
+    def to_row(self) -> str:
+        """キー名を持たない JSON 配列の1行にする"""
+        return json.dumps(
+            [RECORD_VERSION, self.query, [list(result) for result in self.organic], self.ads,
+             list(self.related), self.credits_left, self.raw_ref],
+            ensure_ascii=False, separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_row(cls, row: str) -> "SerpRecord":
+        version, query, organic, ads, related, credits_left, raw_ref = json.loads(row)[:7]
+        if version != RECORD_VERSION:
+            raise ValueError(f"未対応のレコード形式です: v{version}")
+        return cls(query, map(OrganicResult._make, organic), ads, related, credits_left, raw_ref)
+
+
+def project(data: Dict, raw_ref: Optional[str] = None) -> SerpRecord:
+    """SerpAPI の応答 JSON を SerpRecord に射影する（position が無い結果は並び順）"""
+    organic: List[OrganicResult] = []
+    for index, result in enumerate(data.get("organic_results") or [], start=1):
+        organic.append(OrganicResult(result.get("position") or index, result.get("link") or "", result.get("title") or ""))
+    related = [item.get("query") or "" for item in data.get("related_searches") or [] if item.get("query")]
+    credits_left = (data.get("search_metadata") or {}).get("credits_left")
+    query = (data.get("search_parameters") or {}).get("q") or ""
+    return SerpRecord(
+        query=query,
+        organic=organic,
+        ads=len(data.get("ads") or []),
+        related=related,
+        credits_left=credits_left if isinstance(credits_left, int) else None,
+        raw_ref=raw_ref,
+    )
+
+
+def archive_raw(data: Dict, store_dir: str) -> str:
+    """元の応答を圧縮して blob_store に保存し、SHA-256 を返す（同じ内容は1度だけ保存）"""
+    from blob_store import BlobStore
+
+    return BlobStore(store_dir).put(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def load_raw(raw_ref: str, store_dir: str) -> Dict:
+    """archive_raw で保存した元の応答を返す"""
+    from blob_store import BlobStore
+
+    return json.loads(BlobStore(store_dir).get(raw_ref).decode("utf-8"))
+
+
+def _sample_response(keyword: str, num: int) -> Dict:
+    """ベンチマーク用の SerpAPI 形式の応答（スニペット・リッチ結果を含む実際に近い大きさ）"""
+    organic = [
+        {
+            "position": position,
+            "title": f"{keyword} - サンプル{position}",
+            "link": f"https://www.site{position}.example.jp/{keyword}/page",
+            "redirect_link": f"https://www.google.com/url?q=https://www.site{position}.example.jp/&sa=U",
+            "displayed_link": f"https://www.site{position}.example.jp › {keyword}",
+            "snippet": f"{keyword} に関するサンプル{position}のページです。" * 4,
+            "snippet_highlighted_words": [keyword],
+            "sitelinks": {"inline": [{"title": f"リンク{index}", "link": f"https://www.site{position}.example.jp/{index}"} for index in range(4)]},
+            "source": f"site{position}.example.jp",
+        }
+        for position in range(1, num + 1)
+    ]
+    return {
+        "search_metadata": {"id": "0" * 24, "status": "Success", "credits_left": 100, "total_time_taken": 1.2},
+        "search_parameters": {"engine": "google", "q": keyword, "hl": "ja", "gl": "jp", "num": str(num)},
+        "search_information": {"total_results": 1230000, "time_taken_displayed": 0.41},
+        "ads": [{"position": index, "title": f"{keyword} 広告{index}", "link": f"https://ads.example.com/{index}"} for index in range(3)],
+        "organic_results": organic,
+        "related_searches": [{"query": f"{keyword} {suffix}", "link": "https://www.google.com/search?q=x"} for suffix in ("料金", "口コミ", "比較")],
+        "pagination": {"current": 1, "next": "https://www.google.com/search?start=10"},
+    }
+
+
+def run_bench(days: int, keywords: int, num: int) -> int:
+    """days × keywords 件の応答を、全文 JSON（indent=2 のファイル）とレコード行で保存・読み込みして比較する"""
+    responses = [_sample_response(f"キーワード{index}", num) for index in range(keywords)]
+    workdir = tempfile.mkdtemp(prefix="serp-record-bench-")
+    try:
+        started = time.perf_counter()
+        for day in range(days):
+            for index, data in enumerate(responses):
+                with open(os.path.join(workdir, f"{day}-{index}.json"), "w", encoding="utf-8") as f:
+                    json.dump({"詳細データ": data}, f, ensure_ascii=False, indent=2)
+        full_write = time.perf_counter() - started
+        full_size = sum(os.path.getsize(os.path.join(workdir, name)) for name in os.listdir(workdir))
+        started = time.perf_counter()
+        loaded = []
+        for name in os.listdir(workdir):
+            with open(os.path.join(workdir, name), "r", encoding="utf-8") as f:
+                loaded.append(project(json.load(f)["詳細データ"]))
+        full_read = time.perf_counter() - started
+
+        rows_path = os.path.join(workdir, "records.jsonl")
+        started = time.perf_counter()
+        with open(rows_path, "w", encoding="utf-8") as f:
+            for day in range(days):
+                for data in responses:
+                    f.write(project(data).to_row())
+                    f.write("\n")
+        compact_write = time.perf_counter() - started
+        started = time.perf_counter()
+        with open(rows_path, "r", encoding="utf-8") as f:
+            records = [SerpRecord.from_row(line) for line in f]
+        compact_read = time.perf_counter() - started
+        compact_size = os.path.getsize(rows_path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    total = days * keywords
+    print(f"[INFO] {days}日 × {keywords}キーワード = {total}件（オーガニック {num}件/応答）")
+    print(f"{'形式':<12}{'保存(ms)':>10}{'読込(ms)':>10}{'サイズ(KB)':>12}")
+    print(f"{'全文JSON':<12}{full_write * 1000:>10.1f}{full_read * 1000:>10.1f}{full_size / 1024:>12.1f}")
+    print(f"{'レコード':<12}{compact_write * 1000:>10.1f}{compact_read * 1000:>10.1f}{compact_size / 1024:>12.1f}")
+    if len(records) != total or len(loaded) != total or records[0] != project(responses[0]):
+        print("[ERROR] 読み込んだレコードが一致しません")
+        return 1
+    print(f"[OK] 読み込み {full_read / compact_read:.1f}倍 / サイズ {full_size / compact_size:.1f}分の1")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SerpAPI 応答の射影（保存形式のベンチマーク）")
+    parser.add_argument("--bench", action="store_true", help="全文 JSON とレコード行の保存・読み込みを比較")
+    parser.add_argument("--days", type=int, default=30, help="--bench の日数（既定: 30）")
+    parser.add_argument("--keywords", type=int, default=30, help="--bench のキーワード数（既定: 30）")
+    parser.add_argument("--num", type=int, default=100, help="--bench のオーガニック結果数（既定: 100）")
+    args = parser.parse_args()
+    if not args.bench:
+        parser.print_help()
+        return 0
+    return run_bench(args.days, args.keywords, args.num)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
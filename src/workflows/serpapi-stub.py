@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SerpAPI のローカル代替サーバー（クレジットを使わずに順位トラッキングを確認する用）
+
+GET /search に SerpAPI と同じ形の JSON（organic_results / ads / related_searches / search_metadata）を返す。
+結果はクエリ文字列から決まる（同じ q なら毎回同じ順位）。ドメインは組み込みの一覧に
+--domains と --config（自社・競合の website）を加えたものから選ぶため、設定のサイトが
+キーワードによって上位・下位・圏外に現れる。api_key が無い場合は SerpAPI と同じく 401 を返す。
+
+使い方:
+    python src/workflows/serpapi-stub.py --port 8766 --config input/project-config.yaml --latency 0.5
+    python src/workflows/rank_tracker.py --endpoint http://127.0.0.1:8766/search --api-key dummy --date 20250808
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SAMPLE_DOMAINS = [
+    "example.com", "example.net", "example.org", "wikipedia.org", "yahoo.co.jp", "note.com",
+    "hotpepper.jp", "itp.ne.jp", "ekiten.jp", "minkou.jp", "kakaku.com", "prtimes.jp",
+]
+
+
+class StubState:
+    def __init__(self, domains, latency: float, credits: int):
+        self.domains = domains
+        self.latency = latency
+        self.credits_left = credits
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def take_credit(self) -> int:
+        with self._lock:
+            self.requests += 1
+            self.credits_left = max(0, self.credits_left - 1)
+            return self.credits_left
+
+
+def build_results(query: str, domains, num: int):
+    """クエリから決まる検索結果（1ドメインにつき1件、num 件まで）"""
+    rng = random.Random(hashlib.sha256(query.encode("utf-8")).digest())
+    # 設定のサイトが必ず上位に来ないよう、順位を付ける母数を num より多くしておく
+    pool = list(domains) + [f"site{index}.example.jp" for index in range(max(num, len(domains)) * 2)]
+    rng.shuffle(pool)
+    organic = [
+        {
+            "position": position,
+            "title": f"{query} - {domain}",
+            "link": f"https://www.{domain}/{hashlib.sha1((query + domain).encode('utf-8')).hexdigest()[:8]}",
+            "snippet": f"{query} に関する {domain} のページ",
+        }
+        for position, domain in enumerate(pool[:num], start=1)
+    ]
+    ads = [{"position": index, "title": f"{query} 広告{index}", "link": f"https://ads.example.com/{index}"} for index in range(1, rng.randint(0, 3) + 1)]
+    related = [{"query": f"{query} {suffix}"} for suffix in ("料金", "口コミ", "比較")]
+    return organic, ads, related
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "serpapi-stub/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        state: StubState = self.server.state  # type: ignore[attr-defined]
+        parts = urlsplit(self.path)
+        if parts.path not in ("/search", "/search.json"):
+            self._send_json(404, {"error": "not found"})
+            return
+        params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        if not params.get("api_key"):
+            self._send_json(401, {"error": "Invalid API key. Your API key should be here: https://serpapi.com/manage-api-key"})
+            return
+        query = params.get("q", "")
+        if not query:
+            self._send_json(400, {"error": "Missing query `q` parameter."})
+            return
+        started = time.perf_counter()
+        if state.latency > 0:
+            time.sleep(state.latency)
+        try:
+            num = max(1, min(100, int(params.get("num", "10"))))
+        except ValueError:
+            num = 10
+        organic, ads, related = build_results(query, state.domains, num)
+        self._send_json(200, {
+            "search_metadata": {
+                "id": hashlib.sha1(self.path.encode("utf-8")).hexdigest()[:24],
+                "status": "Success",
+                "total_time_taken": round(time.perf_counter() - started, 2),
+                "credits_left": state.take_credit(),
+            },
+            "search_parameters": {key: value for key, value in params.items() if key != "api_key"},
+            "organic_results": organic,
+            "ads": ads,
+            "related_searches": related,
+        })
+
+
+def _config_domains(config_path: str):
+    from config_loader import ConfigLoader
+    from rank_tracker import collect_sites
+
+    return [site.domain for site in collect_sites(ConfigLoader(config_path))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="SerpAPI のローカル代替サーバー")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けるアドレス（既定: 127.0.0.1）")
+    parser.add_argument("--port", type=int, default=8766, help="待ち受けるポート（既定: 8766）")
+    parser.add_argument("--config", help="自社・競合の website を結果に含める設定ファイル")
+    parser.add_argument("--domains", nargs="*", default=[], help="結果に含めるドメインの追加")
+    parser.add_argument("--latency", type=float, default=0.0, help="1回の応答にかける秒数（SerpAPI の応答時間の再現）")
+    parser.add_argument("--credits", type=int, default=100, help="search_metadata.credits_left の初期値（既定: 100）")
+    args = parser.parse_args()
+
+    domains = list(SAMPLE_DOMAINS) + list(args.domains)
+    if args.config:
+        domains += _config_domains(args.config)
+    domains = list(dict.fromkeys(domains))
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.daemon_threads = True
+    server.state = StubState(domains, args.latency, args.credits)  # type: ignore[attr-defined]
+    print(f"[OK] SerpAPI 代替サーバーを起動: http://{args.host}:{server.server_port}/search（ドメイン {len(domains)}件、Ctrl+C で停止）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        server.server_close()
+    print(f"[INFO] 停止しました（応答 {server.state.requests}件）")  # type: ignore[attr-defined]
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
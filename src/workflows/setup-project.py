@@ -14,27 +14,40 @@
 
 import os
 import sys
-import shutil
 import argparse
 from datetime import datetime
 import re
-from urllib.parse import urlparse, urljoin
+import glob
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from urllib.parse import urlparse
 
-import requests
-from bs4 import BeautifulSoup
-from urllib import robotparser
 
 # 設定ローダーをインポート（スクリプト直下をモジュール検索パスに追加）
 try:
     SCRIPT_DIR = os.path.dirname(__file__)
     if SCRIPT_DIR and SCRIPT_DIR not in sys.path:
         sys.path.append(SCRIPT_DIR)
-    from config_loader import ConfigLoader
+    from config_loader import ConfigLoader, load_cached as load_cached_config
     from user_input_parser import apply_user_input_to_config
 except Exception:
     print("❌ config_loader.pyが見つかりません。workflows/config_loader.pyを確認してください。")
     sys.exit(1)
 
+# 同梱のワークフローモジュール（失敗時はそのまま例外を表示する）。
+# requests を使うモジュール（http_client / robots_cache / http_cache / sitemaps）は
+# 競合サイト取得の処理内で import する（--no-competitors や --help では読み込まない）
+from blob_store import BlobStore, RAW_HTML_NAME, RAW_REF_NAME, store_root
+from html_facts import configure as configure_html_parser, extract_page_facts, extract_page_facts_and_links, facts_extractor_key, get_html_parser, HTML_PARSER_CHOICES, DEFAULT_HTML_PARSER
+from url_frontier import CrawlFrontier, normalize_url
+from rate_limiter import configure as configure_rate_limiter, get_rate_limiter, PolitenessScheduler
+from job_output import capture as capture_output, install as install_job_output, propagate, write_line
+from todo_markers import replace_markers, todo_values
+from template_compiler import load_template
+from output_writer import OutputWriter
+
 def get_current_datetime():
     """現在の日時を取得"""
     return datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")
@@ -69,8 +82,14 @@ def create_project_directory(date_str, force=False):
     
     return project_dir
 
-def copy_template_files(project_dir):
-    """汎用テンプレートファイルをコピー"""
+def copy_template_files(output, current_datetime, config_loader):
+    """汎用テンプレートファイルをTODOマーカーを埋めた状態でコピー（書き込みは output に予約）
+
+    テンプレートはコンパイル済みの形（template_compiler）から描画する。
+
+    Returns:
+        (コピーしたファイル, TODOマーカーを更新したファイル)
+    """
     # 新構成（src/templates/generic）と旧構成（templates/generic）の両対応
     candidates = [
         "src/templates/generic",
@@ -85,16 +104,28 @@ def copy_template_files(project_dir):
         print("❌ エラー: 汎用テンプレートディレクトリが見つかりません: src/templates/generic または templates/generic")
         sys.exit(1)
     
+    values = _todo_values(current_datetime, config_loader)
     copied_files = []
+    updated_files = []
     for filename in os.listdir(template_dir):
         if filename.endswith('.md'):
             src_path = os.path.join(template_dir, filename)
-            dst_path = os.path.join(project_dir, filename)
-            shutil.copy2(src_path, dst_path)
+            template = load_template(src_path)
+            content = template.render(values)
+            updated = content != template.text
+            if updated:
+                # 権限はテンプレートに揃える（更新日時は書き込み時刻）
+                output.write_text(filename, content, stat_source=src_path)
+            else:
+                # 置換が無ければ shutil.copy2 と同じく内容・更新日時・権限をそのまま写す
+                output.write_bytes(filename, template.raw, stat_source=src_path, keep_times=True)
             copied_files.append(filename)
             print(f"[OK] ファイルコピー: {filename}")
+            if updated:
+                updated_files.append(filename)
+                print(f"[OK] TODO更新: {filename}")
     
-    return copied_files
+    return copied_files, updated_files
 
 def _safe_slug_from_url(url: str) -> str:
     try:
@@ -106,183 +137,559 @@ def _safe_slug_from_url(url: str) -> str:
         return "competitor"
 
 def _extract_basic_page_facts(html: str, url: str) -> str:
-    """HTML から基本的な要素を抽出してMarkdownに整形"""
-    soup = BeautifulSoup(html, "html.parser")
-
-    def _text(el):
-        return (el.get_text(separator=" ", strip=True) if el else "").strip()
-
-    title = _text(soup.title)
-    meta_desc = ""
-    md = soup.find("meta", attrs={"name": "description"})
-    if md and md.get("content"):
-        meta_desc = md["content"].strip()
-    else:
-        ogd = soup.find("meta", attrs={"property": "og:description"})
-        meta_desc = (ogd.get("content") or "").strip() if ogd else ""
-
-    og_title = ""
-    ogt = soup.find("meta", attrs={"property": "og:title"})
-    if ogt and ogt.get("content"):
-        og_title = ogt["content"].strip()
-
-    canonical = ""
-    link_c = soup.find("link", attrs={"rel": ["canonical", "Canonical"]})
-    if link_c and link_c.get("href"):
-        canonical = link_c["href"].strip()
-
-    h1_list = [_text(h) for h in soup.find_all("h1")][:5]
-    h2_list = [_text(h) for h in soup.find_all("h2")][:8]
-    h3_list = [_text(h) for h in soup.find_all("h3")][:10]
-
-    # 簡易CTA検知（tel/mailto/cta-like anchors）
-    cta_links = []
-    for a in soup.find_all("a", href=True):
-        href = a["href"].strip()
-        text = _text(a)[:60]
-        if any(k in href.lower() for k in ["tel:", "mailto:", "contact", "inquiry", "form", "contact-us", "reserve", "booking", "資料", "問い合わせ", "予約"]):
-            cta_links.append(f"- [{text}]({href})")
-        if len(cta_links) >= 10:
-            break
-
-    lines = [
-        f"## ページ概要",
-        f"- URL: {url}",
-        f"- タイトル: {title or '-'}",
-        f"- og:title: {og_title or '-'}",
-        f"- メタディスクリプション: {meta_desc or '-'}",
-        f"- カノニカル: {canonical or '-'}",
-        "",
-        "## 見出し",
-        "### H1",
-    ]
-    lines += [f"- {t}" for t in h1_list] or ["- -"]
-    lines += ["", "### H2"]
-    lines += [f"- {t}" for t in h2_list] or ["- -"]
-    lines += ["", "### H3"]
-    lines += [f"- {t}" for t in h3_list] or ["- -"]
-
-    if cta_links:
-        lines += ["", "## 主要CTA（推定）"]
-        lines += cta_links
-
-    return "\n".join(lines)
+    """HTML から基本的な要素を抽出してMarkdownに整形（単一パス抽出、失敗時は BeautifulSoup）"""
+    return extract_page_facts(html, url)
 
 def _can_fetch_url(url: str, user_agent: str, timeout: int) -> bool:
     try:
         parsed = urlparse(url)
         if not parsed.scheme or not parsed.netloc:
             return False
-        robots_url = urljoin(f"{parsed.scheme}://{parsed.netloc}", "/robots.txt")
-        # requestsで取得してrobotparserに流し込む（タイムアウト制御のため）
-        resp = requests.get(robots_url, timeout=timeout)
-        if resp.status_code >= 400:
-            # robots.txt が無い/エラーの場合は許可とみなす
-            return True
-        rp = robotparser.RobotFileParser()
-        rp.parse(resp.text.splitlines())
-        return rp.can_fetch(user_agent, url)
+        from robots_cache import get_robots_cache
+
+        # robots.txt はホスト単位でキャッシュ（プロセス内メモリ＋TTL付きディスク）
+        return get_robots_cache().can_fetch(url, user_agent, timeout)
     except Exception:
         # 取得に失敗した場合は保守的に許可
         return True
 
-def fetch_and_save_competitors(project_dir, config_loader, timeout: int = 20, max_competitors: int | None = None, user_agent: str | None = None):
-    """設定内の競合URLを取得し、HTML保存と要約Markdownを生成"""
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+CACHE_STATE_LABELS = {"hit": "キャッシュ", "revalidated": "304再検証"}
+
+# http_client.DEFAULT_MAX_PAGE_BYTES と同値（引数の既定値のために requests を読み込まない）
+DEFAULT_MAX_PAGE_BYTES = 5 * 1024 * 1024
+
+@dataclass
+class FetchOptions:
+    """競合サイト取得の共通設定（各バックエンド・ワーカーに引き渡す）"""
+    user_agent: str = DEFAULT_USER_AGENT
+    timeout: int = 20
+    max_page_bytes: int = DEFAULT_MAX_PAGE_BYTES
+    raw_store: object = None
+
+def _get_competitor_page(result, options: FetchOptions):
+    """ページを GET して result に status/html を格納（HTTPキャッシュ有効時は条件付きリクエスト）
+
+    本文はストリーミングで受信し、ストア有効時は受信しながら圧縮保存する（result["raw_digest"]）。
+    """
+    from http_cache import get_http_cache
+    from http_client import fetch_html
+
+    url = result["url"]
+    headers = {"User-Agent": options.user_agent}
+    cache = get_http_cache()
+    writer = options.raw_store.open_writer() if options.raw_store is not None else None
+    try:
+        if cache is not None:
+            resp = cache.get(url, headers=headers, timeout=options.timeout, max_bytes=options.max_page_bytes, sink=writer)
+        else:
+            resp = fetch_html(url, headers=headers, timeout=options.timeout, max_bytes=options.max_page_bytes, sink=writer)
+        result["status"] = f"HTTP {resp.status_code}"
+        resp.raise_for_status()
+        result["html"] = resp.text
+        if resp.truncated:
+            result["status"] += f"（{options.max_page_bytes}バイトで打ち切り）"
+            write_line(f"[WARN] サイズ上限で打ち切り: {url}")
+        result["cache_state"] = getattr(resp, "cache_state", None)
+        if result["cache_state"] in CACHE_STATE_LABELS:
+            result["status"] += f"（{CACHE_STATE_LABELS[result['cache_state']]}）"
+            # 本文が変わっていなければ抽出済みの要約も再利用する
+            facts = cache.get_facts(url, facts_extractor_key())
+            if facts:
+                result["facts"] = facts
+                result["facts_cached"] = True
+    except Exception as e:
+        result["status"] = f"取得失敗: {e}"
+        write_line(f"[WARN] 取得失敗: {url} - {e}")
+
+    if writer is not None:
+        # キャッシュから得た本文はストリームを通らないため、ここで書き込む
+        if result["html"] and result.get("cache_state") in CACHE_STATE_LABELS:
+            writer.write(result["html"].encode("utf-8"))
+        if result["html"]:
+            result["raw_digest"] = writer.commit()
+        else:
+            writer.abort()
+    return result
+
+# 解析をプロセスプールに回す最小ページ数（これ未満はプール起動の方が高くつくためインプロセスで解析）
+PARSE_POOL_MIN_PAGES = 8
+
+def _available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def _create_parse_pool(num_pages: int, parse_workers: int = 0):
+    """解析ステージ用のプロセスプールを作る（小規模・1コア時は None = インプロセス解析）"""
+    workers = min(parse_workers or _available_cpus(), num_pages)
+    if workers <= 1 or num_pages < PARSE_POOL_MIN_PAGES:
+        return None
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # 投入は取得スレッド・ジョブスレッドから行われ、ワーカーは投入時に遅延して起動する。
+    # fork で起動すると他スレッドが持つロック（stdout・レート制限・SQLite 等）ごと複製してデッドロックし得るため、
+    # スレッドを持たないフォークサーバー（無い環境では spawn）から起動する
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    print(f"[INFO] 解析ステージ: {workers}プロセス")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method))
+
+def _needs_parse(result) -> bool:
+    """本文の解析が必要か（クロール対象はキャッシュ済み要約があってもリンク抽出のため解析する）"""
+    if not result["html"]:
+        return False
+    if result.get("collect_links"):
+        return "links" not in result
+    return not result.get("facts")
+
+def _parse_page(result):
+    """本文を解析して facts（クロール対象は links も）を格納する（インプロセス）"""
+    if result.get("collect_links"):
+        result["facts"], result["links"] = extract_page_facts_and_links(result["html"], result["url"])
+    else:
+        result["facts"] = _extract_basic_page_facts(result["html"], result["url"])
+    return result
+
+def _submit_parse(parse_pool, result):
+    """取得済みページの要素抽出を解析ステージへ投入する（取得ワーカーはすぐ次の取得に戻る）"""
+    if parse_pool is None or not _needs_parse(result):
+        return
+    func = extract_page_facts_and_links if result.get("collect_links") else extract_page_facts
+    try:
+        result["facts_future"] = parse_pool.submit(func, result["html"], result["url"], get_html_parser())
+    except Exception as e:
+        write_line(f"[WARN] 解析ステージへの投入失敗（インプロセスで解析）: {result['url']} - {e}")
+
+def _resolve_parse(result):
+    """解析結果を result に取り込む（未投入・プール異常時はインプロセスで解析）"""
+    future = result.pop("facts_future", None)
+    if future is not None:
+        try:
+            value = future.result()
+            if result.get("collect_links"):
+                result["facts"], result["links"] = value
+            else:
+                result["facts"] = value
+        except Exception as e:
+            print(f"[WARN] 解析ステージ失敗（インプロセスで再解析）: {result['url']} - {e}")
+    if _needs_parse(result):
+        _parse_page(result)
+    return result
+
+def _fetch_competitor_page(job, options: FetchOptions):
+    """1社分の robots.txt 確認とページ取得（ネットワーク処理のみ、日付ディレクトリには書かない）"""
+    url = job["url"]
+    result = dict(job, allowed=True, status="", html="")
+
+    # robots.txt に基づく取得可否
+    if not _can_fetch_url(url, options.user_agent, options.timeout):
+        write_line(f"[WARN] robots.txt により取得をスキップ: {url}")
+        result["allowed"] = False
+        return result
+
+    write_line(f"[INFO] 競合取得: {job['name']} - {url}")
+    return _get_competitor_page(result, options)
+
+def _fetch_competitors_concurrently(jobs, options: FetchOptions, workers: int = 1, parse_pool=None):
+    """同一ホストは入力順に直列、ホスト間は最大 workers 並列で取得し、入力順の結果を返す
+
+    ジョブは PolitenessScheduler が「レート制限上すぐ送れるホスト」から順に渡すため、
+    待ちが必要なホストでワーカーが塞がらない。
+    parse_pool を渡すと、取得できたページから順に解析ステージへ投入する。
+    """
+    scheduler = PolitenessScheduler(jobs, host_of=lambda job: job["slug"], limiter=get_rate_limiter())
+    results = [None] * len(jobs)
+
+    def _worker():
+        while True:
+            job = scheduler.next_job()
+            if job is None:
+                return
+            try:
+                result = _fetch_competitor_page(job, options)
+                _submit_parse(parse_pool, result)
+                results[job["order"]] = result
+            finally:
+                scheduler.done(job)
+
+    workers = max(1, min(workers or 1, len({job["slug"] for job in jobs})))
+    if workers == 1:
+        _worker()
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(propagate(_worker)) for _ in range(workers)]
+            for future in futures:
+                future.result()
+    return results
+
+def _fetch_competitors_async(jobs, options: FetchOptions, max_in_flight: int = 4, per_host_limit: int = 1, parse_pool=None):
+    """asyncio バックエンド: robots確認→GET→解析をコルーチンのパイプラインで実行し、入力順の結果を返す
+
+    同時実行は全体の上限（max_in_flight）とホスト単位のセマフォ（per_host_limit）で制御する。
+    ブロッキングな HTTP 呼び出しは max_in_flight 本に固定した実行器で処理するため、
+    URL数が数百件でもスレッド数は増えない。
+    parse_pool を渡すと、解析は実行器ではなく解析ステージ（プロセスプール）へ投入する。
+    """
+    import asyncio
+
+    max_in_flight = max(1, max_in_flight or 1)
+    per_host_limit = max(1, per_host_limit or 1)
+    limiter = get_rate_limiter()
+
+    async def _run_all():
+        loop = asyncio.get_running_loop()
+        global_sem = asyncio.Semaphore(max_in_flight)
+        host_sems = {}
+
+        async def _blocking(func, *args):
+            async with global_sem:
+                return await loop.run_in_executor(executor, propagate(func), *args)
+
+        async def _polite(url):
+            # レート制限の待ちは実行器の外で行い、他ホストの処理を止めない
+            while True:
+                wait = limiter.time_until_ready(url)
+                if wait <= 0:
+                    return
+                limiter.record_wait(wait)
+                await asyncio.sleep(wait)
+
+        async def _pipeline(job):
+            host_sem = host_sems.setdefault(job["slug"], asyncio.Semaphore(per_host_limit))
+            async with host_sem:
+                result = dict(job, allowed=True, status="", html="")
+                await _polite(job["url"])
+                if not await _blocking(_can_fetch_url, job["url"], options.user_agent, options.timeout):
+                    write_line(f"[WARN] robots.txt により取得をスキップ: {job['url']}")
+                    result["allowed"] = False
+                    return result
+                write_line(f"[INFO] 競合取得: {job['name']} - {job['url']}")
+                await _polite(job["url"])
+                result = await _blocking(_get_competitor_page, result, options)
+            # 解析はホストの枠を解放してから行い、次のリクエストと重ねる
+            if parse_pool is not None:
+                _submit_parse(parse_pool, result)
+            elif _needs_parse(result):
+                result = await _blocking(_parse_page, result)
+            return result
+
+        return await asyncio.gather(*(_pipeline(job) for job in jobs))
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        return asyncio.run(_run_all())
+
+def _fetch_and_parse(jobs, options: FetchOptions, workers: int = 1, backend: str = "thread", parse_pool=None):
+    """jobs を取得・解析し、入力順の結果を返す（ネットワークはホスト間並列、解析は解析ステージ）"""
+    if backend == "async":
+        results = _fetch_competitors_async(jobs, options, max_in_flight=workers, parse_pool=parse_pool)
+    else:
+        results = _fetch_competitors_concurrently(jobs, options, workers=workers, parse_pool=parse_pool)
+    for result in results:
+        _resolve_parse(result)
+    return results
+
+def _crawl_competitor_pages(roots, options: FetchOptions, crawl_depth: int, max_pages: int, workers: int = 1, backend: str = "thread", parse_pool=None, exclude_urls=()):
+    """起点ページのリンクから同一ホストの下層ページを幅優先で取得する
+
+    階層ごとに全競合の候補をまとめて取得し（同一ホストは直列、ホスト間は並列）、
+    取得した階層のリンクから次の階層の候補を選ぶ。候補の選択は入力順・文書順で決まるため、
+    取得の完了順によらず結果は決定的。robots.txt で拒否されたURLは上限を消費しない。
+
+    exclude_urls（サイトマップから取得済みのURL等）は訪問済みとして扱う。
+
+    Returns:
+        起点の order → 下層ページの取得結果リスト（選択順）
+    """
+    frontier = CrawlFrontier(max_pages, allow=lambda url: _can_fetch_url(url, options.user_agent, options.timeout))
+    roots_by_order = {root["order"]: root for root in roots}
+    for url in [root["url"] for root in roots] + list(exclude_urls):
+        frontier.seed(url)
+    pages = {root["order"]: [] for root in roots}
+    # 下層ページの本文はストアに入れない（要約のみ保存）
+    page_options = replace(options, raw_store=None)
+
+    current = roots
+    for depth in range(1, crawl_depth + 1):
+        for page in current:
+            owner = page.get("owner", page["order"])
+            frontier.discover(owner, page["url"], page.get("links") or [], depth, root_url=roots_by_order[owner]["url"])
+        selected = frontier.next_level()
+        if not selected:
+            break
+        print(f"[INFO] 下層ページ取得: 第{depth}階層 {len(selected)}件")
+        jobs = []
+        for owner, url, page_depth in selected:
+            root = roots_by_order[owner]
+            jobs.append({
+                "order": len(jobs), "name": root["name"], "url": url, "slug": root["slug"],
+                "owner": owner, "depth": page_depth, "collect_links": page_depth < crawl_depth,
+            })
+        current = _fetch_and_parse(jobs, page_options, workers=workers, backend=backend, parse_pool=parse_pool)
+        for result in current:
+            pages[result["owner"]].append(result)
+
+    stats = frontier.stats
+    print(f"[OK] 下層ページ: 取得対象 {stats['selected']}件 / 発見 {stats['discovered']}件（robots.txt 除外 {stats['disallowed']}件、上限 {max_pages}件）")
+    return pages
+
+def _fetch_sitemap_pages(roots, options: FetchOptions, top_n: int, workers: int = 1, backend: str = "thread", parse_pool=None):
+    """各競合のサイトマップから重要ページ上位 top_n 件を選んで取得する
+
+    サイトマップの走査はホスト単位で1回（ホスト間は並列）。同一ホストの競合が複数ある場合は
+    先頭の競合にページを割り当てる。
+
+    Returns:
+        (起点の order → 取得結果リスト（スコア順）, 起点の order → SitemapScan)
+    """
+    from sitemaps import scan_site
+
+    host_groups = {}
+    for root in roots:
+        host_groups.setdefault(root["slug"], []).append(root)
+
+    def _scan(group):
+        try:
+            return scan_site(
+                group[0]["url"],
+                top_n,
+                allow=lambda url: _can_fetch_url(url, options.user_agent, options.timeout),
+                timeout=options.timeout,
+                exclude=[normalize_url(root["url"]) for root in group],
+            )
+        except Exception as e:
+            write_line(f"[WARN] サイトマップ走査失敗: {group[0]['url']} - {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers or 1, len(host_groups)))) as executor:
+        scans = dict(zip(host_groups, executor.map(propagate(_scan), host_groups.values())))
+
+    jobs = []
+    reports = {}
+    for slug, group in host_groups.items():
+        scan = scans[slug]
+        if scan is None:
+            continue
+        for root in group:
+            reports[root["order"]] = scan
+        for url in scan.selected:
+            jobs.append({
+                "order": len(jobs), "name": group[0]["name"], "url": url, "slug": slug,
+                "owner": group[0]["order"], "depth": 1, "source": "sitemap",
+            })
+
+    pages = {root["order"]: [] for root in roots}
+    if jobs:
+        print(f"[INFO] サイトマップから重要ページ取得: {len(jobs)}件")
+        # 下層ページの本文はストアに入れない（要約のみ保存）
+        for result in _fetch_and_parse(jobs, replace(options, raw_store=None), workers=workers, backend=backend, parse_pool=parse_pool):
+            pages[result["owner"]].append(result)
+
+    for slug, group in host_groups.items():
+        scan = scans[slug]
+        if scan is not None:
+            fetched = sum(1 for page in pages[group[0]["order"]] if page["html"])
+            print(f"[OK] サイトマップ: {group[0]['name']} 走査 {scan.scanned}件 / 取得 {fetched}件（サイトマップ {len(scan.sitemaps)}件）")
+            for error in scan.errors:
+                print(f"[WARN] サイトマップ: {error}")
+    return pages, reports
+
+def _page_file_name(url: str, used: set) -> str:
+    """下層ページの要約ファイル名（パスから生成し、衝突・長すぎる場合はハッシュを付ける）"""
+    parsed = urlparse(url)
+    name = re.sub(r"[^a-zA-Z0-9._-]", "_", parsed.path.strip("/")) or "index"
+    if parsed.query or len(name) > 80 or f"{name}.md" in used:
+        name = f"{name[:80]}_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}"
+    used.add(f"{name}.md")
+    return f"{name}.md"
+
+def _write_page_summaries(output, comp_dir: str, pages, used_names: dict) -> list:
+    """下層ページの要約を competitors/<slug>/pages/ に書き出し、(URL, 相対パス, 取得結果) を返す
+
+    comp_dir はプロジェクトディレクトリからの相対パス。
+    used_names はディレクトリごとの使用済みファイル名（同一ホストの競合が同じディレクトリを共有するため）。
+    """
+    from http_cache import get_http_cache
+
+    pages_dir = f"{comp_dir}/pages"
+    if comp_dir not in used_names:
+        # 前回の巡回結果が残らないよう、今回の実行で最初に書く時に作り直す
+        output.remove(pages_dir)
+        used_names[comp_dir] = set()
+    used = used_names[comp_dir]
+
+    written = []
+    for page in pages:
+        file_name = _page_file_name(page["url"], used)
+        lines = [
+            f"# 競合: {page['name']}（下層ページ）",
+            "",
+            f"- URL: {page['url']}",
+            "- 発見元: サイトマップ" if page.get("source") == "sitemap" else f"- 階層: {page['depth']}",
+            f"- 取得結果: {page['status']}",
+            "",
+        ]
+        if page["html"]:
+            lines.append(page["facts"])
+            if page.get("cache_state") and not page.get("facts_cached"):
+                get_http_cache().put_facts(page["url"], page["facts"], facts_extractor_key())
+        else:
+            lines.append("取得に失敗したため内容はありません。")
+        output.write_text(f"{pages_dir}/{file_name}", "\n".join(lines))
+        written.append((page["url"], f"pages/{file_name}", page["status"]))
+    return written
+
+def fetch_and_save_competitors(output, config_loader, timeout: int = 20, max_competitors: int | None = None, user_agent: str | None = None, workers: int = 1, backend: str = "thread", raw_store=None, max_page_bytes: int = DEFAULT_MAX_PAGE_BYTES, parse_workers: int = 0, crawl_depth: int = 0, crawl_max_pages: int = 0, sitemap_pages: int = 0, parse_pool=None):
+    """設定内の競合URLを取得し、HTML保存と要約Markdownを生成（書き込みは output に予約）
+
+    parse_pool を渡すと解析にそのプロセスプールを使う（バッチ実行で企業間で共有する。終了は呼び出し側）。
+    """
+    from http_cache import get_http_cache
+
     competitors_info = config_loader.get_competitors_info()
     target_companies = competitors_info.get("target_companies", []) or []
     if not target_companies:
         print("[WARN] 競合企業が設定されていません。スキップします。")
         return []
 
-    base_dir = os.path.join(project_dir, "competitors")
-    os.makedirs(base_dir, exist_ok=True)
+    base_dir = "competitors"
+    output.makedirs(base_dir)
 
     aggregated_sections = []
     saved = []
-    ua = user_agent or "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
-    headers = {"User-Agent": ua}
+    options = FetchOptions(
+        user_agent=user_agent or DEFAULT_USER_AGENT,
+        timeout=timeout,
+        max_page_bytes=max_page_bytes,
+        raw_store=raw_store,
+    )
 
     if max_competitors is not None and max_competitors > 0:
         target_list = target_companies[:max_competitors]
     else:
         target_list = target_companies
 
+    crawl = crawl_depth > 0 and crawl_max_pages > 0
+    use_sitemap = sitemap_pages > 0
+    jobs = []
     for idx, comp in enumerate(target_list, start=1):
         name = comp.get("name") or f"Competitor {idx}"
         url = comp.get("website") or ""
         if not url:
             print(f"[WARN] 競合 '{name}' にURLがありません。スキップ")
             continue
+        jobs.append({"order": len(jobs), "name": name, "url": url, "slug": _safe_slug_from_url(url), "collect_links": crawl})
 
-        slug = _safe_slug_from_url(url)
-        comp_dir = os.path.join(base_dir, slug)
-        os.makedirs(comp_dir, exist_ok=True)
+    # 取得（ネットワーク）はホスト間で並列、解析はプロセスプールで取得と重ね、
+    # 保存と集約は入力順に直列で行い出力を決定的にする
+    num_pages = len(jobs) * (1 + (sitemap_pages if use_sitemap else 0)) + (crawl_max_pages if crawl else 0)
+    own_pool = parse_pool is None
+    if own_pool:
+        parse_pool = _create_parse_pool(num_pages, parse_workers)
+    pages = {}
+    sitemap_reports = {}
+    try:
+        results = _fetch_and_parse(jobs, options, workers=workers, backend=backend, parse_pool=parse_pool)
+        roots = [result for result in results if result["allowed"]]
+        pages = {root["order"]: [] for root in roots}
+        if use_sitemap:
+            # サイトマップで選んだ重要ページを先に取得し、巡回ではそれ以外を辿る
+            sitemap_pages_by_owner, sitemap_reports = _fetch_sitemap_pages(roots, options, sitemap_pages, workers=workers, backend=backend, parse_pool=parse_pool)
+            for owner, owner_pages in sitemap_pages_by_owner.items():
+                pages[owner] += owner_pages
+        if crawl:
+            exclude_urls = [page["url"] for owner_pages in pages.values() for page in owner_pages]
+            crawled = _crawl_competitor_pages(roots, options, crawl_depth, crawl_max_pages, workers=workers, backend=backend, parse_pool=parse_pool, exclude_urls=exclude_urls)
+            for owner, owner_pages in crawled.items():
+                pages[owner] += owner_pages
+    finally:
+        if own_pool and parse_pool is not None:
+            parse_pool.shutdown()
 
-        # robots.txt に基づく取得可否
-        if not _can_fetch_url(url, ua, timeout):
-            print(f"[WARN] robots.txt により取得をスキップ: {url}")
+    page_names = {}
+    for result in results:
+        name = result["name"]
+        url = result["url"]
+        comp_dir = f"{base_dir}/{result['slug']}"
+        output.makedirs(comp_dir)
+
+        if not result["allowed"]:
             continue
 
-        print(f"[INFO] 競合取得: {name} - {url}")
-        html = ""
-        status = ""
-        try:
-            resp = requests.get(url, headers=headers, timeout=timeout)
-            status = f"HTTP {resp.status_code}"
-            resp.raise_for_status()
-            html = resp.text
-        except Exception as e:
-            status = f"取得失敗: {e}"
-            print(f"[WARN] 取得失敗: {url} - {e}")
+        html = result["html"]
+        status = result["status"]
 
-        # 保存（raw.html）
-        raw_path = os.path.join(comp_dir, "raw.html")
+        # 保存（ストア有効時は raw.ref、無効時は平文の raw.html）
+        raw_path = f"{comp_dir}/{RAW_REF_NAME if raw_store is not None else RAW_HTML_NAME}"
+        stale_path = f"{comp_dir}/{RAW_HTML_NAME if raw_store is not None else RAW_REF_NAME}"
         try:
-            with open(raw_path, "w", encoding="utf-8", errors="ignore") as f:
-                f.write(html or "")
+            if raw_store is not None:
+                output.write_text(raw_path, raw_store.ref_text((html or "").encode("utf-8", errors="ignore"), digest=result.get("raw_digest")))
+            else:
+                output.write_text(raw_path, html or "", errors="ignore")
+            output.remove(stale_path)
         except Exception as e:
-            print(f"[WARN] raw保存失敗: {raw_path} - {e}")
+            print(f"[WARN] raw保存失敗: {output.path(raw_path)} - {e}")
 
         # 要約生成
-        summary_md = [f"# 競合: {name}", "", f"- URL: {url}", f"- 取得結果: {status}", ""]
+        summary_md = [f"# 競合: {name}", "", f"- URL: {url}", f"- 取得結果: {status}"]
+        sitemap_line = None
+        if use_sitemap:
+            scan = sitemap_reports.get(result["order"])
+            fetched_pages = sum(1 for page in pages.get(result["order"], []) if page.get("source") == "sitemap" and page["html"])
+            sitemap_line = f"- サイトマップ: 走査 {scan.scanned}件 / 取得 {fetched_pages}件" if scan is not None else "- サイトマップ: 走査失敗"
+            summary_md.append(sitemap_line)
+        summary_md.append("")
         if html:
-            summary_md.append(_extract_basic_page_facts(html, url))
+            facts = result["facts"]
+            if result.get("cache_state") and not result.get("facts_cached"):
+                get_http_cache().put_facts(url, facts, facts_extractor_key())
+            summary_md.append(facts)
         else:
             summary_md.append("取得に失敗したため内容はありません。")
 
-        summary_path = os.path.join(comp_dir, "summary.md")
-        with open(summary_path, "w", encoding="utf-8") as f:
-            f.write("\n".join(summary_md))
+        # 下層ページ（--crawl-depth / --sitemap-pages 指定時）
+        page_links = _write_page_summaries(output, comp_dir, pages.get(result["order"], []), page_names) if crawl or use_sitemap else []
+        if page_links:
+            summary_md += ["", "## 下層ページ"]
+            summary_md += [f"- {page_url}: {page_path}（{page_status}）" for page_url, page_path, page_status in page_links]
+
+        rel_path = f"{comp_dir}/summary.md"
+        output.write_text(rel_path, "\n".join(summary_md))
 
         # 集約用セクション
-        rel_path = os.path.relpath(summary_path, project_dir).replace("\\", "/")
         section = [
             f"## {name}",
             f"- URL: {url}",
             f"- レポート: {rel_path}",
-            "",
         ]
+        if sitemap_line:
+            section.append(sitemap_line)
+        if crawl or use_sitemap:
+            section.append(f"- 下層ページ: {len(page_links)}件")
+        section.append("")
         aggregated_sections += section
         saved.append({"name": name, "url": url, "summary": rel_path})
 
     # 集約ファイル
     index_md = ["# 競合サイト収集レポート", ""] + aggregated_sections
-    index_path = os.path.join(base_dir, "summary.md")
-    with open(index_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(index_md))
+    index_path = f"{base_dir}/summary.md"
+    output.write_text(index_path, "\n".join(index_md))
 
-    print(f"[OK] 競合レポート作成: {os.path.relpath(index_path)}")
+    print(f"[OK] 競合レポート作成: {os.path.relpath(output.path(index_path))}")
     return saved
 
-def inject_competitor_analysis_into_requirements(project_dir):
+def inject_competitor_analysis_into_requirements(output):
     """04_lp-requirements.md の競合LP分析セクションを自動差し込み"""
-    req_path = os.path.join(project_dir, "04_lp-requirements.md")
-    if not os.path.exists(req_path):
+    req_path = output.path("04_lp-requirements.md")
+    content = output.read_text("04_lp-requirements.md")
+    if content is None:
         print("[WARN] 04_lp-requirements.md が見つからないため注入をスキップします。")
         return False
 
-    competitors_summary = os.path.join(project_dir, "competitors", "summary.md")
-    rel_comp_sum = os.path.relpath(competitors_summary, project_dir).replace("\\", "/")
+    rel_comp_sum = "competitors/summary.md"
 
     injected = (
         "<!-- TODO_COMPETITOR_LP -->\n"
@@ -294,14 +701,11 @@ def inject_competitor_analysis_into_requirements(project_dir):
     )
 
     try:
-        with open(req_path, "r", encoding="utf-8") as f:
-            content = f.read()
         # TODOブロックを差し替え
         pattern = r"<!-- TODO_COMPETITOR_LP -->[\s\S]*?<!-- /TODO_COMPETITOR_LP -->"
         new_content = re.sub(pattern, injected, content)
         if new_content != content:
-            with open(req_path, "w", encoding="utf-8") as f:
-                f.write(new_content)
+            output.write_text("04_lp-requirements.md", new_content)
             print(f"[OK] 競合LP分析セクションを自動更新: {os.path.relpath(req_path)}")
             return True
         else:
@@ -311,53 +715,34 @@ def inject_competitor_analysis_into_requirements(project_dir):
         print(f"[WARN] 要件定義への注入に失敗: {e}")
         return False
 
-def update_todo_markers(project_dir, current_datetime, config_loader):
-    """TODOマーカーを実行日時と設定情報に更新"""
-    updated_files = []
-    
-    # 設定情報を取得
+def _todo_values(current_datetime, config_loader):
+    """TODOマーカーに埋め込む実行日時と設定情報"""
     company_info = config_loader.get_company_info()
     company_name = company_info.get('name', 'TARGET_COMPANY')
     industry = company_info.get('industry', 'TARGET_INDUSTRY')
+    return todo_values(current_datetime, company_name, industry)
+
+def update_todo_markers(output, current_datetime, config_loader, skip=()):
+    """TODOマーカーを実行日時と設定情報に更新（skip のファイルはテンプレートから描画済みのため読まない）"""
+    updated_files = []
+    values = _todo_values(current_datetime, config_loader)
     
-    for filename in os.listdir(project_dir):
-        if filename.endswith('.md'):
-            file_path = os.path.join(project_dir, filename)
-            
+    filenames = os.listdir(output.project_dir) if os.path.isdir(output.project_dir) else []
+    for filename in filenames:
+        if filename.endswith('.md') and filename not in skip:
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                content = output.read_text(filename)
+                if content is None:
+                    continue
                 
                 original_content = content
                 
                 # 基本的なTODOマーカーの更新（業界・企業の汎用置換 + 旧テンプレ互換）
-                replacements = {
-                    # 実行日時
-                    r'<!-- TODO_EXECUTION_DATE -->\s*実行日時を記載\s*<!-- /TODO_EXECUTION_DATE -->': f'<!-- TODO_EXECUTION_DATE -->\n{current_datetime}\n<!-- /TODO_EXECUTION_DATE -->',
-                    r'TODO:\s*実行日時を記載': current_datetime,
-                    
-                    # 企業名・業界の置換（特定企業名は扱わない）
-                    r'TARGET_COMPANY': company_name,
-                    r'TARGET_INDUSTRY': industry,
-
-                    # 旧テンプレ（葬儀特化）互換のための置換
-                    r'和光葬儀社': company_name,
-                    r'株式会社和光商事：和光葬儀社': company_name,
-                    r'葬儀業界': industry,
-                    r'葬儀サービス業': industry,
-                    
-                    # 汎用的な置換
-                    r'<!-- TODO_COMPANY_NAME -->\s*企業名を記載\s*<!-- /TODO_COMPANY_NAME -->': f'<!-- TODO_COMPANY_NAME -->\n{company_name}\n<!-- /TODO_COMPANY_NAME -->',
-                    r'<!-- TODO_INDUSTRY_NAME -->\s*業界名を記載\s*<!-- /TODO_INDUSTRY_NAME -->': f'<!-- TODO_INDUSTRY_NAME -->\n{industry}\n<!-- /TODO_INDUSTRY_NAME -->',
-                }
-                
-                # 置換を実行
-                for pattern, replacement in replacements.items():
-                    content = re.sub(pattern, replacement, content)
+                # 全パターンを1回の走査で置換する（ルールは todo_markers.TODO_RULES）
+                content, _ = replace_markers(content, values)
                 
                 if content != original_content:
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
+                    output.write_text(filename, content)
                     updated_files.append(filename)
                     print(f"[OK] TODO更新: {filename}")
                 
@@ -366,31 +751,24 @@ def update_todo_markers(project_dir, current_datetime, config_loader):
     
     return updated_files
 
-def create_dynamic_knowledge_base(project_dir, config_loader):
+def create_dynamic_knowledge_base(output, config_loader):
     """設定ファイルから動的知識ベースを作成"""
     knowledge_base_content = config_loader.generate_knowledge_base()
     
-    # 知識ベースファイルを作成
-    knowledge_dir = os.path.join(project_dir, 'knowledge')
-    os.makedirs(knowledge_dir, exist_ok=True)
-    
     # 企業情報ファイル
-    company_file = os.path.join(knowledge_dir, 'company-info.md')
-    with open(company_file, 'w', encoding='utf-8') as f:
-        f.write(knowledge_base_content)
+    output.write_text('knowledge/company-info.md', knowledge_base_content)
     
     print(f"[OK] 動的知識ベース作成: knowledge/company-info.md")
     
     # 設定サマリーファイル
     summary_content = config_loader.generate_project_summary()
-    summary_file = os.path.join(project_dir, 'project-summary.md')
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        f.write(summary_content)
+    output.write_text('project-summary.md', summary_content)
     
     print(f"[OK] プロジェクトサマリー作成: project-summary.md")
 
-def create_project_readme(project_dir, date_str, current_datetime, config_loader):
+def create_project_readme(output, date_str, current_datetime, config_loader):
     """プロジェクト用README.mdを作成"""
+    project_dir = output.project_dir
     company_info = config_loader.get_company_info()
     company_name = company_info.get('name', 'TARGET_COMPANY')
     industry = company_info.get('industry', 'TARGET_INDUSTRY')
@@ -443,14 +821,34 @@ def create_project_readme(project_dir, date_str, current_datetime, config_loader
 *このファイルは汎用マーケティングツールによって自動生成されました（{current_datetime}）*
 """
     
-    readme_path = os.path.join(project_dir, 'README.md')
-    with open(readme_path, 'w', encoding='utf-8') as f:
-        f.write(readme_content)
+    output.write_text('README.md', readme_content)
     
     print(f"[OK] プロジェクトREADME作成: README.md")
 
-def main():
-    """メイン処理"""
+def create_project_directory_with_base(base_dir: str, date_str: str, force: bool = False, interactive: bool = True, create: bool = True):
+    """出力先 base_dir の下に日付ディレクトリを作成（既存時は確認。interactive=False なら None を返してスキップ）
+
+    create=False なら新規ディレクトリは作らずパスだけ返す（OutputWriter の確定時に作成される）。
+    """
+    os.makedirs(base_dir, exist_ok=True)
+    project_dir_local = os.path.join(base_dir, date_str)
+    if os.path.exists(project_dir_local):
+        print(f"[WARN] ディレクトリ {project_dir_local} は既に存在します。")
+        if not force:
+            if not interactive:
+                print("[WARN] 確認できないためスキップします（上書きする場合は --force）。")
+                return None
+            response = input("続行しますか？ (y/n): ")
+            if response.lower() != 'y':
+                print("❌ 処理を中止しました。")
+                sys.exit(1)
+    elif create:
+        os.makedirs(project_dir_local)
+        print(f"[OK] ディレクトリ作成: {project_dir_local}")
+    return project_dir_local
+
+def build_arg_parser():
+    """setup-project.py のコマンドライン引数定義"""
     parser = argparse.ArgumentParser(
         description='汎用マーケティングツール プロジェクト自動セットアップ',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -459,6 +857,7 @@ def main():
   python workflows/setup-project.py                    # 今日の日付で作成
   python workflows/setup-project.py --date 20250625    # 指定日付で作成
   python workflows/setup-project.py --config input/project-config.yaml  # 設定ファイル指定
+  python workflows/setup-project.py --batch configs/*.yaml --batch-workers 4  # 複数企業を一括作成
         """
     )
     parser.add_argument('--date', help='プロジェクト日付（YYYYMMDD形式）')
@@ -468,6 +867,21 @@ def main():
     parser.add_argument('--no-inject', action='store_true', help='要件定義への競合反映（自動注入）をスキップする')
     parser.add_argument('--fetch-timeout', type=int, default=20, help='競合サイト取得のHTTPタイムアウト（秒）')
     parser.add_argument('--max-competitors', type=int, help='取得対象の上限件数（未指定なら全件）')
+    parser.add_argument('--fetch-workers', type=int, default=4, help='競合サイト取得の同時実行数（同一ホストは直列、既定: 4）')
+    parser.add_argument('--crawl-depth', type=int, default=0, help='競合サイトの下層ページを辿る階層数（既定: 0 = トップページのみ）')
+    parser.add_argument('--crawl-max-pages', type=int, default=30, help='下層ページの取得上限（全競合の合計、既定: 30）')
+    parser.add_argument('--sitemap-pages', type=int, default=0, help='sitemap.xml から重要ページ（問い合わせ・料金・サービス等）を選んで取得する件数（競合ごと、既定: 0 = 無効）')
+    parser.add_argument('--parse-workers', type=int, default=0, help='競合ページ解析のプロセス数（既定: 0 = 利用可能なコア数、1 でインプロセス）')
+    parser.add_argument('--http-pool-size', type=int, default=10, help='ホストごとのHTTP接続プール数（keep-alive、既定: 10）')
+    parser.add_argument('--http-retries', type=int, default=2, help='接続失敗・429/5xx時のリトライ回数（既定: 2）')
+    parser.add_argument('--http-backoff', type=float, default=0.5, help='リトライ間隔の指数バックオフ係数（秒、既定: 0.5）')
+    parser.add_argument('--robots-ttl', type=int, default=86400, help='robots.txt キャッシュの有効秒数（Cache-Control/Expires があればそちらを優先、既定: 86400）')
+    parser.add_argument('--cache-dir', help='robots.txt・HTTPキャッシュの保存先（既定: <outdir>/.cache）')
+    parser.add_argument('--no-http-cache', action='store_true', help='競合ページのHTTPキャッシュ（条件付きリクエスト）を使わない')
+    parser.add_argument('--no-raw-store', action='store_true', help='取得HTMLを圧縮ストア（<outdir>/.store）に入れず、平文の raw.html として保存する')
+    parser.add_argument('--max-page-bytes', type=int, default=DEFAULT_MAX_PAGE_BYTES, help='競合ページ1件あたりの最大受信バイト数（超過分は打ち切り、既定: 5MiB）')
+    parser.add_argument('--fetch-backend', choices=['thread', 'async'], default='thread', help='競合サイト取得の実行方式（thread: スレッドプール / async: asyncio パイプライン）')
+    parser.add_argument('--html-parser', choices=list(HTML_PARSER_CHOICES), default=DEFAULT_HTML_PARSER, help='競合ページの解析バックエンド（builtin と同じ抽出結果になるもののみ。lxml/html5lib は html_facts.py での比較用）')
     # 簡易実行向けの引数（企業名だけで実行したいケースに対応）
     parser.add_argument('--quick', action='store_true', help='企業名のみで最短実行（不足設定のエラーを警告に緩和）')
     parser.add_argument('--company', help='企業名を直接指定（--quick と併用推奨）')
@@ -475,34 +889,372 @@ def main():
     parser.add_argument('--outdir', default='output', help='出力ディレクトリ（既定: output）')
     # user_input.md の反映制御
     parser.add_argument('--no-user-input', action='store_true', help='user_input.md の反映をスキップする')
+    # 複数企業の一括実行
+    parser.add_argument('--batch', nargs='+', metavar='CONFIG', help='複数の設定ファイル（YAML・glob・1行1パスのマニフェスト）を1プロセスで一括セットアップする。出力は <outdir>/<設定ファイル名>/<日付>')
+    parser.add_argument('--batch-workers', type=int, default=1, help='--batch 時に同時にセットアップする企業数（既定: 1 = 順番に実行）')
+    # 常駐モード
+    parser.add_argument('--serve', action='store_true', help='常駐してローカルのジョブAPI（HTTP JSON）でセットアップを受け付ける')
+    parser.add_argument('--serve-host', default='127.0.0.1', help='--serve の待ち受けアドレス（既定: 127.0.0.1）')
+    parser.add_argument('--serve-port', type=int, default=8787, help='--serve の待ち受けポート（既定: 8787）')
+    parser.add_argument('--serve-workers', type=int, default=2, help='--serve で同時に実行するジョブ数（既定: 2）')
+    return parser
+
+def check_config(config_loader, quick: bool = False, config_name: str = 'input/project-config.yaml') -> bool:
+    """設定の妥当性チェック（エラー・警告を表示し、続行できるかを返す）"""
+    errors, warnings = config_loader.validate_config()
+    if quick:
+        # quick モードでは、企業名以外（業界/地域など）の不足は警告に緩和
+        must_fix = []
+        relaxed = []
+        for err in errors:
+            if '企業名' in err:
+                must_fix.append(err)
+            else:
+                relaxed.append(err)
+        if relaxed:
+            warnings = list(warnings) + [f"(quick) {w}" for w in relaxed]
+        if must_fix:
+            print("[ERROR] 設定エラーが見つかりました:")
+            for error in must_fix:
+                print(f"  - {error}")
+            print("企業名のみは --company か --company-file で指定してください。")
+            return False
+    else:
+        if errors:
+            print("[ERROR] 設定エラーが見つかりました:")
+            for error in errors:
+                print(f"  - {error}")
+            print(f"{config_name}を修正してから再実行してください。")
+            return False
     
-    args = parser.parse_args()
+    if warnings:
+        print("[WARN] 設定警告:")
+        for warning in warnings:
+            print(f"  - {warning}")
+        print()
+    return True
+
+def configure_fetching(args, fetch_config=None):
+    """HTTP Session・robots.txt/HTTPキャッシュ・解析バックエンド・レート制限のプロセス共有設定
+
+    Returns:
+        (robots_cache, http_cache, html_parser, rate_limiter)
+    """
+    from http_client import configure as configure_http
+    from robots_cache import configure as configure_robots_cache
+    from http_cache import configure as configure_http_cache
+
+    configure_http(pool_size=args.http_pool_size, retries=args.http_retries, backoff=args.http_backoff)
+    cache_dir = args.cache_dir or os.path.join(args.outdir, ".cache")
+    robots_cache = configure_robots_cache(cache_dir=os.path.join(cache_dir, "robots"), ttl=args.robots_ttl)
+    http_cache = configure_http_cache(None if args.no_http_cache else os.path.join(cache_dir, "http"))
+    html_parser = configure_html_parser(args.html_parser)
+    rate_limiter = configure_rate_limiter(fetch_config)
+    return robots_cache, http_cache, html_parser, rate_limiter
+
+def setup_project(args, config_loader, base_dir, target_date, current_datetime, interactive=True, parse_pool=None):
+    """1社分のプロジェクト作成（ディレクトリ作成〜要件定義への競合反映）
+
+    HTTP 等の共有設定（configure_fetching）は呼び出し側で済ませておく。
+    出力は OutputWriter に集め、最後にまとめて確定する（途中で失敗した場合は何も書き込まない）。
+
+    Returns:
+        結果の dict（project_dir, copied_files, updated_files, competitors, fetch_seconds）。
+        既存ディレクトリのためスキップした場合は None
+    """
+    # 2. プロジェクトディレクトリ作成（出力先切替に対応）
+    project_dir = create_project_directory_with_base(base_dir, target_date, force=args.force, interactive=interactive, create=False)
+    if project_dir is None:
+        return None
+    created = not os.path.isdir(project_dir)
+    with OutputWriter(project_dir) as output:
+        result = _build_project_output(args, output, target_date, current_datetime, config_loader, parse_pool)
+        # 8. 出力の確定（一時ディレクトリへ並列に書き出し、名前の変更で配置）
+        output.commit()
+    if created:
+        print(f"[OK] ディレクトリ作成: {project_dir}（{len(output)}ファイル）")
+    else:
+        print(f"[OK] 出力を更新: {project_dir}（{len(output)}ファイル）")
+    # 9. プロジェクト索引（check-progress.py / fix-date-mismatch.py が参照）にこのプロジェクトだけを反映
+    update_project_index(args.outdir, project_dir)
+    result["project_dir"] = project_dir
+    return result
+
+def update_project_index(outdir, project_dir):
+    """<outdir>/.cache/projects.sqlite にプロジェクトを反映（失敗しても警告のみ。次回の参照時に読み直される）"""
+    try:
+        from project_index import ProjectIndex
+
+        with ProjectIndex(outdir) as index:
+            index.update_project(project_dir)
+    except Exception as e:
+        print(f"[WARN] プロジェクト索引の更新に失敗: {e}")
+
+def _build_project_output(args, output, target_date, current_datetime, config_loader, parse_pool):
+    """setup_project の手順 3〜7（ファイルの書き込みは output に予約する）"""
+    # 3. テンプレートファイルコピー（TODOマーカーも同時に埋める）
+    copied_files, updated_files = copy_template_files(output, current_datetime, config_loader)
+
+    # 3.5 競合サイトの取得・要約保存
+    competitors = None
+    fetch_seconds = 0.0
+    if not args.no_competitors:
+        started = time.perf_counter()
+        try:
+            fetched = fetch_and_save_competitors(
+                output,
+                config_loader,
+                timeout=args.fetch_timeout,
+                max_competitors=args.max_competitors,
+                workers=args.fetch_workers,
+                backend=args.fetch_backend,
+                raw_store=None if args.no_raw_store else BlobStore(store_root(args.outdir)),
+                max_page_bytes=args.max_page_bytes,
+                parse_workers=args.parse_workers,
+                crawl_depth=args.crawl_depth,
+                crawl_max_pages=args.crawl_max_pages,
+                sitemap_pages=args.sitemap_pages,
+                parse_pool=parse_pool,
+            )
+            competitors = len(fetched)
+            print(f"[OK] 競合サイト処理: {len(fetched)}件")
+        except Exception as e:
+            print(f"[WARN] 競合サイト処理で例外: {e}")
+        fetch_seconds = time.perf_counter() - started
+    else:
+        print("[INFO] --no-competitors 指定のため、競合サイト取得をスキップします。")
     
+    # 4. TODOマーカー更新（--force で既存ディレクトリに残っていたテンプレート以外のファイル）
+    updated_files += update_todo_markers(output, current_datetime, config_loader, skip=copied_files)
+    
+    # 5. 動的知識ベース作成
+    create_dynamic_knowledge_base(output, config_loader)
+    
+    # 6. プロジェクトREADME作成
+    create_project_readme(output, target_date, current_datetime, config_loader)
+
+    # 7. 要件定義への競合反映（TODOブロックをガイド文で置換）
+    if not args.no_inject:
+        inject_competitor_analysis_into_requirements(output)
+    else:
+        print("[INFO] --no-inject 指定のため、要件定義への自動反映をスキップします。")
+
+    return {
+        "copied_files": copied_files,
+        "updated_files": updated_files,
+        "competitors": competitors,
+        "fetch_seconds": fetch_seconds,
+    }
+
+def print_fetch_summary(robots_cache, http_cache, html_parser, rate_limiter):
+    """競合取得の共有統計（接続・robots.txt・解析・レート制限・HTTPキャッシュ）"""
+    from http_client import format_connection_stats
+
+    print(format_connection_stats())
+    print(robots_cache.summary())
+    print(f"HTML解析: {html_parser}")
+    print(rate_limiter.summary())
+    if http_cache is not None:
+        print(http_cache.summary())
+
+def expand_batch_configs(entries):
+    """--batch の引数を設定ファイルの一覧に展開する
+
+    YAML（.yaml/.yml）はそのまま、glob はシェルが展開しない環境（Windows 等）向けにここで展開し、
+    それ以外のファイルは1行1パスのマニフェストとして読む（空行・# 始まりは無視、相対パスはマニフェスト基準）。
+    """
+    paths = []
+    for entry in entries:
+        for path in sorted(glob.glob(entry)) or [entry]:
+            if path.lower().endswith(('.yaml', '.yml')):
+                paths.append(path)
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    lines = [line.strip() for line in f]
+            except OSError as e:
+                print(f"[WARN] マニフェストを読み込めません: {path} - {e}")
+                continue
+            base = os.path.dirname(path)
+            for line in lines:
+                if not line or line.startswith('#'):
+                    continue
+                target = line if os.path.isabs(line) else os.path.join(base, line)
+                paths.extend(sorted(glob.glob(target)) or [target])
+    seen = set()
+    return [p for p in paths if not (os.path.abspath(p) in seen or seen.add(os.path.abspath(p)))]
+
+def _batch_dir_names(config_paths):
+    """設定ファイルごとの出力サブディレクトリ名（ファイル名の拡張子なし。重複時は -2, -3 …）"""
+    names = []
+    used = set()
+    for path in config_paths:
+        stem = os.path.splitext(os.path.basename(path))[0] or "project"
+        name = stem
+        index = 2
+        while name in used:
+            name = f"{stem}-{index}"
+            index += 1
+        used.add(name)
+        names.append(name)
+    return names
+
+def _run_batch_job(args, job, target_date, current_datetime, parse_pool=None):
+    """バッチの1社分（設定読み込み〜セットアップ）。例外・sys.exit も結果に変換して返す"""
+    started = time.perf_counter()
+    row = dict(job, company="-", status="失敗", competitors=None, fetch_seconds=0.0, project_dir="")
+    try:
+        if not os.path.exists(job["config"]):
+            print(f"[ERROR] 設定ファイルが見つかりません: {job['config']}")
+        else:
+            config_loader = ConfigLoader(job["config"], allow_missing=bool(args.quick))
+            print(f"[OK] 設定ファイル読み込み完了: {job['config']}")
+            row["company"] = config_loader.get_company_info().get('name') or "-"
+            if check_config(config_loader, quick=bool(args.quick), config_name=job["config"]):
+                config_loader.print_config_summary()
+                print()
+                result = setup_project(args, config_loader, job["base_dir"], target_date, current_datetime, interactive=False, parse_pool=parse_pool)
+                if result is None:
+                    row["status"] = "スキップ"
+                else:
+                    row.update(status="OK", competitors=result["competitors"], fetch_seconds=result["fetch_seconds"], project_dir=result["project_dir"])
+                    print(f"作業ディレクトリ: {result['project_dir']}")
+    except SystemExit:
+        # ConfigLoader・テンプレートコピー等の致命的エラー（メッセージは出力済み）
+        pass
+    except Exception as e:
+        print(f"[ERROR] セットアップ中に例外: {e}")
+    row["seconds"] = time.perf_counter() - started
+    return row
+
+def _print_batch_table(rows, elapsed):
+    """企業ごとの所要時間の一覧"""
+    print("バッチ実行結果:")
+    print("| # | 設定 | 企業名 | 結果 | 競合 | 競合取得(秒) | 合計(秒) | 作業ディレクトリ |")
+    print("|---|---|---|---|---:|---:|---:|---|")
+    for row in rows:
+        competitors = "-" if row["competitors"] is None else row["competitors"]
+        print(f"| {row['index']} | {row['config']} | {row['company']} | {row['status']} | {competitors} | {row['fetch_seconds']:.1f} | {row['seconds']:.1f} | {row['project_dir'] or '-'} |")
+    counts = {status: sum(1 for row in rows if row["status"] == status) for status in ("OK", "スキップ", "失敗")}
+    total = sum(row["seconds"] for row in rows)
+    print(f"計 {len(rows)}社（成功 {counts['OK']} / スキップ {counts['スキップ']} / 失敗 {counts['失敗']}） 経過 {elapsed:.1f}秒（各社の合計 {total:.1f}秒）")
+
+def run_batch(args) -> int:
+    """--batch: 複数の設定ファイルを1プロセスでセットアップし、終了コードを返す
+
+    HTTP Session・robots.txt/HTTPキャッシュ・レート制限・解析プロセスプールは全社で共有する。
+    レート制限は --config（既定: input/project-config.yaml）の fetch セクションに従う。
+    --batch-workers > 1 のときは企業単位で並列に実行し、各社の出力はまとめて表示する。
+    """
+    config_paths = expand_batch_configs(args.batch)
+    if not config_paths:
+        print("[ERROR] --batch に該当する設定ファイルがありません。")
+        return 1
+    if args.company:
+        print("[WARN] --batch では --company を無視します（企業名は各設定ファイルから読み込みます）。")
+    if not args.no_user_input:
+        print("[INFO] --batch では user_input.md の反映をスキップします。")
+
+    workers = max(1, min(args.batch_workers or 1, len(config_paths)))
+    print(f"[INFO] バッチ実行: {len(config_paths)}社（同時実行 {workers}）")
+    target_date = get_target_date(args.date)
+    current_datetime = get_current_datetime()
+    print(f"対象日付: {target_date}")
+    print(f"実行日時: {current_datetime}")
+    print()
+
+    shared = None
+    parse_pool = None
+    if not args.no_competitors:
+        fetch_config = {}
+        base_config = args.config or 'input/project-config.yaml'
+        if os.path.exists(base_config):
+            try:
+                fetch_config = ConfigLoader(base_config).get_fetch_config()
+            except (Exception, SystemExit):
+                print(f"[WARN] {base_config} の fetch 設定を読み込めません。既定のレート制限を使います。")
+        shared = configure_fetching(args, fetch_config)
+        parse_pool = _create_parse_pool(PARSE_POOL_MIN_PAGES * len(config_paths), args.parse_workers)
+
+    jobs = [
+        {"index": index, "config": path, "base_dir": os.path.join(args.outdir, name)}
+        for index, (path, name) in enumerate(zip(config_paths, _batch_dir_names(config_paths)), start=1)
+    ]
+    started = time.perf_counter()
+    rows = []
+    try:
+        if workers == 1:
+            for job in jobs:
+                print(f"===== [{job['index']}/{len(jobs)}] {job['config']} =====")
+                rows.append(_run_batch_job(args, job, target_date, current_datetime, parse_pool))
+                print()
+        else:
+            install_job_output()
+
+            def _captured(job):
+                with capture_output() as buffer:
+                    row = _run_batch_job(args, job, target_date, current_datetime, parse_pool)
+                return row, buffer.getvalue()
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_captured, job) for job in jobs]
+                # 出力は完了順ではなく入力順にまとめて表示する
+                for job, future in zip(jobs, futures):
+                    row, log = future.result()
+                    print(f"===== [{job['index']}/{len(jobs)}] {job['config']} =====")
+                    print(log, end="")
+                    print()
+                    rows.append(row)
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    _print_batch_table(rows, elapsed)
+    if shared is not None:
+        print_fetch_summary(*shared)
+    print()
+    return 0 if all(row["status"] != "失敗" for row in rows) else 1
+
+def apply_user_input(config_target):
+    """user_input.md（カレント/プロジェクトルート）があれば設定ファイルに反映する（設定ファイルを書き換える）"""
+    # user_input.md の探索（カレント/プロジェクトルート候補）
+    user_input_candidates = [
+        'user_input.md',
+        os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..', 'user_input.md')),
+    ]
+    user_input_path = next((p for p in user_input_candidates if os.path.exists(p)), None)
+    if user_input_path:
+        try:
+            applied, updated_keys = apply_user_input_to_config(user_input_path, config_target)
+            if applied:
+                print(f"[OK] user_input.md を設定に反映: {len(updated_keys)}項目更新")
+            else:
+                print("[INFO] user_input.md から反映すべき更新はありませんでした")
+        except Exception as e:
+            print(f"[WARN] user_input.md の反映に失敗しました: {e}")
+    else:
+        print("[INFO] user_input.md は見つかりませんでした（スキップ）")
+
+def run_setup(args, shared=None, parse_pool=None, interactive=True, reuse_config=False) -> int:
+    """1プロジェクト分のセットアップ（user_input.md の反映〜完了表示）
+
+    Args:
+        shared: configure_fetching の戻り値。指定時は HTTP 等を設定し直さず共有のものを使う（常駐モード）
+        interactive: 既存ディレクトリで確認を求めるか（False なら --force 無しではスキップして 1 を返す）
+        reuse_config: 設定ファイルの解析結果をプロセス内で再利用する（config_loader.load_cached）
+
+    Returns:
+        終了コード（設定エラー等の致命的エラーは従来どおり sys.exit で終了する）
+    """
     print("汎用マーケティングツール プロジェクト自動セットアップを開始します...")
     print()
-    
     # 設定ファイルのパス決定（事前に user_input.md を反映するため、先にターゲットを決める）
     config_target = args.config if args.config else 'input/project-config.yaml'
 
     # user_input.md の反映（ある場合）
     if not getattr(args, 'no_user_input', False):
-        # user_input.md の探索（カレント/プロジェクトルート候補）
-        user_input_candidates = [
-            'user_input.md',
-            os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..', 'user_input.md')),
-        ]
-        user_input_path = next((p for p in user_input_candidates if os.path.exists(p)), None)
-        if user_input_path:
-            try:
-                applied, updated_keys = apply_user_input_to_config(user_input_path, config_target)
-                if applied:
-                    print(f"[OK] user_input.md を設定に反映: {len(updated_keys)}項目更新")
-                else:
-                    print("[INFO] user_input.md から反映すべき更新はありませんでした")
-            except Exception as e:
-                print(f"[WARN] user_input.md の反映に失敗しました: {e}")
-        else:
-            print("[INFO] user_input.md は見つかりませんでした（スキップ）")
+        apply_user_input(config_target)
 
     # 既存のロジックで最終的な selected_config を確定
     selected_config = args.config
@@ -514,7 +1266,10 @@ def main():
             pass
     # 設定ファイルの読み込み
     try:
-        config_loader = ConfigLoader(selected_config, allow_missing=bool(args.quick))
+        if reuse_config:
+            config_loader = load_cached_config(selected_config, allow_missing=bool(args.quick))
+        else:
+            config_loader = ConfigLoader(selected_config, allow_missing=bool(args.quick))
         print("[OK] 設定ファイル読み込み完了")
     except Exception as e:
         print(f"[ERROR] 設定ファイル読み込みエラー: {e}")
@@ -548,37 +1303,8 @@ def main():
             print(f"[WARN] 設定への企業名反映に失敗: {e}")
 
     # 設定の妥当性チェック
-    errors, warnings = config_loader.validate_config()
-    if args.quick:
-        # quick モードでは、企業名以外（業界/地域など）の不足は警告に緩和
-        must_fix = []
-        relaxed = []
-        for err in errors:
-            if '企業名' in err:
-                must_fix.append(err)
-            else:
-                relaxed.append(err)
-        if relaxed:
-            warnings = list(warnings) + [f"(quick) {w}" for w in relaxed]
-        if must_fix:
-            print("[ERROR] 設定エラーが見つかりました:")
-            for error in must_fix:
-                print(f"  - {error}")
-            print("企業名のみは --company か --company-file で指定してください。")
-            sys.exit(1)
-    else:
-        if errors:
-            print("[ERROR] 設定エラーが見つかりました:")
-            for error in errors:
-                print(f"  - {error}")
-            print("input/project-config.yamlを修正してから再実行してください。")
-            sys.exit(1)
-    
-    if warnings:
-        print("[WARN] 設定警告:")
-        for warning in warnings:
-            print(f"  - {warning}")
-        print()
+    if not check_config(config_loader, quick=bool(args.quick)):
+        sys.exit(1)
     
     # 設定サマリーの表示
     config_loader.print_config_summary()
@@ -592,62 +1318,22 @@ def main():
     print(f"実行日時: {current_datetime}")
     print()
     
-    # 2. プロジェクトディレクトリ作成（出力先切替に対応）
-    def create_project_directory_with_base(base_dir: str, date_str: str, force: bool = False):
-        os.makedirs(base_dir, exist_ok=True)
-        project_dir_local = os.path.join(base_dir, date_str)
-        if os.path.exists(project_dir_local):
-            print(f"[WARN] ディレクトリ {project_dir_local} は既に存在します。")
-            if not force:
-                response = input("続行しますか？ (y/n): ")
-                if response.lower() != 'y':
-                    print("❌ 処理を中止しました。")
-                    sys.exit(1)
-        else:
-            os.makedirs(project_dir_local)
-            print(f"[OK] ディレクトリ作成: {project_dir_local}")
-        return project_dir_local
-
-    project_dir = create_project_directory_with_base(args.outdir, target_date, force=args.force)
-    
-    # 3. テンプレートファイルコピー
-    copied_files = copy_template_files(project_dir)
-
-    # 3.5 競合サイトの取得・要約保存
-    if not args.no_competitors:
-        try:
-            fetched = fetch_and_save_competitors(
-                project_dir,
-                config_loader,
-                timeout=args.fetch_timeout,
-                max_competitors=args.max_competitors,
-            )
-            print(f"[OK] 競合サイト処理: {len(fetched)}件")
-        except Exception as e:
-            print(f"[WARN] 競合サイト処理で例外: {e}")
-    else:
-        print("[INFO] --no-competitors 指定のため、競合サイト取得をスキップします。")
-    
-    # 4. TODOマーカー更新
-    updated_files = update_todo_markers(project_dir, current_datetime, config_loader)
-    
-    # 5. 動的知識ベース作成
-    create_dynamic_knowledge_base(project_dir, config_loader)
-    
-    # 6. プロジェクトREADME作成
-    create_project_readme(project_dir, target_date, current_datetime, config_loader)
-
-    # 7. 要件定義への競合反映（TODOブロックをガイド文で置換）
-    if not args.no_inject:
-        inject_competitor_analysis_into_requirements(project_dir)
-    else:
-        print("[INFO] --no-inject 指定のため、要件定義への自動反映をスキップします。")
+    # --no-competitors では HTTP 関連のモジュール（requests 等）を読み込まない
+    if args.no_competitors:
+        shared = None
+    elif shared is None:
+        shared = configure_fetching(args, config_loader.get_fetch_config())
+    result = setup_project(args, config_loader, args.outdir, target_date, current_datetime, interactive=interactive, parse_pool=parse_pool)
+    if result is None:
+        return 1
     
     print()
     print("セットアップ完了")
-    print(f"作業ディレクトリ: {project_dir}")
-    print(f"コピーされたファイル: {len(copied_files)}個")
-    print(f"更新されたファイル: {len(updated_files)}個")
+    print(f"作業ディレクトリ: {result['project_dir']}")
+    print(f"コピーされたファイル: {len(result['copied_files'])}個")
+    print(f"更新されたファイル: {len(result['updated_files'])}個")
+    if shared is not None:
+        print_fetch_summary(*shared)
     print()
     print("次のステップ:")
     print("1. 各ファイルの <!-- TODO_XXX --> マーカーを実際の内容に置き換えてください")
@@ -658,6 +1344,101 @@ def main():
     print("クイックスタート:")
     print("@prompts/generic-quick-start.md をCursorで実行してください")
     print()
+    return 0
+
+# 常駐モードのジョブで指定できない引数（プロセス全体の設定・別の実行モード）
+SERVE_FIXED_OPTIONS = (
+    "help", "batch", "batch_workers", "serve", "serve_host", "serve_port", "serve_workers",
+    "http_pool_size", "http_retries", "http_backoff", "robots_ttl", "cache_dir", "no_http_cache", "html_parser",
+)
+
+def job_request_to_argv(request):
+    """常駐モードのジョブ（JSON）を setup-project.py の引数リストに変換する
+
+    {"config": "...", "date": "YYYYMMDD", "outdir": "...", "options": {"quick": true, "max_competitors": 3}}
+    options のキーは引数名（--max-competitors / max_competitors のどちらでも可）。true はフラグ、false/null は省略。
+    """
+    options = request.get("options") or {}
+    if not isinstance(options, dict):
+        raise ValueError("options はオブジェクトで指定してください")
+    options = dict(options)
+    for key in ("config", "date", "outdir"):
+        if request.get(key) is not None:
+            options[key] = request[key]
+    argv = []
+    for key, value in options.items():
+        name = str(key).lstrip("-").replace("-", "_")
+        if name in SERVE_FIXED_OPTIONS:
+            raise ValueError(f"--{name.replace('_', '-')} はジョブでは指定できません（常駐プロセス全体の設定・別の実行モードのため）")
+        if value is None or value is False:
+            continue
+        argv.append(f"--{name.replace('_', '-')}")
+        if value is not True:
+            argv.append(str(value))
+    return argv
+
+def serve(args) -> int:
+    """--serve: ジョブAPIを起動し、投入されたセットアップをワーカープールで実行する
+
+    HTTP Session・robots.txt/HTTPキャッシュ・レート制限・解析プロセスプールは起動時に1度だけ設定し、
+    設定ファイルの解析結果とテンプレートの内容はジョブ間で再利用する。
+    ジョブの既定値は起動時の引数（--outdir 等）で、ジョブごとに上書きできる。
+    """
+    from job_server import serve as serve_jobs
+
+    parser = build_arg_parser()
+
+    def _raise_value_error(message):
+        raise ValueError(message)
+
+    # 不正な引数は sys.exit ではなく 400 応答にする
+    parser.error = _raise_value_error
+    # 起動時に既定値から変えた引数（--outdir, --quick 等）をジョブの既定にする
+    defaults = vars(build_arg_parser().parse_args([]))
+    base_argv = job_request_to_argv({"options": {
+        key: value for key, value in vars(args).items() if value != defaults.get(key) and key not in SERVE_FIXED_OPTIONS
+    }})
+
+    fetch_config = {}
+    base_config = args.config or 'input/project-config.yaml'
+    # user_input.md の反映は設定ファイルを書き換えるため、並列に動くジョブでは行わず起動時に1度だけ行う
+    # （ジョブ中の書き換えは他のジョブの読み込みと競合し、load_cached の再利用も無効にする）
+    if not args.no_user_input:
+        apply_user_input(base_config)
+    if os.path.exists(base_config):
+        fetch_config = load_cached_config(base_config).get_fetch_config()
+    shared = configure_fetching(args, fetch_config)
+    parse_pool = _create_parse_pool(PARSE_POOL_MIN_PAGES, args.parse_workers)
+
+    def _prepare(request):
+        job_args = parser.parse_args(base_argv + job_request_to_argv(request))
+        job_args.no_user_input = True
+        return job_args
+
+    def _run(job_args):
+        return run_setup(job_args, shared=shared, parse_pool=parse_pool, interactive=False, reuse_config=True)
+
+    try:
+        return serve_jobs(_prepare, _run, host=args.serve_host, port=args.serve_port, workers=args.serve_workers)
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown()
+
+def main(argv=None) -> int:
+    """メイン処理
+
+    Args:
+        argv: コマンドライン引数（None なら sys.argv[1:]）。run.py 等からインプロセスで呼ぶ場合に渡す
+
+    Returns:
+        終了コード（設定エラー等の致命的エラーは従来どおり sys.exit で終了する）
+    """
+    args = build_arg_parser().parse_args(argv)
+    if args.serve:
+        return serve(args)
+    if args.batch:
+        return run_batch(args)
+    return run_setup(args)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
@@ -4,12 +4,13 @@
 SerpAPI 簡易テストスクリプト（.envファイル不使用）
 """
 
-import requests
-import json
-from datetime import datetime
 import os
+import time
 from pathlib import Path
 
+from http_client import get_session
+from serp_cache import SerpCache
+
 def test_serpapi_simple():
     """SerpAPIの動作テスト（環境変数から直接読み取り）"""
     
@@ -52,7 +53,8 @@ def test_serpapi_simple():
     }
     
     try:
-        response = requests.get("https://serpapi.com/search", params=params)
+        started = time.perf_counter()
+        response = get_session().get("https://serpapi.com/search", params=params)
         
         if response.status_code == 200:
             data = response.json()
@@ -95,7 +97,7 @@ def test_serpapi_simple():
                 print(f"\n💳 残りクレジット: {credits}")
             
             # テスト結果保存
-            save_test_result(test_keyword, data)
+            save_test_result({key: value for key, value in params.items() if key != "api_key"}, data, time.perf_counter() - started)
             
             print("\n🎉 テスト完了！")
             return True
@@ -117,24 +119,19 @@ def test_serpapi_simple():
         print(f"❌ エラー発生: {e}")
         return False
 
-def save_test_result(keyword, data):
-    """テスト結果を保存"""
-    result = {
-        "テスト日時": datetime.now().strftime("%Y年%m月%d日 %H:%M:%S"),
-        "テストキーワード": keyword,
-        "API呼び出し成功": True,
-        "オーガニック結果数": len(data.get("organic_results", [])),
-        "広告数": len(data.get("ads", [])),
-        "詳細データ": data
-    }
-    
+def save_test_result(params, data, seconds=0.0):
+    """テスト結果をSERPキャッシュ（output/.cache/serp.sqlite）に保存
+
+    使う項目だけのレコードに射影して保存し、元の応答は圧縮して output/.store に残す。
+    同じ日の同じ条件の結果は rank_tracker.py がクレジットを使わずに再利用する。
+    """
     try:
         project_root = Path(__file__).resolve().parents[2]
-        out_dir = project_root / "output"
-        out_dir.mkdir(parents=True, exist_ok=True)
-        with open(out_dir / "simple-test-result.json", 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
-        print("💾 結果を simple-test-result.json に保存しました")
+        cache = SerpCache(str(project_root / "output" / ".cache" / "serp.sqlite"),
+                          archive_dir=str(project_root / "output" / ".store"))
+        record = cache.put(params, data, seconds=seconds)
+        cache.close()
+        print(f"💾 結果をSERPキャッシュに保存しました: {cache.path}（元の応答: sha256:{record.raw_ref}）")
     except Exception as e:
         print(f"⚠️ ファイル保存エラー: {e}")
 
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+sitemap.xml による競合サイトの重要ページ選定
+
+robots.txt の `Sitemap:` 行と `/sitemap.xml` からサイトマップを探し、
+XMLPullParser でチャンク単位に解析する（数MBのサイトマップインデックスでも全体をメモリに載せない）。
+URLのパスに含まれるキーワード（contact / price / service / 料金 / お問い合わせ 等）で採点し、
+上位 N 件だけをヒープで保持する。gzip 圧縮（.xml.gz）のサイトマップにも対応。
+展開（Content-Encoding・.xml.gz）は展開後の大きさを制限しながら行い、展開後 50MB を超えたサイトマップは
+打ち切って scan.errors に記録する。
+
+使い方:
+    python src/workflows/sitemaps.py https://example.com --top 10
+
+    from sitemaps import scan_site
+    scan = scan_site("https://example.com/", top_n=5)
+    print(scan.scanned, scan.selected)
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import re
+import sys
+import zlib
+from typing import Callable, Iterator, List, Optional
+from urllib.parse import unquote, urlsplit
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+from http_client import CHUNK_SIZE, get_session
+from robots_cache import get_robots_cache
+from url_frontier import host_of, is_probably_html, normalize_url
+
+# URLに含まれると重要ページとみなすキーワードと重み
+RELEVANT_URL_KEYWORDS = {
+    "contact": 5, "inquiry": 5, "お問い合わせ": 5, "問い合わせ": 5,
+    "price": 4, "pricing": 4, "料金": 4, "価格": 4, "fee": 3, "cost": 3,
+    "reserve": 3, "booking": 3, "予約": 3,
+    "service": 3, "サービス": 3, "plan": 3, "menu": 2, "product": 2, "feature": 2,
+    "case": 2, "works": 2, "voice": 2, "実績": 2, "事例": 2, "faq": 2, "flow": 2,
+    "company": 1, "about": 1, "会社概要": 1, "access": 1,
+}
+DEFAULT_MAX_URLS = 50000
+DEFAULT_MAX_SITEMAPS = 10
+# サイトマップ1ファイルの上限（プロトコル上の上限 50MB、展開後）
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+
+class SitemapScan:
+    """サイトマップ走査の結果（走査URL数と選定URL）"""
+
+    def __init__(self):
+        self.sitemaps: List[str] = []
+        self.scanned = 0
+        self.selected: List[str] = []
+        self.errors: List[str] = []
+
+
+_KEYWORD_RE = re.compile("|".join(re.escape(k) for k in RELEVANT_URL_KEYWORDS))
+
+
+def score_url(url: str, keywords=None) -> int:
+    """URLのパス・クエリに含まれるキーワードの重みの合計"""
+    keywords = keywords or RELEVANT_URL_KEYWORDS
+    # 大半のURLはキーワードを含まないため、分解前に全体を一度だけ検索して除外する
+    if keywords is RELEVANT_URL_KEYWORDS and not _KEYWORD_RE.search(unquote(url).lower()):
+        return 0
+    parts = urlsplit(url)
+    target = unquote(f"{parts.path}?{parts.query}").lower()
+    return sum(weight for keyword, weight in keywords.items() if keyword in target)
+
+
+def sitemap_candidates(url: str, timeout: int = 20) -> List[str]:
+    """robots.txt の Sitemap: 行と /sitemap.xml（重複除去、記載順）"""
+    parts = urlsplit(url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    candidates = []
+    try:
+        parser = get_robots_cache().get_parser(url, timeout)
+        candidates += (parser.site_maps() or []) if parser is not None else []
+    except Exception:
+        pass
+    candidates.append(f"{origin}/sitemap.xml")
+    seen = set()
+    return [c for c in candidates if not (c in seen or seen.add(c))]
+
+
+# サイトマップの取得で受け付ける Content-Encoding（展開後の大きさを制限しながら自前で展開できるもの）
+SITEMAP_ACCEPT_ENCODING = "gzip, deflate"
+
+
+def _inflate(decompressor, data: bytes) -> Iterator[bytes]:
+    """data を展開して CHUNK_SIZE 以下ずつ返す（decompressor が None ならそのまま）"""
+    if decompressor is None:
+        if data:
+            yield data
+        return
+    while data:
+        # 展開後の大きさを制限する（高圧縮率の gzip でも一度に展開しない）
+        piece = decompressor.decompress(data, CHUNK_SIZE)
+        data = decompressor.unconsumed_tail
+        if piece:
+            yield piece
+
+
+def _iter_decoded(resp) -> Iterator[bytes]:
+    """本文を順に返す（Content-Encoding と .xml.gz を展開する）
+
+    urllib3 の自動展開は展開後の大きさを制限しないため使わず、未展開の本文を自前で展開する。
+    展開後 MAX_SITEMAP_BYTES を超えたら ValueError（それまでに返した分は有効）。
+    """
+    encoding = (resp.headers.get("Content-Encoding") or "").strip().lower()
+    if encoding in ("", "identity"):
+        transfer = None
+    elif encoding in ("gzip", "x-gzip"):
+        transfer = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    elif encoding == "deflate":
+        transfer = zlib.decompressobj()
+    else:
+        raise ValueError(f"未対応の Content-Encoding です: {encoding}")
+    decompressor = None
+    total = 0
+    first = True
+    for chunk in resp.raw.stream(CHUNK_SIZE, decode_content=False):
+        for data in _inflate(transfer, chunk):
+            if first:
+                first = False
+                # Content-Encoding ではなくファイル自体が gzip（.xml.gz）の場合
+                if data[:2] == b"\x1f\x8b":
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            for piece in _inflate(decompressor, data):
+                total += len(piece)
+                if total > MAX_SITEMAP_BYTES:
+                    raise ValueError(f"展開後 {MAX_SITEMAP_BYTES // (1024 * 1024)}MB を超えたため途中で打ち切りました（それまでのURLは採用）")
+                yield piece
+
+
+def _iter_sitemap_locs(sitemap_url: str, timeout: int):
+    """サイトマップを受信しながら解析し、("url" | "sitemap", loc) を順に返す"""
+    resp = get_session().get(sitemap_url, timeout=timeout, stream=True, headers={"Accept-Encoding": SITEMAP_ACCEPT_ENCODING})
+    try:
+        # サイトマップが無いのは通常のことなのでエラー扱いしない
+        if resp.status_code == 404:
+            return
+        resp.raise_for_status()
+        parser = XMLPullParser(events=("start", "end"))
+        root = None
+        for data in _iter_decoded(resp):
+            parser.feed(data)
+            for event, elem in parser.read_events():
+                if event == "start":
+                    if root is None:
+                        root = elem
+                    continue
+                tag = elem.tag.rsplit("}", 1)[-1]
+                if tag not in ("url", "sitemap"):
+                    continue
+                for child in elem:
+                    if child.tag.rsplit("}", 1)[-1] == "loc" and child.text:
+                        yield tag, child.text.strip()
+                        break
+                # 処理済みの要素を捨ててメモリを一定に保つ
+                root.clear()
+    finally:
+        resp.close()
+
+
+def scan_site(url: str, top_n: int, allow: Optional[Callable[[str], bool]] = None, timeout: int = 20,
+              max_urls: int = DEFAULT_MAX_URLS, max_sitemaps: int = DEFAULT_MAX_SITEMAPS, exclude=()) -> SitemapScan:
+    """サイトマップを走査し、同一ホストの重要ページ上位 top_n 件を選ぶ
+
+    Args:
+        url: 競合のトップページURL（ホストの判定とサイトマップ探索に使用）
+        top_n: 選定件数
+        allow: URLごとの取得可否（robots.txt 判定など）。上位候補に入る場合のみ呼ぶ
+        max_urls: 走査するURL数の上限
+        max_sitemaps: 取得するサイトマップ（インデックス配下を含む）の上限
+        exclude: 選定から除くURL（トップページ等、正規化済み）
+    """
+    scan = SitemapScan()
+    host = host_of(normalize_url(url) or "")
+    excluded = set(exclude)
+    heap: list = []
+    queue = sitemap_candidates(url, timeout)
+    queued = set(queue)
+
+    while queue and len(scan.sitemaps) < max_sitemaps and scan.scanned < max_urls:
+        sitemap_url = queue.pop(0)
+        scan.sitemaps.append(sitemap_url)
+        try:
+            for kind, loc in _iter_sitemap_locs(sitemap_url, timeout):
+                if kind == "sitemap":
+                    if loc not in queued:
+                        queued.add(loc)
+                        queue.append(loc)
+                    continue
+                scan.scanned += 1
+                if scan.scanned > max_urls:
+                    break
+                # 採点は正規化前のURLで先に行い、対象外のURLは正規化しない
+                score = score_url(loc)
+                if score <= 0:
+                    continue
+                page_url = normalize_url(loc)
+                if not page_url or host_of(page_url) != host or page_url in excluded or not is_probably_html(page_url):
+                    continue
+                # 同点はパスが浅い順→サイトマップの記載順
+                entry = (score, -urlsplit(page_url).path.count("/"), -scan.scanned, page_url)
+                if len(heap) >= top_n and entry <= heap[0]:
+                    continue
+                if allow is not None and not allow(page_url):
+                    continue
+                excluded.add(page_url)
+                if len(heap) < top_n:
+                    heapq.heappush(heap, entry)
+                else:
+                    heapq.heapreplace(heap, entry)
+        except (ParseError, zlib.error) as e:
+            scan.errors.append(f"{sitemap_url}: XML解析失敗 {e}")
+        except Exception as e:
+            scan.errors.append(f"{sitemap_url}: {e}")
+
+    scan.scanned = min(scan.scanned, max_urls)
+    scan.selected = [entry[3] for entry in sorted(heap, reverse=True)]
+    return scan
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="sitemap.xml から重要ページを選定")
+    parser.add_argument("url", help="競合サイトのURL")
+    parser.add_argument("--top", type=int, default=10, help="選定件数（既定: 10）")
+    parser.add_argument("--max-urls", type=int, default=DEFAULT_MAX_URLS, help=f"走査するURL数の上限（既定: {DEFAULT_MAX_URLS}）")
+    parser.add_argument("--timeout", type=int, default=20, help="HTTPタイムアウト（秒）")
+    args = parser.parse_args()
+
+    scan = scan_site(args.url, args.top, timeout=args.timeout, max_urls=args.max_urls)
+    for error in scan.errors:
+        print(f"[WARN] {error}")
+    print(f"[INFO] サイトマップ: {len(scan.sitemaps)}件 / 走査URL: {scan.scanned}件 / 選定: {len(scan.selected)}件")
+    for url in scan.selected:
+        print(f"  {score_url(url):>3}  {url}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
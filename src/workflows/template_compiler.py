@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+テンプレートの事前コンパイルとキャッシュ（src/templates/generic）
+
+テンプレートを1度だけ解析して「固定文字列の断片」と「プレースホルダー（TODOマーカー等）の枠」の並びにし、
+設定値を埋め込んで出力先へ1回の書き込みで描画する。以前はテンプレートをコピーした後に
+TODOマーカー更新で読み直して書き直していた（1ファイルにつき書き込み2回と読み込み1回）。
+
+プレースホルダーの規則は todo_markers.TODO_RULES（置換結果は replace_markers と同一）。
+コンパイル結果はパスごとにプロセス内で保持し、更新日時・サイズが変われば読み直す
+（内容のハッシュが同じなら解析はやり直さない）。常駐・バッチ実行では企業ごとの解析が不要になる。
+
+使い方:
+    from template_compiler import render_template
+    changed = render_template(src_path, dst_path, todo_values(current_datetime, company_name, industry))
+
+    python src/workflows/template_compiler.py --bench --companies 200   # 従来のコピー＋TODO更新との比較
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from todo_markers import TODO_RULES, compile_rules, replace_markers, todo_values
+
+
+class CompiledTemplate:
+    """固定文字列の断片とプレースホルダーの枠の並び
+
+    segments は slots より1つ多く、segments[0] + slots[0] + segments[1] + ... の順に連結する。
+    """
+
+    def __init__(self, raw: bytes, text: str, rules=TODO_RULES):
+        self.raw = raw
+        self.text = text
+        self.segments: List[str] = []
+        self.slots: List[str] = []
+        compiled = compile_rules(rules)
+        position = 0
+        for match in compiled.pattern.finditer(text):
+            self.segments.append(text[position:match.start()])
+            self.slots.append(compiled.template_for(match.group()))
+            position = match.end()
+        self.segments.append(text[position:])
+
+    def render(self, values: Dict[str, str]) -> str:
+        """設定値を埋め込んだ本文を返す"""
+        if not self.slots:
+            return self.text
+        rendered = {slot: slot.format(**values) for slot in set(self.slots)}
+        parts = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            parts.append(rendered[slot])
+            parts.append(segment)
+        return "".join(parts)
+
+
+# パス → ((mtime_ns, size), 内容の sha256, CompiledTemplate)
+_compiled_cache: Dict[str, Tuple[Tuple[int, int], str, CompiledTemplate]] = {}
+_compiled_cache_lock = threading.Lock()
+
+
+def load_template(path: str) -> CompiledTemplate:
+    """テンプレートのコンパイル結果を返す（更新日時・サイズが変わらない限り再利用）"""
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _compiled_cache_lock:
+        cached = _compiled_cache.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[2]
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached is not None and cached[1] == digest:
+        # 更新日時だけ変わった（チェックアウトし直し等）場合は解析をやり直さない
+        template = cached[2]
+    else:
+        # 従来のテキストモード読み込みと同じく改行を \n に統一して解析する
+        text = raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+        template = CompiledTemplate(raw, text)
+    with _compiled_cache_lock:
+        _compiled_cache[path] = (version, digest, template)
+    return template
+
+
+def render_template(src_path: str, dst_path: str, values: Dict[str, str]) -> bool:
+    """テンプレートを設定値で描画して dst_path へ1回で書き込む（プレースホルダーを置換したら True）
+
+    描画しても内容が変わらないテンプレートは shutil.copy2 と同じく内容・更新日時・権限をそのまま写す。
+    置換したファイルは権限のみテンプレートに揃える（更新日時は書き込み時刻）。
+    """
+    template = load_template(src_path)
+    content = template.render(values)
+    if content == template.text:
+        with open(dst_path, "wb") as f:
+            f.write(template.raw)
+        shutil.copystat(src_path, dst_path)
+        return False
+    with open(dst_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    shutil.copymode(src_path, dst_path)
+    return True
+
+
+def _copy_then_update(src_path: str, dst_path: str, values: Dict[str, str]) -> bool:
+    """従来の手順（shutil.copy2 でコピーし、読み直して置換・書き直し）。--bench の比較基準"""
+    shutil.copy2(src_path, dst_path)
+    with open(dst_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    new_content, _ = replace_markers(content, values)
+    if new_content == content:
+        return False
+    with open(dst_path, "w", encoding="utf-8") as f:
+        f.write(new_content)
+    return True
+
+
+def run_bench(companies: int) -> int:
+    """companies 社分のテンプレート展開を従来手順と比較する（出力の一致も確認）"""
+    template_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "templates", "generic"))
+    sources = sorted(glob.glob(os.path.join(template_dir, "*.md")))
+    if not sources:
+        print(f"[ERROR] テンプレートが見つかりません: {template_dir}")
+        return 1
+    workdir = tempfile.mkdtemp(prefix="template-bench-")
+    timings = {}
+    try:
+        for name, func in (("copy+update", _copy_then_update), ("compiled", render_template)):
+            started = time.perf_counter()
+            for index in range(companies):
+                out_dir = os.path.join(workdir, name, str(index))
+                os.makedirs(out_dir)
+                values = todo_values("2025年01月01日 10:00:00", f"株式会社サンプル{index}", "IT業界")
+                for src_path in sources:
+                    func(src_path, os.path.join(out_dir, os.path.basename(src_path)), values)
+            timings[name] = time.perf_counter() - started
+            print(f"{name:<12} {timings[name] * 1000:>9.1f}ms / {companies}社（{len(sources)}ファイル/社）")
+        for index in range(companies):
+            for src_path in sources:
+                filename = os.path.basename(src_path)
+                with open(os.path.join(workdir, "copy+update", str(index), filename), "rb") as a, \
+                        open(os.path.join(workdir, "compiled", str(index), filename), "rb") as b:
+                    if a.read() != b.read():
+                        print(f"[ERROR] 出力が一致しません: {index}/{filename}")
+                        return 1
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print("[OK] 出力は従来の手順と一致")
+    print(f"[INFO] 速度比: {timings['copy+update'] / timings['compiled']:.1f}倍")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="テンプレート事前コンパイルのベンチマーク")
+    parser.add_argument("--bench", action="store_true", help="従来のコピー＋TODO更新と速度・出力を比較")
+    parser.add_argument("--companies", type=int, default=100, help="--bench で展開する企業数（既定: 100）")
+    args = parser.parse_args()
+    if not args.bench:
+        parser.print_help()
+        return 0
+    return run_bench(args.companies)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,14 +4,15 @@
 SerpAPI テスト用スクリプト（最小限のリクエスト）
 """
 
-import requests
-import json
-from datetime import datetime
 import os
+import time
 from pathlib import Path
 import argparse
 from dotenv import load_dotenv
 
+from http_client import get_session
+from serp_cache import SerpCache
+
 # .envファイルから環境変数を読み込み
 load_dotenv()
 
@@ -49,7 +50,8 @@ def test_serpapi(cli_api_key=None):
     }
     
     try:
-        response = requests.get("https://serpapi.com/search", params=params)
+        started = time.perf_counter()
+        response = get_session().get("https://serpapi.com/search", params=params)
         
         if response.status_code == 200:
             data = response.json()
@@ -92,10 +94,10 @@ def test_serpapi(cli_api_key=None):
                 print(f"\n💳 残りクレジット: {credits}")
             
             # テスト結果保存
-            save_test_result(test_keyword, data)
+            save_test_result({key: value for key, value in params.items() if key != "api_key"}, data, time.perf_counter() - started)
             
             print("\n🎉 テスト完了！")
-            print("📝 詳細結果はtest-result.jsonを確認してください")
+            print("📝 詳細結果は python src/workflows/serp_cache.py --stats で確認できます")
             return True
             
         else:
@@ -107,23 +109,19 @@ def test_serpapi(cli_api_key=None):
         print(f"❌ エラー発生: {e}")
         return False
 
-def save_test_result(keyword, data):
-    """テスト結果を保存"""
-    result = {
-        "テスト日時": datetime.now().strftime("%Y年%m月%d日 %H:%M:%S"),
-        "テストキーワード": keyword,
-        "API呼び出し成功": True,
-        "オーガニック結果数": len(data.get("organic_results", [])),
-        "広告数": len(data.get("ads", [])),
-        "詳細データ": data
-    }
-    
+def save_test_result(params, data, seconds=0.0):
+    """テスト結果をSERPキャッシュ（output/.cache/serp.sqlite）に保存
+
+    使う項目だけのレコードに射影して保存し、元の応答は圧縮して output/.store に残す。
+    同じ日の同じ条件の結果は rank_tracker.py がクレジットを使わずに再利用する。
+    """
     try:
         project_root = Path(__file__).resolve().parents[2]
-        out_dir = project_root / "output"
-        out_dir.mkdir(parents=True, exist_ok=True)
-        with open(out_dir / "test-result.json", 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        cache = SerpCache(str(project_root / "output" / ".cache" / "serp.sqlite"),
+                          archive_dir=str(project_root / "output" / ".store"))
+        record = cache.put(params, data, seconds=seconds)
+        cache.close()
+        print(f"💾 結果をSERPキャッシュに保存しました: {cache.path}（元の応答: sha256:{record.raw_ref}）")
     except Exception as e:
         print(f"⚠️ ファイル保存エラー: {e}")
 
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TODOマーカー置換エンジン（複数パターンを1回の走査で置換）
+
+テンプレート内の TODO マーカー・企業名/業界名のプレースホルダー（旧テンプレ互換の固定文言を含む）を、
+全パターンを1つの正規表現（選択）にまとめて1回の走査で置き換える。
+パターンは設定値に依存しないためプロセス内で1度だけコンパイルし、置換後の文字列は
+ルールの書式に設定値を埋め込んで作る（値に正規表現の特殊文字やパターン自体を含んでも再置換されない）。
+
+以前はパターンごとに re.sub を順に適用していたため、ルールの意味はその順序適用に合わせてある:
+先に適用されるリテラルを部分文字列として含む後続のリテラル（例: 「株式会社和光商事：和光葬儀社」は
+「和光葬儀社」を含む）は順序適用では一致し得ないため、結合時に除外する。
+
+使い方:
+    from todo_markers import todo_values, replace_markers
+    new_text, count = replace_markers(text, todo_values(current_datetime, company_name, industry))
+
+    python src/workflows/todo_markers.py --check            # 従来の逐次 re.sub と出力が一致するか確認
+    python src/workflows/todo_markers.py --bench --size-kb 512
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+# (正規表現, 置換後の書式)。順序は従来の置換順（順序適用の意味を保つ）
+# 書式の {execution_date} / {company_name} / {industry} に設定値が入る
+TODO_RULES: Tuple[Tuple[str, str], ...] = (
+    # 実行日時
+    (r'<!-- TODO_EXECUTION_DATE -->\s*実行日時を記載\s*<!-- /TODO_EXECUTION_DATE -->', '<!-- TODO_EXECUTION_DATE -->\n{execution_date}\n<!-- /TODO_EXECUTION_DATE -->'),
+    (r'TODO:\s*実行日時を記載', '{execution_date}'),
+
+    # 企業名・業界の置換（特定企業名は扱わない）
+    (r'TARGET_COMPANY', '{company_name}'),
+    (r'TARGET_INDUSTRY', '{industry}'),
+
+    # 旧テンプレ（葬儀特化）互換のための置換
+    (r'和光葬儀社', '{company_name}'),
+    (r'株式会社和光商事：和光葬儀社', '{company_name}'),
+    (r'葬儀業界', '{industry}'),
+    (r'葬儀サービス業', '{industry}'),
+
+    # 汎用的な置換
+    (r'<!-- TODO_COMPANY_NAME -->\s*企業名を記載\s*<!-- /TODO_COMPANY_NAME -->', '<!-- TODO_COMPANY_NAME -->\n{company_name}\n<!-- /TODO_COMPANY_NAME -->'),
+    (r'<!-- TODO_INDUSTRY_NAME -->\s*業界名を記載\s*<!-- /TODO_INDUSTRY_NAME -->', '<!-- TODO_INDUSTRY_NAME -->\n{industry}\n<!-- /TODO_INDUSTRY_NAME -->'),
+)
+
+
+def todo_values(current_datetime: str, company_name: str, industry: str) -> Dict[str, str]:
+    """置換書式に埋め込む設定値"""
+    return {"execution_date": current_datetime, "company_name": company_name, "industry": industry}
+
+
+def _is_literal(pattern: str) -> bool:
+    return re.escape(pattern) == pattern
+
+
+def effective_rules(rules: Sequence[Tuple[str, str]] = TODO_RULES) -> List[Tuple[int, str, str]]:
+    """順序適用で一致し得るルールだけを (元の番号, 正規表現, 書式) で返す
+
+    先行するリテラルを含む後続のリテラルは、順序適用では先行側に置き換えられた後になるため一致しない。
+    """
+    effective = []
+    for index, (pattern, template) in enumerate(rules):
+        if _is_literal(pattern) and any(
+            _is_literal(earlier) and earlier in pattern for earlier, _ in rules[:index]
+        ):
+            continue
+        effective.append((index, pattern, template))
+    return effective
+
+
+class CompiledRules:
+    """結合済みの正規表現と、一致した文字列からルールを引く表"""
+
+    def __init__(self, rules: Sequence[Tuple[str, str]]):
+        effective = effective_rules(rules)
+        # 名前付きグループで包むと re の先頭文字による候補位置の絞り込みが効かなくなるため、
+        # グループ無しの選択にし、どのルールに一致したかは一致した文字列から引く
+        self.pattern = re.compile("|".join(f"(?:{pattern})" for _, pattern, _ in effective))
+        self.rules = [(re.compile(pattern), template) for _, pattern, template in effective]
+        # リテラルは一致文字列そのものがキー（先行する正規表現ルールにも一致する場合はそちらを優先）
+        self.literals = {}
+        for _, pattern, _ in effective:
+            if _is_literal(pattern):
+                self.literals.setdefault(pattern, self.template_for(pattern))
+
+    def template_for(self, matched: str) -> str:
+        """選択は先頭のルールから試されるため、一致文字列に完全一致する最初のルールが実際に一致したルール"""
+        template = self.literals.get(matched)
+        if template is not None:
+            return template
+        for regex, template in self.rules:
+            if regex.fullmatch(matched):
+                return template
+        raise ValueError(f"一致したルールが見つかりません: {matched!r}")
+
+
+@lru_cache(maxsize=None)
+def compile_rules(rules: Tuple[Tuple[str, str], ...] = TODO_RULES) -> CompiledRules:
+    """ルール群を1つの正規表現にまとめる（ルールが同じならプロセス内で1度だけ）"""
+    return CompiledRules(rules)
+
+
+def replace_markers(text: str, values: Dict[str, str], rules: Tuple[Tuple[str, str], ...] = TODO_RULES) -> Tuple[str, int]:
+    """text のマーカーを1回の走査で置換し、(置換後の文字列, 置換数) を返す"""
+    compiled = compile_rules(rules)
+    rendered = {}
+
+    def _replace(match):
+        matched = match.group()
+        if matched not in rendered:
+            rendered[matched] = compiled.template_for(matched).format(**values)
+        return rendered[matched]
+
+    return compiled.pattern.subn(_replace, text)
+
+
+def replace_markers_sequential(text: str, values: Dict[str, str], rules: Sequence[Tuple[str, str]] = TODO_RULES) -> str:
+    """従来の実装（パターンごとに re.sub を順に適用）。--check の比較基準"""
+    for pattern, template in rules:
+        text = re.sub(pattern, template.format(**values), text)
+    return text
+
+
+def _template_texts() -> List[Tuple[str, str]]:
+    root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "templates", "generic"))
+    texts = []
+    for path in sorted(glob.glob(os.path.join(root, "*.md"))):
+        with open(path, "r", encoding="utf-8") as f:
+            texts.append((os.path.basename(path), f.read()))
+    return texts
+
+
+# 合成テンプレートに混ぜる断片（マーカー・旧テンプレ文言・紛らわしい近似文字列）
+_SYNTHETIC_PIECES = (
+    "<!-- TODO_EXECUTION_DATE -->\n実行日時を記載\n<!-- /TODO_EXECUTION_DATE -->",
+    "<!-- TODO_EXECUTION_DATE -->実行日時を記載<!-- /TODO_EXECUTION_DATE -->",
+    "TODO: 実行日時を記載", "TODO:実行日時を記載", "TODO:\n\t実行日時を記載", "TODO: 実行日を記載",
+    "TARGET_COMPANY", "TARGET_INDUSTRY", "TARGET_COMPANYTARGET_INDUSTRY", "TARGET_COMPAN", "XTARGET_INDUSTRYX",
+    "和光葬儀社", "株式会社和光商事：和光葬儀社", "株式会社和光商事", "葬儀業界", "葬儀サービス業", "葬儀業", "和光葬儀業界",
+    "<!-- TODO_COMPANY_NAME -->\n企業名を記載\n<!-- /TODO_COMPANY_NAME -->",
+    "<!-- TODO_COMPANY_NAME -->企業名を記載<!-- /TODO_INDUSTRY_NAME -->",
+    "<!-- TODO_INDUSTRY_NAME -->  業界名を記載  <!-- /TODO_INDUSTRY_NAME -->",
+    "<!-- TODO_COMPETITOR_LP -->\n競合LPの分析\n<!-- /TODO_COMPETITOR_LP -->",
+    "## 見出し\n", "- 箇条書きの本文です。\n", "通常の段落テキスト。" * 5, "\n\n", "| 列1 | 列2 |\n|---|---|\n",
+)
+
+
+def synthetic_template(size_bytes: int, seed: int = 0) -> str:
+    """実テンプレートと紛らわしい断片を混ぜた size_bytes 程度の合成テンプレート"""
+    rng = random.Random(seed)
+    pieces = list(_SYNTHETIC_PIECES) + [text for _, text in _template_texts()]
+    parts = []
+    total = 0
+    while total < size_bytes:
+        piece = rng.choice(pieces)
+        parts.append(piece)
+        total += len(piece.encode("utf-8"))
+    return "".join(parts)
+
+
+def run_check(samples: int = 200) -> int:
+    """実テンプレートと合成テンプレートで、逐次 re.sub と出力が一致するか確認する"""
+    values = todo_values("2025年01月01日 10:00:00", "株式会社サンプル", "IT業界")
+    cases = _template_texts() + [(f"synthetic-{seed}", synthetic_template(4096, seed)) for seed in range(samples)]
+    mismatches = 0
+    for name, text in cases:
+        if replace_markers(text, values)[0] != replace_markers_sequential(text, values):
+            mismatches += 1
+            print(f"[ERROR] 出力が一致しません: {name}")
+    if mismatches:
+        print(f"[ERROR] {mismatches}/{len(cases)}件で不一致")
+        return 1
+    print(f"[OK] {len(cases)}件すべて従来の置換結果と一致")
+    return 0
+
+
+def run_bench(size_kb: int, repeat: int) -> int:
+    values = todo_values("2025年01月01日 10:00:00", "株式会社サンプル", "IT業界")
+    text = synthetic_template(size_kb * 1024, seed=1)
+    timings = {}
+    for name, func in (("sequential", lambda: replace_markers_sequential(text, values)),
+                       ("single-pass", lambda: replace_markers(text, values)[0])):
+        func()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        timings[name] = (time.perf_counter() - started) / repeat
+        print(f"{name:<12} {timings[name] * 1000:>9.2f}ms / {size_kb}KiB")
+    print(f"[INFO] 速度比: {timings['sequential'] / timings['single-pass']:.1f}倍")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="TODOマーカー置換エンジンの一致確認・ベンチマーク")
+    parser.add_argument("--check", action="store_true", help="実テンプレート・合成テンプレートで従来の置換結果と一致するか確認")
+    parser.add_argument("--bench", action="store_true", help="大きな合成テンプレートで従来の置換と速度を比較")
+    parser.add_argument("--size-kb", type=int, default=256, help="--bench の合成テンプレートのサイズ（KiB、既定: 256）")
+    parser.add_argument("--repeat", type=int, default=5, help="--bench の繰り返し回数（既定: 5）")
+    args = parser.parse_args()
+
+    if not args.check and not args.bench:
+        args.check = True
+    code = run_check() if args.check else 0
+    if args.bench:
+        code = run_bench(args.size_kb, args.repeat) or code
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
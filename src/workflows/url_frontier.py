@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+競合サイト下層ページ巡回用のURLフロンティア（幅優先・件数上限付き）
+
+- URLは正規化（スキーム/ホストの小文字化、既定ポート・フラグメント除去、クエリ整列）してから重複判定する
+- 訪問済み集合は正規化URLの64bitハッシュ（int）のみを保持し、URL文字列は持たない
+- 同一ホストのリンクのみを対象とし、画像・PDF等の非HTMLと思われる拡張子は除外する
+- 階層ごとに全競合の候補を入力順のラウンドロビンで選び、全体のページ上限を公平に配分する
+
+使い方:
+    from url_frontier import CrawlFrontier
+    frontier = CrawlFrontier(max_pages=30)
+    frontier.seed(root_url)
+    frontier.discover(owner, root_url, links, depth=1)
+    for owner, url, depth in frontier.next_level():
+        ...
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# 取得してもHTMLでない可能性が高い拡張子（Content-Type 判定の前に除外して上限を無駄にしない）
+SKIP_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico", ".bmp",
+    ".css", ".js", ".json", ".xml", ".txt", ".csv",
+    ".zip", ".gz", ".tar", ".rar", ".7z",
+    ".mp3", ".mp4", ".mov", ".avi", ".wmv", ".webm",
+    ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+)
+
+
+def normalize_url(href: str, base: Optional[str] = None) -> Optional[str]:
+    """リンクを絶対URLに解決して正規化する（http/https 以外・解析不能なら None）"""
+    try:
+        absolute = urljoin(base, href.strip()) if base else href.strip()
+        parts = urlsplit(absolute)
+        scheme = parts.scheme.lower()
+        if scheme not in DEFAULT_PORTS or not parts.hostname:
+            return None
+        host = parts.hostname.lower()
+        port = parts.port
+    except ValueError:
+        return None
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def host_of(url: str) -> str:
+    """正規化URLのホスト部（ポート付き）"""
+    return urlsplit(url).netloc
+
+
+def is_probably_html(url: str) -> bool:
+    return not urlsplit(url).path.lower().endswith(SKIP_EXTENSIONS)
+
+
+class VisitedSet:
+    """正規化URLの64bitハッシュで訪問済みを管理する（URL文字列を保持しない省メモリ集合）"""
+
+    def __init__(self):
+        self._hashes = set()
+
+    @staticmethod
+    def _key(url: str) -> int:
+        return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def add(self, url: str) -> bool:
+        """未訪問なら登録して True、訪問済みなら False"""
+        key = self._key(url)
+        if key in self._hashes:
+            return False
+        self._hashes.add(key)
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return self._key(url) in self._hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+class CrawlFrontier:
+    def __init__(self, max_pages: int, allow: Optional[Callable[[str], bool]] = None):
+        """
+        Args:
+            max_pages: 下層ページの取得上限（全競合の合計）
+            allow: URLごとの取得可否（robots.txt 判定など）。False のURLは上限を消費しない
+        """
+        self.remaining = max(0, max_pages)
+        self.allow = allow
+        self.visited = VisitedSet()
+        self._queues: Dict[object, deque] = {}
+        self.stats = {"discovered": 0, "disallowed": 0, "selected": 0}
+
+    def seed(self, url: str) -> Optional[str]:
+        """起点URLを訪問済みとして登録し、正規化URLを返す"""
+        normalized = normalize_url(url)
+        if normalized:
+            self.visited.add(normalized)
+        return normalized
+
+    def discover(self, owner, page_url: str, links: Iterable[str], depth: int, root_url: Optional[str] = None) -> None:
+        """ページ内リンクから同一ホストの未訪問URLを owner の候補に追加する
+
+        候補は残り上限件数までしか保持しない（それ以上は今回の実行で取得されないため）。
+        """
+        root_host = host_of(normalize_url(root_url or page_url) or "")
+        queue = self._queues.setdefault(owner, deque())
+        for href in links:
+            if len(queue) >= self.remaining:
+                break
+            url = normalize_url(href, base=page_url)
+            if not url or host_of(url) != root_host or not is_probably_html(url):
+                continue
+            if not self.visited.add(url):
+                continue
+            self.stats["discovered"] += 1
+            if self.allow is not None and not self.allow(url):
+                self.stats["disallowed"] += 1
+                continue
+            queue.append((url, depth))
+
+    def next_level(self) -> List[Tuple[object, str, int]]:
+        """候補を owner の登録順にラウンドロビンで取り出す（残り上限まで）。残りの候補は破棄する"""
+        selected = []
+        owners = [owner for owner, queue in self._queues.items() if queue]
+        while owners and self.remaining > 0:
+            for owner in list(owners):
+                queue = self._queues[owner]
+                if not queue:
+                    owners.remove(owner)
+                    continue
+                if self.remaining <= 0:
+                    break
+                url, depth = queue.popleft()
+                selected.append((owner, url, depth))
+                self.remaining -= 1
+        self._queues.clear()
+        self.stats["selected"] += len(selected)
+        return selected